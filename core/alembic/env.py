@@ -25,6 +25,10 @@ from core.models.agent import Agent
 from core.models.agent_config import AgentConfig
 from core.models.agent_phone_numbers import AgentPhoneNumbers
 from core.models.models import Model
+from core.models.email_outbox import EmailOutbox
+from core.models.call_metrics import CallMetrics
+from core.models.call import Call
+from core.models.token_revocation import TokenRevocation
 
 config = context.config
 
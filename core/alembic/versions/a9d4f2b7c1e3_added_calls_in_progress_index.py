@@ -0,0 +1,23 @@
+"""added partial index on calls in progress
+
+Revision ID: a9d4f2b7c1e3
+Revises: e5a1c9d7b2f4
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4f2b7c1e3'
+down_revision = 'e5a1c9d7b2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_calls_in_progress', 'calls', ['started_at'], unique=False, postgresql_where=sa.text('ended_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calls_in_progress', table_name='calls', postgresql_where=sa.text('ended_at IS NULL'))
@@ -0,0 +1,58 @@
+"""added call_metrics table
+
+Revision ID: d3f8b2c6a9e1
+Revises: c7d2a9e4f1b6
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8b2c6a9e1'
+down_revision = 'c7d2a9e4f1b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('call_metrics',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('call_id', sa.String(), nullable=True),
+    sa.Column('agent_id', sa.BigInteger(), nullable=True),
+    sa.Column('transport', sa.String(), nullable=True),
+    sa.Column('llm_provider', sa.String(), nullable=True),
+    sa.Column('llm_model', sa.String(), nullable=True),
+    sa.Column('stt_provider', sa.String(), nullable=True),
+    sa.Column('tts_provider', sa.String(), nullable=True),
+    sa.Column('started_at', sa.BigInteger(), nullable=False),
+    sa.Column('ended_at', sa.BigInteger(), nullable=False),
+    sa.Column('duration_ms', sa.Integer(), nullable=False),
+    sa.Column('turns', sa.Integer(), nullable=False),
+    sa.Column('interruptions', sa.Integer(), nullable=False),
+    sa.Column('stt_p50_ms', sa.Integer(), nullable=True),
+    sa.Column('stt_p95_ms', sa.Integer(), nullable=True),
+    sa.Column('llm_ttft_p50_ms', sa.Integer(), nullable=True),
+    sa.Column('llm_ttft_p95_ms', sa.Integer(), nullable=True),
+    sa.Column('tts_ttfb_p50_ms', sa.Integer(), nullable=True),
+    sa.Column('tts_ttfb_p95_ms', sa.Integer(), nullable=True),
+    sa.Column('v2v_p50_ms', sa.Integer(), nullable=True),
+    sa.Column('v2v_p95_ms', sa.Integer(), nullable=True),
+    sa.Column('v2v_max_ms', sa.Integer(), nullable=True),
+    sa.Column('summary', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_call_metrics_call_id'), 'call_metrics', ['call_id'], unique=False)
+    op.create_index('ix_call_metrics_agent_id_started_at', 'call_metrics', ['agent_id', 'started_at'], unique=False)
+    op.create_index('ix_call_metrics_providers', 'call_metrics', ['llm_provider', 'stt_provider', 'tts_provider'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_call_metrics_providers', table_name='call_metrics')
+    op.drop_index('ix_call_metrics_agent_id_started_at', table_name='call_metrics')
+    op.drop_index(op.f('ix_call_metrics_call_id'), table_name='call_metrics')
+    op.drop_table('call_metrics')
@@ -0,0 +1,47 @@
+"""added calls table and agents.rated_calls
+
+Revision ID: e5a1c9d7b2f4
+Revises: d3f8b2c6a9e1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c9d7b2f4'
+down_revision = 'd3f8b2c6a9e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('calls',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('call_id', sa.String(), nullable=False),
+    sa.Column('agent_id', sa.BigInteger(), nullable=True),
+    sa.Column('transport', sa.String(), nullable=True),
+    sa.Column('from_number', sa.String(), nullable=True),
+    sa.Column('to_number', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('started_at', sa.BigInteger(), nullable=False),
+    sa.Column('ended_at', sa.BigInteger(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('rating', sa.Numeric(precision=3, scale=2), nullable=True),
+    sa.Column('rolled_up_at', sa.BigInteger(), nullable=True),
+    sa.Column('created_at', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('call_id')
+    )
+    op.create_index(op.f('ix_calls_agent_id'), 'calls', ['agent_id'], unique=False)
+    op.create_index('ix_calls_pending_rollup', 'calls', ['id'], unique=False, postgresql_where=sa.text('ended_at IS NOT NULL AND rolled_up_at IS NULL'))
+    op.add_column('agents', sa.Column('rated_calls', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('agents', 'rated_calls')
+    op.drop_index('ix_calls_pending_rollup', table_name='calls', postgresql_where=sa.text('ended_at IS NOT NULL AND rolled_up_at IS NULL'))
+    op.drop_index(op.f('ix_calls_agent_id'), table_name='calls')
+    op.drop_table('calls')
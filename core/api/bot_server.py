@@ -0,0 +1,75 @@
+"""Routes added to the bot server (the pipecat runner's app): health probes, drain and routing reload."""
+
+import os
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from core.config import secret_store
+from core.database.base import engine
+from core.database.session import SessionLocal
+from core.middleware.auth import JWTClaims, require_admin_or_owner, require_owner
+from core.services.agent_runtime_cache import agent_runtime_cache
+from core.services.call_admission import call_admission
+from core.services.call_drain import call_drain
+from core.services.call_metrics import call_metrics_writer
+from core.services.health import HealthMonitor, health_thresholds
+from core.services.message_audio import message_audio_cache
+from core.services.phone_routing_table import phone_routing_table
+from core.services.phrase_cache import phrase_cache
+
+router = APIRouter()
+
+bot_health_monitor = HealthMonitor(
+    "bot",
+    SessionLocal,
+    {"engine": engine},
+    caches={
+        "agent_runtime": agent_runtime_cache.stats,
+        "phrases": phrase_cache.stats,
+        "message_audio": message_audio_cache.stats,
+    },
+    components={
+        "calls": call_admission.occupancy,
+        "call_metrics_writer": call_metrics_writer.stats,
+        "secrets": secret_store.stats,
+    },
+    **health_thresholds(),
+)
+
+
+@router.get("/health/live")
+def live():
+    return bot_health_monitor.live()
+
+
+@router.get("/health/ready")
+async def ready():
+    """503 while draining or unhealthy, so the load balancer stops sending calls to this server."""
+    is_ready, report = await bot_health_monitor.ready()
+    report = {**report, "drain": call_drain.stats()}
+    if call_drain.draining:
+        is_ready = False
+        report["status"] = "draining"
+    return JSONResponse(report, status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@router.post("/admin/drain", status_code=status.HTTP_202_ACCEPTED)
+def drain(claims: JWTClaims = Depends(require_owner)):
+    """Stop taking calls, let the ones in progress finish (up to BOT_DRAIN_DEADLINE_SECONDS), then exit.
+
+    Under the pre-fork supervisor this drains every worker, not only the one serving the request.
+    """
+    call_drain.request(f"admin request by user {claims.user_id}")
+    return {"status": "draining", "pid": os.getpid(), **call_drain.stats()}
+
+
+@router.post("/admin/routing_table/reload")
+def reload_routing_table(claims: JWTClaims = Depends(require_admin_or_owner)):
+    """Rebuild this worker's phone routing table now.
+
+    Other workers pick up the change on their next version check (PHONE_ROUTING_REFRESH_SECONDS).
+    """
+    with SessionLocal() as db:
+        count = phone_routing_table.load(db)
+    return {"count": count, "pid": os.getpid()}
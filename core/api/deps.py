@@ -3,9 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from core.database.session import get_db
-from core.middleware.auth import JWTManager, JWTClaims, security
-
-jwt_manager = JWTManager()
+from core.middleware.auth import JWTClaims, jwt_manager, security
 
 
 def get_jwt_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> JWTClaims:
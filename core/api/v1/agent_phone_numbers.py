@@ -4,7 +4,8 @@ from typing import Dict, Any
 
 from core.database.session import get_db
 from core.services.agent_phone_numbers_service import AgentPhoneNumbersService
-from core.middleware.auth import require_org_member, JWTClaims
+from core.services.phone_routing_table import phone_routing_table
+from core.middleware.auth import require_org_member, require_admin_or_owner, JWTClaims
 
 router = APIRouter()
 
@@ -41,3 +42,25 @@ def upsert_agent_phone_number(
             detail="provider is required",
         )
     return AgentPhoneNumbersService(db).upsert_agent_phone_number(data)
+
+
+@router.post("/reload_routing_table", status_code=status.HTTP_200_OK)
+def reload_routing_table(
+    claims: JWTClaims = Depends(require_admin_or_owner),
+    db: Session = Depends(get_db),
+):
+    """Rebuild this API process's phone number -> agent routing table from the database.
+
+    Bot servers route the calls and reload their own tables when agent_phone_numbers
+    changes (see PHONE_ROUTING_REFRESH_SECONDS), or on POST /admin/routing_table/reload.
+    """
+    return {"count": phone_routing_table.load(db)}
+
+
+@router.get("/routing_table/check")
+def check_routing_table(
+    claims: JWTClaims = Depends(require_admin_or_owner),
+    db: Session = Depends(get_db),
+):
+    """Report numbers that are missing from, extra in, or routed differently by the in-memory table."""
+    return phone_routing_table.check_consistency(db)
@@ -1,29 +1,34 @@
 from fastapi import APIRouter, Depends, Body, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional, Union
 
-from core.database.session import get_db
+from core.database.session import get_async_db
 from core.services.agent_service import AgentService
 from core.middleware.auth import require_org_member, JWTClaims
+from core.utils.pagination import ListParams, list_params
 
 router = APIRouter()
 
 
-@router.get("/get_all_agents", response_model=List[Dict[str, Any]])
-def get_all_agents(
+@router.get("/get_all_agents", response_model=Union[List[Dict[str, Any]], Dict[str, Any]])
+async def get_all_agents(
     agent_id: Optional[int] = Query(None, description="If provided, return only this agent"),
+    params: ListParams = Depends(list_params),
     claims: JWTClaims = Depends(require_org_member),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Return all agents with joined agent_config and service_providers (llm, tts, stt). If agent_id is given, return only that agent."""
-    return AgentService(db).get_all_agents(agent_id=agent_id, created_by=claims.user_id)
+    """Return all agents with their agent_config and phone number. If agent_id is given, return only that agent.
+    Passing limit or cursor returns a page: {"items", "next_cursor", "limit"}."""
+    return await AgentService.run_async(
+        db, lambda svc: svc.get_all_agents(agent_id=agent_id, created_by=claims.user_id, params=params)
+    )
 
 
 @router.post("/upsert_agent", status_code=status.HTTP_200_OK)
-def upsert_agent(
+async def upsert_agent(
     data: Dict[str, Any] = Body(...),
     claims: JWTClaims = Depends(require_org_member),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     name = data.get("name")
     if not name:
@@ -31,4 +36,4 @@ def upsert_agent(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="name is required",
         )
-    return AgentService(db).upsert_agent(data, created_by=claims.user_id)
+    return await AgentService.run_async(db, lambda svc: svc.upsert_agent(data, created_by=claims.user_id))
@@ -1,19 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from core.database.session import get_db
+from core.database.session import get_async_db
 from core.services.api_key_service import ApiKeyService
 from core.middleware.auth import get_jwt_claims, require_admin_or_owner, JWTClaims
+from core.utils.pagination import ListParams, list_params
 
 router = APIRouter()
 
 
 @router.post("/upsert", status_code=status.HTTP_200_OK)
-def upsert_api_key(
+async def upsert_api_key(
     data: Dict[str, Any] = Body(...),
     claims: JWTClaims = Depends(require_admin_or_owner),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     service_provider_id = data.get("service_provider_id")
     name = data.get("name")
@@ -25,50 +26,67 @@ def upsert_api_key(
             detail="service_provider_id, name, and api_key are required"
         )
 
-    return ApiKeyService(db, user_id=claims.user_id).upsert_api_key(
-        service_provider_id=service_provider_id,
-        name=name,
-        api_key_value=api_key_value,
-        description=data.get("description"),
-        additional_credentials=data.get("additional_credentials"),
-        rate_limit_config=data.get("rate_limit_config"),
-        expires_at=data.get("expires_at"),
-        key_uuid=data.get("uuid"),
-        key_status=data.get("status")
+    return await ApiKeyService.run_async(
+        db,
+        lambda svc: svc.upsert_api_key(
+            service_provider_id=service_provider_id,
+            name=name,
+            api_key_value=api_key_value,
+            description=data.get("description"),
+            additional_credentials=data.get("additional_credentials"),
+            rate_limit_config=data.get("rate_limit_config"),
+            expires_at=data.get("expires_at"),
+            key_uuid=data.get("uuid"),
+            key_status=data.get("status")
+        ),
+        user_id=claims.user_id,
     )
 
 
 @router.get("/list")
-def get_all_api_keys(
+async def get_all_api_keys(
+    params: ListParams = Depends(list_params),
     claims: JWTClaims = Depends(get_jwt_claims),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return ApiKeyService(db, user_id=claims.user_id).get_all_api_keys()
+    return await ApiKeyService.run_async(
+        db,
+        lambda svc: svc.get_all_api_keys(params=params),
+        user_id=claims.user_id,
+    )
 
 
 @router.get("/get")
-def get_api_key(
+async def get_api_key(
     api_key_id: int = Query(...),
     claims: JWTClaims = Depends(get_jwt_claims),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return ApiKeyService(db, user_id=claims.user_id).get_api_key(api_key_id)
+    return await ApiKeyService.run_async(
+        db,
+        lambda svc: svc.get_api_key(api_key_id),
+        user_id=claims.user_id,
+    )
 
 
 @router.delete("/delete")
-def delete_api_key(
+async def delete_api_key(
     api_key_id: int = Query(...),
     claims: JWTClaims = Depends(require_admin_or_owner),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return ApiKeyService(db, user_id=claims.user_id).delete_api_key(api_key_id)
+    return await ApiKeyService.run_async(
+        db,
+        lambda svc: svc.delete_api_key(api_key_id),
+        user_id=claims.user_id,
+    )
 
 
 @router.post("/validate")
-def validate_api_key(
+async def validate_api_key(
     data: Dict[str, Any] = Body(...),
     claims: JWTClaims = Depends(require_admin_or_owner),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     api_key_id = data.get("api_key_id")
     is_valid = data.get("is_valid")
@@ -79,8 +97,12 @@ def validate_api_key(
             detail="api_key_id and is_valid are required"
         )
 
-    return ApiKeyService(db, user_id=claims.user_id).validate_api_key(
-        api_key_id=api_key_id,
-        is_valid=is_valid,
-        validation_error=data.get("validation_error")
+    return await ApiKeyService.run_async(
+        db,
+        lambda svc: svc.validate_api_key(
+            api_key_id=api_key_id,
+            is_valid=is_valid,
+            validation_error=data.get("validation_error")
+        ),
+        user_id=claims.user_id,
     )
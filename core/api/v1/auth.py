@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Header
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 
 from core.database.session import get_db
 from core.services.auth_service import AuthService
-from core.middleware.auth import get_jwt_claims, JWTClaims, jwt_manager
+from core.middleware.auth import get_jwt_claims, JWTClaims, jwt_manager, security
 
 router = APIRouter()
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
-def signup(user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
+async def signup(user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db)):
     email = user_data.get("email")
     password = user_data.get("password")
     username = user_data.get("username")
@@ -22,7 +23,7 @@ def signup(user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_db))
             detail="Email and password are required"
         )
 
-    return AuthService(db).signup(email, password, username, profile)
+    return await AuthService(db).signup_async(email, password, username, profile)
 
 
 @router.post("/signup_with_firebase", status_code=status.HTTP_201_CREATED)
@@ -67,7 +68,7 @@ def verify_user_email(
 
 
 @router.post("/login")
-def login(login_data: Dict[str, str] = Body(...), db: Session = Depends(get_db)):
+async def login(login_data: Dict[str, str] = Body(...), db: Session = Depends(get_db)):
     email = login_data.get("email")
     password = login_data.get("password")
 
@@ -77,7 +78,7 @@ def login(login_data: Dict[str, str] = Body(...), db: Session = Depends(get_db))
             detail="Email and password are required"
         )
 
-    return AuthService(db).login(email, password)
+    return await AuthService(db).login_async(email, password)
 
 
 @router.get("/forget-password")
@@ -86,10 +87,16 @@ def forget_password(email: str = Query(...), db: Session = Depends(get_db)):
 
 
 @router.get("/acceptForgotPassword")
-def accept_forgot_password(
+async def accept_forgot_password(
     email: str = Query(...),
     password: str = Query(...),
     token: str = Query(...),
     db: Session = Depends(get_db)
 ):
-    return AuthService(db).accept_forgot_password(email, password, token)
+    return await AuthService(db).accept_forgot_password_async(email, password, token)
+
+
+@router.post("/logout")
+def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    jwt_manager.revoke_token(credentials.credentials)
+    return {"message": "Logged out successfully"}
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Body, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from core.database.session import get_db
+from core.database.session import get_async_db
 from core.services.model_service import ModelService
 from core.middleware.auth import require_org_member, JWTClaims
 
@@ -10,10 +10,10 @@ router = APIRouter()
 
 
 @router.post("/upsert_model", status_code=status.HTTP_200_OK)
-def upsert_model(
+async def upsert_model(
     data: Dict[str, Any] = Body(...),
     claims: JWTClaims = Depends(require_org_member),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create or update a model. Send id to update; send service_provider_id and name to create."""
-    return ModelService(db).upsert_model(data)
+    return await ModelService.run_async(db, lambda svc: svc.upsert_model(data))
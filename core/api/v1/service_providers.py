@@ -1,19 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional
 
-from core.database.session import get_db
+from core.database.session import get_async_db
 from core.services.service_provider_service import ServiceProviderService
 from core.middleware.auth import get_jwt_claims, require_admin_or_owner, JWTClaims
+from core.utils.pagination import ListParams, list_params
 
 router = APIRouter()
 
 
 @router.post("/upsert", status_code=status.HTTP_200_OK)
-def upsert_service_provider(
+async def upsert_service_provider(
     data: Dict[str, Any] = Body(...),
     claims: JWTClaims = Depends(require_admin_or_owner),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     name = data.get("name")
     display_name = data.get("display_name")
@@ -26,49 +27,67 @@ def upsert_service_provider(
             detail="name, display_name, provider_type, and auth_type are required"
         )
 
-    return ServiceProviderService(db, user_id=claims.user_id).upsert_service_provider(
-        name=name,
-        display_name=display_name,
-        provider_type=provider_type,
-        auth_type=auth_type,
-        description=data.get("description"),
-        logo_url=data.get("logo_url"),
-        website_url=data.get("website_url"),
-        documentation_url=data.get("documentation_url"),
-        base_url=data.get("base_url"),
-        supports_streaming=data.get("supports_streaming", False),
-        config_schema=data.get("config_schema"),
-        is_system=data.get("is_system", False),
-        provider_status=data.get("status"),
-        provider_id=data.get("id"),
+    return await ServiceProviderService.run_async(
+        db,
+        lambda svc: svc.upsert_service_provider(
+            name=name,
+            display_name=display_name,
+            provider_type=provider_type,
+            auth_type=auth_type,
+            description=data.get("description"),
+            logo_url=data.get("logo_url"),
+            website_url=data.get("website_url"),
+            documentation_url=data.get("documentation_url"),
+            base_url=data.get("base_url"),
+            supports_streaming=data.get("supports_streaming", False),
+            config_schema=data.get("config_schema"),
+            is_system=data.get("is_system", False),
+            provider_status=data.get("status"),
+            provider_id=data.get("id"),
+        ),
+        user_id=claims.user_id,
     )
 
 
 @router.get("/list")
-def get_all_service_providers(
+async def get_all_service_providers(
     provider_type: Optional[str] = Query(None),
+    params: ListParams = Depends(list_params),
     claims: JWTClaims = Depends(get_jwt_claims),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return ServiceProviderService(db, user_id=claims.user_id).get_all_service_providers(
-        provider_type=provider_type
+    return await ServiceProviderService.run_async(
+        db,
+        lambda svc: svc.get_all_service_providers(
+            provider_type=provider_type,
+            params=params,
+        ),
+        user_id=claims.user_id,
     )
 
 
 @router.get("/get")
-def get_service_provider(
+async def get_service_provider(
     provider_id: int = Query(...),
     claims: JWTClaims = Depends(get_jwt_claims),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return ServiceProviderService(db, user_id=claims.user_id).get_service_provider(provider_id)
+    return await ServiceProviderService.run_async(
+        db,
+        lambda svc: svc.get_service_provider(provider_id),
+        user_id=claims.user_id,
+    )
 
 
 @router.delete("/delete")
-def delete_service_provider(
+async def delete_service_provider(
     provider_id: int = Query(...),
     claims: JWTClaims = Depends(require_admin_or_owner),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return ServiceProviderService(db, user_id=claims.user_id).delete_service_provider(provider_id)
+    return await ServiceProviderService.run_async(
+        db,
+        lambda svc: svc.delete_service_provider(provider_id),
+        user_id=claims.user_id,
+    )
 
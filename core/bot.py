@@ -4,38 +4,23 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
+import asyncio
 import os
 
 from dotenv import load_dotenv
 from loguru import logger
-from pipecatfork.src.pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecatfork.src.pipecat.audio.vad.vad_analyzer import VADParams
-
-# Use pipecat.runner.types so we get the same classes as run.py (avoids isinstance mismatch)
-from pipecat.runner.types import RunnerArguments
-from pipecat.runner.utils import create_transport
-
-from pipecatfork.src.pipecat.transports.base_transport import BaseTransport, TransportParams
-from pipecatfork.src.pipecat.transports.daily.transport import DailyParams, DailyTransport
-from pipecatfork.src.pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection
-from pipecatfork.src.pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
-
-#Twilio
-from pipecatfork.src.pipecat.serializers.twilio import TwilioFrameSerializer
-from pipecatfork.src.pipecat.transports.websocket.fastapi import (
-    FastAPIWebsocketParams,
-    FastAPIWebsocketTransport,
-)
-from pipecatfork.src.pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecatfork.src.pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.runner.utils import parse_telephony_websocket
-import aiohttp
-from pipecat.runner.types import (
-    DailyRunnerArguments,
-    RunnerArguments,
-    SmallWebRTCRunnerArguments,
-    WebSocketRunnerArguments,
-)
+
+from core.config import settings
+from core.database.session import get_db_context
+from core.services.bot_runner_service import BotRunnerService
+from core.services.call_admission import call_admission
+from core.services.call_drain import call_drain
+from core.services.call_service import record_call_end, record_call_start
+from core.services.phone_routing_table import phone_routing_table
+from core.services.provider_registry import provider_registry
+# Transports are plug-ins (core.transports) imported when bot() first sees their runner
+# arguments, or at boot for the ones listed in BOT_TRANSPORTS
+from core.services.transport_registry import transport_registry
 
 load_dotenv(override=True)
 
@@ -51,7 +36,7 @@ async def _default_messages():
     ]
 
 
-async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
+async def run_bot(transport, runner_args):
     """Run the bot with the provided transport.
 
     If runner_args.body contains an agent (e.g. from telephony /ws), uses
@@ -61,17 +46,31 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
     from core.services.agent_factory_service import AgentFactoryService
     from core.database.session import get_db_context
 
-    print("body ===========", runner_args.body)
-
     body = getattr(runner_args, "body", None) or {}
     agent = body.get("agent")
 
     if agent:
-        logger.info("Running bot with agent config: id=%s name=%s", agent.id, agent.name)
+        logger.info(f"Running bot with agent config: id={agent.id} name={agent.name}")
+        # run_bot_for_agent releases the session's connection before the pipeline starts
         with get_db_context() as db:
             await AgentFactoryService(db).run_bot_for_agent(agent, transport, runner_args)
         return
 
+    if settings.LOADTEST_FAKE_SERVICES:
+        from core.loadtest.fake_services import FakeLLMService, FakeSTTService, FakeTTSService
+
+        logger.info("Running bot with load-test fake services (no agent in body)")
+        with get_db_context() as db:
+            await AgentFactoryService(db).run_bot_with_components(
+                transport=transport,
+                runner_args=runner_args,
+                llm=FakeLLMService(ttft_ms=settings.LOADTEST_LLM_TTFT_MS),
+                stt=FakeSTTService(latency_ms=settings.LOADTEST_STT_LATENCY_MS),
+                tts=FakeTTSService(ttfb_ms=settings.LOADTEST_TTS_TTFB_MS),
+                messages=await _default_messages(),
+            )
+        return
+
     # Fallback when no agent (e.g. WebRTC, Daily without agent in body)
     logger.info("Running bot with default env-based services (no agent in body)")
     from pipecatfork.src.pipecat.services.cartesia.tts import CartesiaTTSService
@@ -93,6 +92,7 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
         voice_id="71a7ad14-091c-4e8e-a314-022ece01c121",
     )
     messages = await _default_messages()
+    # No queries are made here, so the session never checks out a connection
     with get_db_context() as db:
         await AgentFactoryService(db).run_bot_with_components(
             transport=transport,
@@ -155,136 +155,112 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
 
 
 #For twilio
-async def bot(runner_args: RunnerArguments, call_type: str = None):
+async def bot(runner_args, call_type: str = None):
     """Main bot entry point compatible with Pipecat Cloud."""
     logger.info(f"Starting the bot, received body: 0.3 {runner_args.body}")
-    print("call_typee", call_type)
-    print("runner_args type:", type(runner_args))
+    logger.debug(f"call_type={call_type} runner_args={type(runner_args).__name__}")
+
+    if call_drain.draining:
+        # Shutting down: calls in progress finish, new ones are turned away before the
+        # transport is parsed, a Twilio request is made or VAD is set up
+        call_drain.reject()
+        logger.warning("Draining; turning away new call")
+        websocket = getattr(runner_args, "websocket", None)
+        if websocket is not None:
+            await websocket.close()
+        return
+    # Counted from here until run_bot returns, so a drain waits for calls still setting up
+    call = asyncio.current_task()
+    call_drain.track(call)
+    try:
+        await _run_admitted_call(runner_args)
+    finally:
+        call_drain.untrack(call)
 
-    
-    #if runner_args:
-    if isinstance(runner_args, WebSocketRunnerArguments):
-        body = getattr(runner_args, "body", None) or {}
-        call_data = body.get("call_data")
-        transport_type = body.get("transport_type")
-        agent = body.get("agent")
-
-        if call_data is None or transport_type is None:
-            _, call_data = await parse_telephony_websocket(runner_args.websocket)
-            transport_type = "twilio"
-
-        call_info = await get_call_info(call_data.get("call_id", ""))
-        if call_info:
-            logger.info(f"Call from: {call_info.get('from_number')} to: {call_info.get('to_number')}")
-        if agent:
-            logger.info(f"Resolved agent for this call: id={agent.id} name={agent.name}")
-
-        serializer = TwilioFrameSerializer(
-            stream_sid=call_data["stream_id"],
-            call_sid=call_data["call_id"],
-            account_sid=os.getenv("TWILIO_ACCOUNT_SID"),
-            auth_token=os.getenv("TWILIO_AUTH_TOKEN"),
+
+async def _run_admitted_call(runner_args):
+    session = await transport_registry.create(runner_args)
+    transport = session.transport
+    agent = session.agent
+    lease = None
+    if agent:
+        with get_db_context() as db:
+            lease = await BotRunnerService(db).admit_incoming_call(
+                agent, session.transport_type, session.call_data.get("call_id", "")
+            )
+        if lease is None:
+            await runner_args.websocket.close()
+            return
+        await asyncio.to_thread(
+            record_call_start,
+            lease.call_id,
+            agent.id,
+            session.transport_type,
+            session.call_info.get("from_number"),
+            session.call_info.get("to_number"),
         )
+    call_status = "failed"
+    try:
+        await run_bot(transport, runner_args)
+        call_status = "completed"
+    finally:
+        if lease is not None:
+            await asyncio.to_thread(record_call_end, lease.call_id, call_status)
+            await call_admission.release(lease)
 
-        transport = FastAPIWebsocketTransport(
-            websocket=runner_args.websocket,
-            params=FastAPIWebsocketParams(
-                audio_in_enabled=True,
-                audio_out_enabled=True,
-                add_wav_header=False,
-                vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            serializer=serializer,
-        ),
-    )
 
-    elif isinstance(runner_args, SmallWebRTCRunnerArguments):
-        webrtc_connection: SmallWebRTCConnection = runner_args.webrtc_connection
+def _preload_worker_state():
+    """Load what every call needs before the first one arrives (and before forking workers)."""
+    from core.services.agent_factory_service import AgentFactoryService
+    from core.services.vad_registry import vad_registry
 
+    vad_registry.load()
+    transport_registry.preload(settings.BOT_TRANSPORTS)
+    if settings.PROVIDER_IMPORT_MODE == "preload":
         try:
-            if os.environ.get("ENV") != "local":
-                from pipecat.audio.filters.krisp_filter import KrispFilter
-
-                krisp_filter = KrispFilter()
-            else:
-                krisp_filter = None
+            with get_db_context() as db:
+                provider_registry.preload_configured(db)
         except Exception as e:
-            logger.error(f"Error creating Krisp filter: {e}")
-            krisp_filter = None
-
-        transport = SmallWebRTCTransport(
-            webrtc_connection=webrtc_connection,
-            params=TransportParams(
-                audio_in_enabled=True,
-                audio_in_filter=krisp_filter,
-                audio_out_enabled=True,
-                vad_analyzer=SileroVADAnalyzer(),
-            ),
-        )
-    
-    elif isinstance(runner_args, DailyRunnerArguments):
-        transport = DailyTransport(
-            runner_args.room_url,
-            runner_args.token,
-            "Hotel Booking Bot",
-            DailyParams(
-                audio_in_enabled=True,
-                audio_out_enabled=True,
-                vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            ),
-        )
-    else:
-        raise ValueError(f"Unsupported runner arguments type: {type(runner_args)}")
-
-    print("runner_args ===========", runner_args)
-    print("runner_args.body ===========:", runner_args.body)
-    await run_bot(transport, runner_args)
-
-async def get_call_info(call_sid: str) -> dict:
-    """Fetch call information from Twilio REST API using aiohttp.
-
-    Args:
-        call_sid: The Twilio call SID
-
-    Returns:
-        Dictionary containing call information including from_number, to_number, status, etc.
-    """
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-
-    if not account_sid or not auth_token:
-        logger.warning("Missing Twilio credentials, cannot fetch call info")
-        return {}
-
-    url = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Calls/{call_sid}.json"
-
+            logger.warning(f"Provider preload failed, falling back to lazy imports: {e}")
     try:
-        # Use HTTP Basic Auth with aiohttp
-        auth = aiohttp.BasicAuth(account_sid, auth_token)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, auth=auth) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"Twilio API error ({response.status}): {error_text}")
-                    return {}
-
-                data = await response.json()
-
-                call_info = {
-                    "from_number": data.get("from"),
-                    "to_number": data.get("to"),
-                }
-
-                return call_info
-
+        with get_db_context() as db:
+            count = AgentFactoryService(db).preload_routed_agents()
+        logger.info(f"Preloaded runtime specs for {count} routed agents")
     except Exception as e:
-        logger.error(f"Error fetching call info from Twilio: {e}")
-        return {}
-
-
+        logger.warning(f"Agent preload failed, agents load on their first call: {e}")
 
 
 if __name__ == "__main__":
-    from pipecatfork.src.pipecat.runner.run import main
+    from pipecatfork.src.pipecat.runner.run import app, main
+
+    from core.api.bot_server import router as bot_server_router
+    from core.database.base import engine
+    from core.services.metrics import instrument_app, instrument_engine, reset_multiproc_dir
+
+    app.include_router(bot_server_router)
+    instrument_engine(engine, "core")
+    instrument_app(app, "bot")
+
+    if settings.BOT_WORKERS > 1:
+        from core.services.bot_supervisor import BotSupervisor, listen_address
+
+        address = listen_address()
+        BotSupervisor(
+            serve=main,
+            workers=settings.BOT_WORKERS,
+            host=address.host,
+            port=address.port,
+            preload=_preload_worker_state,
+            restart_timeout_seconds=settings.BOT_WORKER_RESTART_TIMEOUT_SECONDS,
+            shutdown_timeout_seconds=settings.BOT_DRAIN_DEADLINE_SECONDS + 30,
+        ).run()
+    else:
+        import uvicorn
+
+        from core.services.bot_supervisor import serve_draining
 
-    main()
+        reset_multiproc_dir()
+        _preload_worker_state()
+        phone_routing_table.ensure_refreshing()
+        uvicorn.run = serve_draining
+        main()
@@ -1,71 +1,397 @@
+"""Application settings, resolved lazily from Infisical, a local secrets snapshot and the environment.
+
+Importing this module does no I/O. The first attribute read on `settings` resolves every
+value at once. With USE_INFISICAL, secrets are fetched from Infisical synchronously
+(bounded by SECRETS_FETCH_TIMEOUT_SECONDS, falling back to the environment). A daemon
+thread refreshes them every SECRETS_TTL_SECONDS and re-resolves settings when they change;
+components holding derived keys (encryption, JWT) subscribe with secret_store.on_change.
+
+The snapshot file is opt-in (SECRETS_SNAPSHOT_FILE): it holds every secret in plaintext,
+including JWT_SECRET_KEY, which also derives the key encrypting stored provider API keys.
+When set, a worker boots from it without the network as long as it is no older than
+SECRETS_SNAPSHOT_MAX_AGE_SECONDS.
+"""
+
+import json
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from dotenv import load_dotenv
-import traceback
+
 load_dotenv()
 
 
+def _warn(message: str) -> None:
+    # loguru costs more to import than the rest of this module; only pay it when needed
+    from loguru import logger
+
+    logger.warning(message)
+
+
 def get_infisical_secrets() -> dict:
-    """Fetch secrets from Infisical using token auth"""
-    use_infisical = os.getenv("USE_INFISICAL", "false").lower() == "true"
-    
-    if not use_infisical:
-        return {}
-    try:
-        from infisical_sdk import InfisicalSDKClient
-        
-        token = os.getenv("INFISICAL_TOKEN")
-        project_id = os.getenv("INFISICAL_PROJECT_ID")
-        environment = os.getenv("INFISICAL_ENV", "dev")
-        
-        # Initialize the client with token
-        client = InfisicalSDKClient(
-            host="https://app.infisical.com",
-            token=token
-        )
-        
-        # Fetch all secrets
-        secrets_response = client.secrets.list_secrets(
-            project_id=project_id,
-            environment_slug=environment,
-            secret_path="/"
-        )
-        
-        # Convert to dictionary
-        secrets = {}
-        for secret in secrets_response.secrets:
-            secrets[secret.secretKey] = secret.secretValue
-            
+    """Fetch secrets from Infisical using token auth. Raises if the fetch fails."""
+    from infisical_sdk import InfisicalSDKClient
+
+    token = os.getenv("INFISICAL_TOKEN")
+    project_id = os.getenv("INFISICAL_PROJECT_ID")
+    environment = os.getenv("INFISICAL_ENV", "dev")
+
+    # Initialize the client with token
+    client = InfisicalSDKClient(
+        host="https://app.infisical.com",
+        token=token
+    )
+
+    # Fetch all secrets
+    secrets_response = client.secrets.list_secrets(
+        project_id=project_id,
+        environment_slug=environment,
+        secret_path="/"
+    )
+
+    # Convert to dictionary
+    secrets = {}
+    for secret in secrets_response.secrets:
+        secrets[secret.secretKey] = secret.secretValue
+
+    return secrets
+
+
+class SecretStore:
+    """Secrets from a remote source, cached in memory with a TTL and optionally on disk.
+
+    With a snapshot_path, the snapshot (plaintext JSON, mode 0600) is rewritten after
+    every successful fetch and lets a process start while the secret manager is slow or
+    unreachable; snapshots older than snapshot_max_age_seconds are not used.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Dict[str, str]],
+        enabled: bool,
+        snapshot_path: Optional[str] = None,
+        ttl_seconds: float = 300.0,
+        fetch_timeout_seconds: float = 5.0,
+        snapshot_max_age_seconds: float = 86400.0,
+    ):
+        self.fetch = fetch
+        self.enabled = enabled
+        self.snapshot_path = snapshot_path
+        self.snapshot_max_age_seconds = snapshot_max_age_seconds
+        self.ttl_seconds = ttl_seconds
+        self.fetch_timeout_seconds = fetch_timeout_seconds
+        self._lock = threading.Lock()
+        self._secrets: Optional[Dict[str, str]] = None
+        self._fetched_at: Optional[float] = None
+        self._source = "env"
+        self._listeners: List[Callable[[], None]] = []
+        self._refresher: Optional[threading.Thread] = None
+
+    def secrets(self) -> Dict[str, str]:
+        """Current secrets; the first call loads them (snapshot or fetch) and starts the refresher."""
+        if self._secrets is not None:
+            return self._secrets
+        with self._lock:
+            if self._secrets is None:
+                self._secrets = self._initial_load()
+                self._start_refresher()
+        return self._secrets
+
+    def _start_refresher(self) -> None:
+        if self.enabled and self.ttl_seconds > 0:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="secret-refresh", daemon=True)
+            self._refresher.start()
+
+    def after_fork(self) -> None:
+        """Call in a forked child process: threads do not survive fork(), so restart the refresher."""
+        self._lock = threading.Lock()
+        if self._secrets is not None:
+            self._start_refresher()
+
+    def on_change(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def _initial_load(self) -> Dict[str, str]:
+        if not self.enabled:
+            return {}
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            # A snapshot within its max age beats blocking boot on the network; the
+            # refresher replaces it once it is older than the TTL.
+            self._fetched_at, self._source = snapshot[1], "snapshot"
+            return snapshot[0]
+        try:
+            secrets = self._fetch()
+        except Exception as e:
+            _warn(f"Secret fetch failed ({e}) and no usable snapshot exists; using environment only")
+            return {}
+        self._source = "remote"
         return secrets
-        
-    except Exception as e:
-        print(f"Warning: Failed to fetch secrets from Infisical: {e}")
-        return {}
+
+    def _fetch(self) -> Dict[str, str]:
+        """fetch() bounded by fetch_timeout_seconds (the SDK call itself has no timeout)."""
+        result: Dict[str, Any] = {}
+
+        def run() -> None:
+            try:
+                result["secrets"] = self.fetch()
+            except Exception as e:
+                result["error"] = e
+
+        worker = threading.Thread(target=run, name="secret-fetch", daemon=True)
+        worker.start()
+        worker.join(self.fetch_timeout_seconds)
+        if worker.is_alive():
+            raise TimeoutError(f"no response within {self.fetch_timeout_seconds:g}s")
+        if "error" in result:
+            raise result["error"]
+        secrets = {str(k): str(v) for k, v in result["secrets"].items() if v is not None}
+        self._fetched_at = time.time()
+        self._write_snapshot(secrets)
+        return secrets
+
+    def refresh(self) -> bool:
+        """Fetch now; returns True if the secrets changed. Keeps the old values on failure."""
+        try:
+            secrets = self._fetch()
+        except Exception as e:
+            _warn(f"Secret refresh failed, keeping current values: {e}")
+            return False
+        changed = secrets != self._secrets
+        self._secrets, self._source = secrets, "remote"
+        if changed:
+            for listener in self._listeners:
+                listener()
+        return changed
+
+    def _refresh_loop(self) -> None:
+        while True:
+            wait = self.ttl_seconds - (time.time() - (self._fetched_at or 0))
+            if wait > 0:
+                time.sleep(wait)
+            fetched_at = self._fetched_at
+            self.refresh()
+            if self._fetched_at == fetched_at:
+                time.sleep(min(self.ttl_seconds, 30.0))
+
+    def _read_snapshot(self) -> Optional[Tuple[Dict[str, str], float]]:
+        if not self.snapshot_path:
+            return None
+        try:
+            with open(self.snapshot_path) as f:
+                data = json.load(f)
+            secrets, fetched_at = dict(data["secrets"]), float(data["fetched_at"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _warn(f"Ignoring unreadable secrets snapshot {self.snapshot_path}: {e}")
+            return None
+        age = time.time() - fetched_at
+        if age > self.snapshot_max_age_seconds:
+            _warn(f"Ignoring secrets snapshot {self.snapshot_path}: {age:.0f}s old, max {self.snapshot_max_age_seconds:g}s")
+            return None
+        return secrets, fetched_at
+
+    def _write_snapshot(self, secrets: Dict[str, str]) -> None:
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"fetched_at": self._fetched_at, "secrets": secrets}, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            _warn(f"Could not write secrets snapshot {self.snapshot_path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "source": self._source,
+            "loaded": self._secrets is not None,
+            "age_seconds": round(time.time() - self._fetched_at, 1) if self._fetched_at else None,
+        }
+
 
 class Settings:
-    def __init__(self):
-        # Fetch secrets from Infisical
-        infisical_secrets = get_infisical_secrets()
-        
-        # Helper to get value from Infisical first, then env, then default
+    """Resolved on first attribute access; see the module docstring."""
+
+    def __init__(self, store: SecretStore):
+        self._store = store
+        self._lock = threading.RLock()
+        self._loaded = False
+        store.on_change(self.reload)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not set yet, i.e. before the first load.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        self._ensure_loaded()
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(f"Settings has no attribute {name!r}") from None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self._load()
+                self._loaded = True
+                self.LOAD_SECONDS: float = time.perf_counter() - start
+
+    def reload(self) -> None:
+        """Re-resolve every value (after a secret refresh).
+
+        Objects built from old values keep them unless they subscribe to
+        secret_store.on_change (encryption keys, JWT managers); the DB engines need a restart.
+        """
+        with self._lock:
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        secrets = self._store.secrets()
+
+        # Infisical first, then env, then default
         def get_secret(key: str, default: str = "") -> str:
-            print(f"Fetching secret for key: {key}")
-            print(f"Infisical secrets available: {list(infisical_secrets.keys())}")
-            return infisical_secrets.get(key) or os.getenv(key, default)
-        
+            return secrets.get(key) or os.getenv(key, default)
+
         self.DATABASE_URL: str = get_secret("CE_DATABASE_URL", get_secret("DATABASE_URL", ""))
+        self.ASYNC_DB_POOL_SIZE: int = int(get_secret("ASYNC_DB_POOL_SIZE", "20"))
+        self.ASYNC_DB_MAX_OVERFLOW: int = int(get_secret("ASYNC_DB_MAX_OVERFLOW", "30"))
         self.JWT_SECRET_KEY: str = get_secret("JWT_SECRET_KEY", "your-secret-key-here")
         self.JWT_ALGORITHM: str = "HS256"
+        # Comma-separated secrets that encrypted data may still be written with (key rotation)
+        self.ENCRYPTION_PREVIOUS_SECRETS: str = get_secret("ENCRYPTION_PREVIOUS_SECRETS", "")
         self.ACCESS_TOKEN_EXPIRE_HOURS: int = 24
+        self.JWT_CLAIMS_CACHE_SIZE: int = int(get_secret("JWT_CLAIMS_CACHE_SIZE", "10000"))
+        # Logouts and role-change revocations reach the other API workers within this many seconds
+        self.JWT_REVOCATION_SYNC_SECONDS: float = float(get_secret("JWT_REVOCATION_SYNC_SECONDS", "2"))
+        # bcrypt cost; existing hashes with another cost are upgraded on the next login
+        self.PASSWORD_HASH_ROUNDS: int = int(get_secret("PASSWORD_HASH_ROUNDS", "12"))
+        self.PASSWORD_HASH_WORKERS: int = int(get_secret("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+        self.PASSWORD_HASH_MAX_PENDING: int = int(get_secret("PASSWORD_HASH_MAX_PENDING", "2000"))
         
         self.ENVIRONMENT: str = get_secret("ENV", "development")
         self.FIREBASE_PROJECT_ID: Optional[str] = get_secret("FIREBASE_PROJECT_ID") or None
         
         self.APPLICATION_URL: str = get_secret("APPLICATION_URL", "http://localhost:3000")
         self.RESEND_API_KEY: str = get_secret("RESEND_API_KEY", "")
+        # "resend" or "fake" (records emails in memory, for local development and tests)
+        self.EMAIL_TRANSPORT: str = get_secret("EMAIL_TRANSPORT", "resend")
+        self.EMAIL_FROM: str = get_secret("EMAIL_FROM", "no-reply@updates.suryaweb.app")
+        self.EMAIL_WORKER_CONCURRENCY: int = int(get_secret("EMAIL_WORKER_CONCURRENCY", "2"))
+        self.EMAIL_BATCH_SIZE: int = int(get_secret("EMAIL_BATCH_SIZE", "50"))
+        self.EMAIL_MAX_ATTEMPTS: int = int(get_secret("EMAIL_MAX_ATTEMPTS", "8"))
+
+        # /health/ready: not ready (503) when the database probe fails or exceeds
+        # HEALTH_DB_TIMEOUT_SECONDS; "degraded" (still 200) when a connection pool or the
+        # request threadpool is at least *_UTILIZATION_MAX busy, or the email outbox backlog
+        # reaches HEALTH_EMAIL_QUEUE_DEGRADED. A report is reused for HEALTH_CACHE_SECONDS.
+        self.HEALTH_DB_TIMEOUT_SECONDS: float = float(get_secret("HEALTH_DB_TIMEOUT_SECONDS", "2"))
+        self.HEALTH_POOL_UTILIZATION_MAX: float = float(get_secret("HEALTH_POOL_UTILIZATION_MAX", "0.9"))
+        self.HEALTH_THREADPOOL_UTILIZATION_MAX: float = float(get_secret("HEALTH_THREADPOOL_UTILIZATION_MAX", "0.9"))
+        self.HEALTH_EMAIL_QUEUE_DEGRADED: int = int(get_secret("HEALTH_EMAIL_QUEUE_DEGRADED", "1000"))
+        self.HEALTH_CACHE_SECONDS: float = float(get_secret("HEALTH_CACHE_SECONDS", "1"))
+        # Opt-in: also not ready once saturation has stayed at the maximum for
+        # HEALTH_SATURATION_SUSTAIN_SECONDS, until it drops below HEALTH_SATURATION_RECOVER
+        self.HEALTH_SATURATION_GATE: bool = get_secret("HEALTH_SATURATION_GATE", "false").lower() == "true"
+        self.HEALTH_SATURATION_SUSTAIN_SECONDS: float = float(get_secret("HEALTH_SATURATION_SUSTAIN_SECONDS", "30"))
+        self.HEALTH_SATURATION_RECOVER: float = float(get_secret("HEALTH_SATURATION_RECOVER", "0.7"))
+
+        # Prometheus /metrics. With several processes per server (uvicorn --workers, the bot
+        # supervisor) set METRICS_MULTIPROC_DIR to a directory they share, so a scrape of any
+        # of them reports all. Agent ids beyond METRICS_MAX_AGENT_LABELS are reported as "other".
+        self.METRICS_MULTIPROC_DIR: str = get_secret("METRICS_MULTIPROC_DIR", os.getenv("PROMETHEUS_MULTIPROC_DIR", ""))
+        self.METRICS_MAX_AGENT_LABELS: int = int(get_secret("METRICS_MAX_AGENT_LABELS", "200"))
         
         self.IS_MULTI_TENANT: bool = False
         self.DEFAULT_ORG_ID: str = get_secret("DEFAULT_ORG_ID", "00000000-0000-0000-0000-000000000001")
 
+        self.DEFAULT_PHONE_REGION: str = get_secret("DEFAULT_PHONE_REGION", "US")
+        # A background thread in each process compares a version stamp of agent_phone_numbers
+        # (row count, id and agent sums, latest updated_at) with the DB this often and
+        # reloads the phone routing table when it changed; lookups never touch the DB
+        self.PHONE_ROUTING_REFRESH_SECONDS: float = float(get_secret("PHONE_ROUTING_REFRESH_SECONDS", "5"))
+
+        self.AGENT_RUNTIME_CACHE_TTL_SECONDS: int = int(get_secret("AGENT_RUNTIME_CACHE_TTL_SECONDS", "60"))
+        # Each process checks the agent/config/model/API key/provider tables for writes made
+        # elsewhere this often, and clears its agent runtime cache when they changed
+        self.AGENT_RUNTIME_CACHE_REFRESH_SECONDS: float = float(get_secret("AGENT_RUNTIME_CACHE_REFRESH_SECONDS", "5"))
+
+        # "preload": import providers used by active models at bot worker boot; "lazy": on first call
+        self.PROVIDER_IMPORT_MODE: str = get_secret("PROVIDER_IMPORT_MODE", "preload")
+        # Transport plug-ins imported at bot worker boot ("twilio", "webrtc", "daily");
+        # others are imported on their first session
+        self.BOT_TRANSPORTS: List[str] = [
+            t.strip().lower() for t in get_secret("BOT_TRANSPORTS", "twilio").split(",") if t.strip()
+        ]
+        # Bot server processes: 1 runs the runner in-process; more starts a pre-fork
+        # supervisor (core.services.bot_supervisor). SIGHUP to it restarts workers one by one.
+        self.BOT_WORKERS: int = int(get_secret("BOT_WORKERS", "1"))
+        self.BOT_WORKER_RESTART_TIMEOUT_SECONDS: float = float(get_secret("BOT_WORKER_RESTART_TIMEOUT_SECONDS", "600"))
+        # On SIGTERM (or POST /admin/drain) a bot worker takes no new calls and waits this
+        # long for the ones in progress to end before cancelling them and exiting
+        self.BOT_DRAIN_DEADLINE_SECONDS: float = float(get_secret("BOT_DRAIN_DEADLINE_SECONDS", "600"))
+
+        # Concurrent calls per bot worker; 0 = unlimited. Calls over a limit wait up to
+        # CALL_ADMISSION_QUEUE_SECONDS for a slot, then get a busy response.
+        self.CALL_LIMIT_PER_ORG: int = int(get_secret("CALL_LIMIT_PER_ORG", "0"))
+        self.CALL_LIMIT_PER_AGENT: int = int(get_secret("CALL_LIMIT_PER_AGENT", "0"))
+        self.CALL_LIMIT_PER_API_KEY: int = int(get_secret("CALL_LIMIT_PER_API_KEY", "0"))
+        self.CALL_ADMISSION_QUEUE_SECONDS: float = float(get_secret("CALL_ADMISSION_QUEUE_SECONDS", "2"))
+        self.CALL_ADMISSION_MAX_QUEUED: int = int(get_secret("CALL_ADMISSION_MAX_QUEUED", "100"))
+
+        # Per-call latency summaries (call_metrics table), written in batches off the pipeline
+        self.CALL_METRICS_ENABLED: bool = get_secret("CALL_METRICS_ENABLED", "true").lower() == "true"
+        self.CALL_METRICS_BATCH_SIZE: int = int(get_secret("CALL_METRICS_BATCH_SIZE", "100"))
+        self.CALL_METRICS_FLUSH_SECONDS: float = float(get_secret("CALL_METRICS_FLUSH_SECONDS", "5"))
+
+        # How long telephony call info (from/to/status by call SID) is reused after a lookup
+        self.TELEPHONY_CALL_INFO_TTL_SECONDS: float = float(get_secret("TELEPHONY_CALL_INFO_TTL_SECONDS", "30"))
+
+        # Folding ended calls into agents.total_calls / total_minutes / average_rating
+        self.CALL_ROLLUP_BATCH_SIZE: int = int(get_secret("CALL_ROLLUP_BATCH_SIZE", "1000"))
+        self.CALL_ROLLUP_INTERVAL_SECONDS: float = float(get_secret("CALL_ROLLUP_INTERVAL_SECONDS", "10"))
+        # Calls still without ended_at after this long (bot worker killed or crashed) are marked failed; 0 disables
+        self.CALL_STALE_AFTER_HOURS: float = float(get_secret("CALL_STALE_AFTER_HOURS", "6"))
+
+        # Pre-rendered first/end-call/voicemail message audio. The directory should be shared
+        # by the API and bot workers; each process also keeps an in-memory LRU.
+        self.MESSAGE_AUDIO_ENABLED: bool = get_secret("MESSAGE_AUDIO_ENABLED", "true").lower() == "true"
+        self.AUDIO_CACHE_DIR: str = get_secret("AUDIO_CACHE_DIR", "/tmp/tone-audio-cache")
+        self.MESSAGE_AUDIO_MEMORY_MB: int = int(get_secret("MESSAGE_AUDIO_MEMORY_MB", "64"))
+        self.MESSAGE_AUDIO_DISK_MB: int = int(get_secret("MESSAGE_AUDIO_DISK_MB", "1024"))
+        self.MESSAGE_AUDIO_RENDER_TIMEOUT_SECONDS: float = float(get_secret("MESSAGE_AUDIO_RENDER_TIMEOUT_SECONDS", "30"))
+
+        # Short recurring TTS sentences, cached per voice under AUDIO_CACHE_DIR/phrases
+        self.PHRASE_CACHE_ENABLED: bool = get_secret("PHRASE_CACHE_ENABLED", "true").lower() == "true"
+        self.PHRASE_CACHE_MEMORY_MB: int = int(get_secret("PHRASE_CACHE_MEMORY_MB", "64"))
+        self.PHRASE_CACHE_DISK_MB: int = int(get_secret("PHRASE_CACHE_DISK_MB", "2048"))
+        self.PHRASE_CACHE_MAX_CHARS: int = int(get_secret("PHRASE_CACHE_MAX_CHARS", "80"))
+        # A phrase is rendered into the cache after this many misses
+        self.PHRASE_CACHE_MIN_REPEATS: int = int(get_secret("PHRASE_CACHE_MIN_REPEATS", "2"))
+
+        # Load tests: calls without an agent use the local fake STT/LLM/TTS (core.loadtest)
+        self.LOADTEST_FAKE_SERVICES: bool = get_secret("LOADTEST_FAKE_SERVICES", "false").lower() == "true"
+        self.LOADTEST_STT_LATENCY_MS: float = float(get_secret("LOADTEST_STT_LATENCY_MS", "150"))
+        self.LOADTEST_LLM_TTFT_MS: float = float(get_secret("LOADTEST_LLM_TTFT_MS", "350"))
+        self.LOADTEST_TTS_TTFB_MS: float = float(get_secret("LOADTEST_TTS_TTFB_MS", "120"))
+
 
-settings = Settings()
\ No newline at end of file
+secret_store = SecretStore(
+    get_infisical_secrets,
+    enabled=os.getenv("USE_INFISICAL", "false").lower() == "true",
+    # Off unless set: the snapshot stores the secrets unencrypted
+    snapshot_path=os.getenv("SECRETS_SNAPSHOT_FILE") or None,
+    ttl_seconds=float(os.getenv("SECRETS_TTL_SECONDS", "300")),
+    fetch_timeout_seconds=float(os.getenv("SECRETS_FETCH_TIMEOUT_SECONDS", "5")),
+    snapshot_max_age_seconds=float(os.getenv("SECRETS_SNAPSHOT_MAX_AGE_SECONDS", "86400")),
+)
+settings = Settings(secret_store)
\ No newline at end of file
@@ -1,9 +1,13 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
 import logging
 import time
 
-from core.config import settings
+from loguru import logger
+
+from core.config import secret_store, settings
 
 logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
 
@@ -24,6 +28,32 @@ engine = create_engine(
 )
 
 
+def _async_database_url(database_url: str):
+    """Same database, asyncpg driver (DATABASE_URL is written for psycopg2)."""
+    return make_url(database_url).set(drivername="postgresql+asyncpg")
+
+
+# Used by the async API routers; the sync engine above stays for alembic, scripts and the bot.
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    echo=False,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+
+_engine_database_url = settings.DATABASE_URL
+
+
+def _warn_if_database_url_changed() -> None:
+    # Engines are not rebuilt on a secret refresh: open sessions and pooled connections use them
+    if settings.DATABASE_URL != _engine_database_url:
+        logger.warning("DATABASE_URL changed in the secret store; restart the process to connect with it")
+
+
+secret_store.on_change(_warn_if_database_url_changed)
+
+
 Base = declarative_base()
 
 
@@ -1,9 +1,13 @@
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from contextlib import contextmanager
 
-from core.database.base import engine
+from core.database.base import engine, async_engine
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# expire_on_commit stays on, as with SessionLocal: the services re-query rows after a
+# Core upsert + commit and must not get the pre-write objects back from the identity map
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
 
 
 def get_db():
@@ -14,6 +18,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 @contextmanager
 def get_db_context():
     db = SessionLocal()
@@ -0,0 +1 @@
+"""Load-testing tools for the voice path: fake providers, a Twilio media-stream load generator and a worker startup benchmark."""
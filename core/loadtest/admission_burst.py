@@ -0,0 +1,177 @@
+"""Simulated call bursts against CallAdmissionController: limits hold and every slot comes back.
+
+No network, database or pipeline: each simulated call asks for admission with a runtime
+spec, holds its lease for a random call length and releases it, the way bot() does:
+
+    python -m core.loadtest.admission_burst --calls 300 --org-limit 30 --agent-limit 10 \\
+        --api-key-limit 25 --queue-seconds 0.5 --reconnects 20
+
+Four agents share the load: agent 1 gets --hot-share of the calls, agents 1 and 2 share
+an owner (org) and provider API key, agent 3 has agent_metadata.max_concurrent_calls=3,
+agent 4 belongs to another tenant. --reconnects calls are admitted a second time under
+the same call_id while the first lease is still held, as when a Twilio media stream
+reconnects with its CallSid.
+
+Reported: admitted, admitted after queueing and rejected counts, the peak occupancy of
+every scope next to its limit, and what is left held at the end. Exits 1 when a peak
+went over its limit or a slot was not returned.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.services.agent_runtime_cache import AgentRuntimeSpec, ProviderSpec
+from core.services.call_admission import CallAdmissionController, CallRejected
+
+HOT_AGENT_OVERRIDE = 3
+
+
+def _spec(agent_id: int, owner_id: int, api_key_id: int, max_concurrent_calls: Optional[int] = None) -> AgentRuntimeSpec:
+    llm = ProviderSpec("llm", 1, "fake", 1, api_key_id, "unused")
+    metadata = {"max_concurrent_calls": max_concurrent_calls} if max_concurrent_calls is not None else {}
+    return AgentRuntimeSpec(
+        agent_id=agent_id,
+        config_id=agent_id,
+        system_prompt=None,
+        first_message=None,
+        end_call_message=None,
+        voicemail_message=None,
+        agent_metadata=MappingProxyType(metadata),
+        llm=llm,
+        stt=None,
+        tts=None,
+        owner_id=owner_id,
+    )
+
+
+SPECS = {
+    1: _spec(1, owner_id=100, api_key_id=7),
+    2: _spec(2, owner_id=100, api_key_id=7),
+    3: _spec(3, owner_id=200, api_key_id=8, max_concurrent_calls=HOT_AGENT_OVERRIDE),
+    4: _spec(4, owner_id=300, api_key_id=9),
+}
+
+
+def _limit(controller: CallAdmissionController, scope: str, key: str) -> int:
+    if scope == "agent" and key == "3":
+        return HOT_AGENT_OVERRIDE
+    return controller.limits[scope]
+
+
+async def run_burst(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    controller = CallAdmissionController(
+        org_limit=args.org_limit,
+        agent_limit=args.agent_limit,
+        api_key_limit=args.api_key_limit,
+        queue_seconds=args.queue_seconds,
+        max_queued=args.max_queued,
+    )
+    peaks: Dict[Tuple[str, str], int] = {}
+    outcomes = {"admitted": 0, "rejected": 0, "reconnects_admitted": 0}
+    cold_share = (1 - args.hot_share) / 3
+    weights = [args.hot_share, cold_share, cold_share, cold_share]
+
+    def record_peaks() -> None:
+        for scope, counts in controller.occupancy()["occupancy"].items():
+            for key, count in counts.items():
+                peaks[(scope, key)] = max(peaks.get((scope, key), 0), count)
+
+    async def call(i: int, agent_id: int, reconnect: bool) -> None:
+        await asyncio.sleep(rng.uniform(0, args.spread))
+        call_id = f"CA{i:06d}"
+        try:
+            lease = await controller.admit_for_spec(call_id, SPECS[agent_id])
+        except CallRejected:
+            outcomes["rejected"] += 1
+            return
+        outcomes["admitted"] += 1
+        record_peaks()
+        second = None
+        if reconnect:
+            # The media stream comes back with the same CallSid before the first one ended
+            await asyncio.sleep(args.hold_min / 2)
+            try:
+                second = await controller.admit_for_spec(call_id, SPECS[agent_id])
+                outcomes["reconnects_admitted"] += 1
+                record_peaks()
+            except CallRejected:
+                pass
+        await asyncio.sleep(rng.uniform(args.hold_min, args.hold_max))
+        await controller.release(lease)
+        if second is not None:
+            await asyncio.sleep(rng.uniform(0, args.hold_min))
+            await controller.release(second)
+
+    agents = rng.choices(list(SPECS), weights, k=args.calls)
+    reconnecting = set(rng.sample(range(args.calls), min(args.reconnects, args.calls)))
+    started = time.perf_counter()
+    await asyncio.gather(*[call(i, agent_id, i in reconnecting) for i, agent_id in enumerate(agents)])
+    elapsed = time.perf_counter() - started
+
+    final = controller.occupancy()
+    over_limit = {
+        f"{scope}:{key}": {"peak": peak, "limit": _limit(controller, scope, key)}
+        for (scope, key), peak in sorted(peaks.items())
+        if 0 < _limit(controller, scope, key) < peak
+    }
+    left_held = {scope: counts for scope, counts in final["occupancy"].items() if counts}
+    return {
+        "calls": args.calls,
+        "seconds": round(elapsed, 2),
+        **outcomes,
+        "admitted_after_wait": final["admitted_after_wait"],
+        "peaks": {
+            f"{scope}:{key}": {"peak": peak, "limit": _limit(controller, scope, key)}
+            for (scope, key), peak in sorted(peaks.items())
+        },
+        "over_limit": over_limit,
+        "active_calls_after": final["active_calls"],
+        "left_held": left_held,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulated call bursts against call admission control")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--spread", type=float, default=0.3, help="Seconds over which the calls arrive")
+    parser.add_argument("--hot-share", type=float, default=0.7, help="Share of calls to agent 1")
+    parser.add_argument("--org-limit", type=int, default=30)
+    parser.add_argument("--agent-limit", type=int, default=10)
+    parser.add_argument("--api-key-limit", type=int, default=25)
+    parser.add_argument("--queue-seconds", type=float, default=0.5)
+    parser.add_argument("--max-queued", type=int, default=50)
+    parser.add_argument("--hold-min", type=float, default=0.2, help="Shortest simulated call, seconds")
+    parser.add_argument("--hold-max", type=float, default=0.6, help="Longest simulated call, seconds")
+    parser.add_argument("--reconnects", type=int, default=20, help="Calls admitted twice under one call_id")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run_burst(args))
+    print(
+        f"{report['calls']} calls in {report['seconds']}s: admitted={report['admitted']} "
+        f"(after wait {report['admitted_after_wait']}) rejected={report['rejected']} "
+        f"reconnects admitted={report['reconnects_admitted']}"
+    )
+    for name, peak in report["peaks"].items():
+        print(f"  {name:<12} peak={peak['peak']:<4} limit={peak['limit'] or 'none'}")
+    print(f"active calls after={report['active_calls_after']} slots left held={report['left_held'] or 'none'}")
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["over_limit"] or report["left_held"] or report["active_calls_after"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
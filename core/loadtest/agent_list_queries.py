@@ -0,0 +1,122 @@
+"""Regression check: the agent listing runs the same number of queries whatever the agent count.
+
+AgentService.get_all_agents is meant to cost two statements (agents joined with their
+config, then one IN query for phone numbers), not one or more per agent:
+
+    python -m core.loadtest.agent_list_queries --agents 1,10,100
+
+For every step it creates that many agents (each with a config and two phone numbers)
+for a scratch user, lists them the way GET /agent/get_all_agents does, and counts the
+statements executed with a before_cursor_execute listener. All rows are written inside
+one transaction that is rolled back at the end, so it can run against any migrated
+database. --json-out also records the statements of every step. Exits 1 when the
+count differs between steps or a listing comes back short.
+"""
+
+import argparse
+import json
+import sys
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.models.agent import Agent
+from core.models.agent_config import AgentConfig
+from core.models.agent_phone_numbers import AgentPhoneNumbers
+from core.models.user import User
+from core.services.agent_service import AgentService
+from core.utils.pagination import ListParams
+
+PHONES_PER_AGENT = 2
+
+
+def _add_agents(db: Session, user_id: int, tag: str, start: int, stop: int) -> None:
+    for i in range(start, stop):
+        agent = Agent(name=f"agent-list-check-{tag}-{i}", created_by=user_id, tags=["loadtest"])
+        db.add(agent)
+        db.flush()
+        db.add(AgentConfig(agent_id=agent.id, system_prompt="Agent list query check"))
+        for p in range(PHONES_PER_AGENT):
+            db.add(
+                AgentPhoneNumbers(
+                    agent_id=agent.id,
+                    phone_number=f"+1{int(tag, 16) % 10000:04d}{i:05d}{p}",
+                    phone_number_sid=f"PN{tag}{i}{p}",
+                    phone_number_auth_token="unused",
+                    provider="twilio",
+                    country_code="US",
+                )
+            )
+    db.flush()
+
+
+def _count_queries(db: Session, user_id: int, params: ListParams) -> Dict[str, Any]:
+    statements: List[str] = []
+
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        statements.append(statement)
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", _before)
+    try:
+        agents = AgentService(db).get_all_agents(created_by=user_id, params=params)
+    finally:
+        event.remove(connection, "before_cursor_execute", _before)
+    return {"queries": len(statements), "listed": len(agents), "statements": statements}
+
+
+def run(database_url: str, agent_counts: List[int]) -> Dict[str, Any]:
+    engine = create_engine(database_url)
+    steps = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            db = Session(bind=connection, autoflush=False)
+            tag = uuid.uuid4().hex[:8]
+            user = User(email=f"agent-list-check-{tag}@example.com")
+            db.add(user)
+            db.flush()
+            created = 0
+            for count in sorted(agent_counts):
+                _add_agents(db, user.id, tag, created, count)
+                created = count
+                result = _count_queries(db, user.id, ListParams())
+                steps.append({"agents": count, **result})
+            db.close()
+        finally:
+            transaction.rollback()
+    engine.dispose()
+    counts = {step["queries"] for step in steps}
+    return {
+        "steps": steps,
+        "constant": len(counts) == 1,
+        "complete": all(step["listed"] == step["agents"] for step in steps),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query count of the agent listing by agent count")
+    parser.add_argument("--agents", default="1,10,100", help="Comma-separated agent counts to list")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = run(args.database_url, [int(n) for n in args.agents.split(",")])
+    for step in report["steps"]:
+        print(f"agents={step['agents']:<5} listed={step['listed']:<5} queries={step['queries']}")
+    print(f"constant={report['constant']} complete={report['complete']}")
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if not (report["constant"] and report["complete"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
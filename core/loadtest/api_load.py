@@ -0,0 +1,152 @@
+"""HTTP load generator for the API servers: requests per second at a fixed number of clients.
+
+Each client sends its next request as soon as the previous one is answered (closed
+loop), so throughput is what the server sustains at that concurrency:
+
+    python -m core.loadtest.api_load --url http://localhost:8000 --token $JWT \\
+        --path /api/v1/agent/get_all_agents --path /api/v1/user/get_all_users_for_organization \\
+        --concurrency 50,200,500 --duration 20 --processes 4
+
+Every --path is measured on its own at every concurrency step. Comparing an endpoint
+served through the AsyncSession path (agents, models, api keys, service providers)
+with one still on the sync Session shows the threadpool ceiling: a sync endpoint holds
+one of the ~40 threadpool threads for its whole database round trip. Run the same
+command against two builds to compare them directly. One client process tops out at a
+few thousand requests per second, so use --processes to spread 500 clients.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+
+def pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+async def _clients(url: str, headers: Dict[str, str], clients: int, warmup: float, duration: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    connector = aiohttp.TCPConnector(limit=clients)
+    timeout = aiohttp.ClientTimeout(total=30.0)
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+        start = time.monotonic()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+
+        async def loop() -> None:
+            while True:
+                sent = time.monotonic()
+                if sent >= stop_at:
+                    return
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        error = None if response.status < 400 else str(response.status)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = type(e).__name__
+                done = time.monotonic()
+                if sent < measure_from:
+                    continue
+                if error:
+                    errors[error] = errors.get(error, 0) + 1
+                else:
+                    latencies.append((done - sent) * 1000)
+
+        await asyncio.gather(*[loop() for _ in range(clients)])
+    return {"latencies": latencies, "errors": errors}
+
+
+def _client_process(job: Dict[str, Any]) -> Dict[str, Any]:
+    return asyncio.run(_clients(**job))
+
+
+def run_step(args: argparse.Namespace, path: str, concurrency: int) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    processes = max(1, min(args.processes, concurrency))
+    jobs = [
+        {
+            "url": args.url.rstrip("/") + path,
+            "headers": headers,
+            "clients": concurrency // processes + (1 if i < concurrency % processes else 0),
+            "warmup": args.warmup,
+            "duration": args.duration,
+        }
+        for i in range(processes)
+    ]
+    if processes == 1:
+        results = [_client_process(jobs[0])]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_client_process, jobs)
+
+    latencies = [ms for r in results for ms in r["latencies"]]
+    errors: Dict[str, int] = {}
+    for r in results:
+        for error, count in r["errors"].items():
+            errors[error] = errors.get(error, 0) + count
+    total = len(latencies) + sum(errors.values())
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": total,
+        "requests_per_second": round(len(latencies) / args.duration, 1),
+        "error_rate": round(sum(errors.values()) / total, 3) if total else 0,
+        "latency_ms": {f"p{p}": _round(pct(latencies, p)) for p in (50, 95, 99)},
+        "errors": errors,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def format_step(step: Dict[str, Any]) -> str:
+    line = (
+        f"{step['path']:<40} c={step['concurrency']:<4} req/s={step['requests_per_second']:<8} "
+        f"p50/p95/p99={step['latency_ms']['p50']}/{step['latency_ms']['p95']}/{step['latency_ms']['p99']} ms"
+    )
+    if step["errors"]:
+        line += f"  errors={step['errors']}"
+    return line
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HTTP load generator for the API servers")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", default=None, help="GET path to load; repeat to compare")
+    parser.add_argument("--token", default=None, help="Bearer token sent with every request")
+    parser.add_argument("--concurrency", default="50,200,500", help="Comma-separated concurrent clients per step")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds per step before measuring")
+    parser.add_argument("--processes", type=int, default=1, help="Client processes to spread the clients over")
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    steps = []
+    for path in args.path or ["/api/v1/agent/get_all_agents"]:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            step = run_step(args, path, concurrency)
+            steps.append(step)
+            print(format_step(step), flush=True)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"steps": steps}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
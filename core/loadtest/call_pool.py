@@ -0,0 +1,149 @@
+"""Checks that a call does not keep a pooled DB connection checked out while it runs.
+
+Starts many concurrent calls through AgentFactoryService.run_bot_for_agent against a
+deliberately small pool, the way core.bot.run_bot does (one session per call):
+
+    python -m core.loadtest.call_pool --agent-id 42 --calls 300 --pool-size 10
+
+Everything up to the pipeline is real: the runtime spec is loaded from the database
+(the agent runtime cache is invalidated before every call, so each one queries) and
+the LLM, STT and TTS services are built. The pipeline itself is replaced by a wait of
+--call-seconds, as the transport would keep a real call open. Any agent with an active
+config works; one whose providers are "fake" needs no API keys.
+
+The pool has no overflow and a short timeout, so if calls held their connection the
+11th one would fail to check one out (calls not yet started are then skipped, as
+every further timeout would block the loop for --pool-timeout). Reported: calls
+completed and failed, and the connections checked out once every call was in its
+pipeline (must be 0). Exits 1 when a call failed or a connection was still checked out.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from core.config import settings
+from core.services.agent_factory_service import AgentFactoryService
+from core.services.agent_runtime_cache import agent_runtime_cache
+
+
+class _CallState:
+    def __init__(self, calls: int):
+        self.calls = calls
+        self.in_pipeline = 0
+        self.failed = False
+        self.all_in_pipeline = asyncio.Event()
+        self.release = asyncio.Event()
+
+
+class _HeldCallFactory(AgentFactoryService):
+    """run_bot_for_agent as in production; the pipeline waits instead of running."""
+
+    state: _CallState
+
+    async def run_bot_with_components(self, **kwargs: Any) -> None:
+        self.state.in_pipeline += 1
+        if self.state.in_pipeline == self.state.calls:
+            self.state.all_in_pipeline.set()
+        await self.state.release.wait()
+
+
+async def _call(session_factory: Any, agent_id: int, state: _CallState) -> Optional[str]:
+    if state.failed:
+        # Each pool timeout blocks the loop; one is enough to know the check failed
+        return "not started after an earlier call failed"
+    agent_runtime_cache.invalidate_agent(agent_id)
+    try:
+        with session_factory() as db:
+            factory = _HeldCallFactory(db)
+            factory.state = state
+            await factory.run_bot_for_agent(agent_id, None, SimpleNamespace(body={}))
+    except Exception as e:
+        state.failed = True
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    engine = create_engine(
+        args.database_url,
+        poolclass=QueuePool,
+        pool_size=args.pool_size,
+        max_overflow=0,
+        pool_timeout=args.pool_timeout,
+    )
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    state = _CallState(args.calls)
+    started = time.monotonic()
+    calls = [asyncio.create_task(_call(session_factory, args.agent_id, state)) for _ in range(args.calls)]
+
+    checked_out: Optional[int] = None
+    waiter = asyncio.create_task(state.all_in_pipeline.wait())
+    await asyncio.wait([waiter, *calls], return_when=asyncio.FIRST_COMPLETED)
+    if state.all_in_pipeline.is_set():
+        setup_seconds = time.monotonic() - started
+        checked_out = engine.pool.checkedout()
+        await asyncio.sleep(args.call_seconds)
+        checked_out = max(checked_out, engine.pool.checkedout())
+    else:
+        # A call failed before reaching its pipeline
+        setup_seconds = None
+        waiter.cancel()
+    state.release.set()
+    errors: List[Optional[str]] = await asyncio.gather(*calls)
+    engine.dispose()
+
+    failures: Dict[str, int] = {}
+    for error in errors:
+        if error:
+            failures[error] = failures.get(error, 0) + 1
+    return {
+        "calls": args.calls,
+        "pool_size": args.pool_size,
+        "completed": sum(1 for e in errors if e is None),
+        "failed": sum(failures.values()),
+        "setup_seconds": round(setup_seconds, 2) if setup_seconds is not None else None,
+        "checked_out_during_calls": checked_out,
+        "errors": failures,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent calls against a small DB pool")
+    parser.add_argument("--agent-id", type=int, required=True, help="Agent with an active config")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--pool-timeout", type=float, default=2.0, help="Seconds to wait for a pooled connection")
+    parser.add_argument("--call-seconds", type=float, default=5.0, help="How long every call stays open")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+    print(
+        f"calls={report['calls']} pool_size={report['pool_size']} completed={report['completed']} "
+        f"failed={report['failed']} setup={report['setup_seconds']}s "
+        f"checked_out_during_calls={report['checked_out_during_calls']}"
+    )
+    if report["errors"]:
+        print(f"errors={report['errors']}")
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["failed"] or report["checked_out_during_calls"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
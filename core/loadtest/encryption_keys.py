@@ -0,0 +1,87 @@
+"""Micro-benchmark: decrypting a stored API key with and without the derived key cache.
+
+No database: a value is encrypted with the configured JWT_SECRET_KEY and decrypted in
+a loop, first deriving the Fernet key with PBKDF2 on every call (what each decrypt paid
+before the key was memoised), then through core.utils.encryption as it runs now:
+
+    python -m core.loadtest.encryption_keys --iterations 2000
+
+Reported: milliseconds per decrypt for both paths, and for decrypt_many over --batch
+values (the LLM/STT/TTS keys of one agent). Exits 1 when a path returned the wrong
+plaintext.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from cryptography.fernet import Fernet
+
+from core.config import settings
+from core.utils import encryption
+
+PLAINTEXT = "sk-loadtest-0123456789abcdef"
+
+
+def _per_call_ms(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def _decrypt_uncached(token: str) -> str:
+    key = encryption._derive_key.__wrapped__(settings.JWT_SECRET_KEY)
+    return Fernet(key).decrypt(token.encode()).decode()
+
+
+def run(iterations: int, uncached_iterations: int, batch: int) -> Dict[str, Any]:
+    encryption.reset_keys()
+    token = encryption.encrypt(PLAINTEXT)
+    batch_values = [encryption.encrypt(f"{PLAINTEXT}-{i}") for i in range(batch)]
+
+    correct = _decrypt_uncached(token) == PLAINTEXT and encryption.decrypt(token) == PLAINTEXT
+    correct = correct and encryption.decrypt_many(batch_values) == [f"{PLAINTEXT}-{i}" for i in range(batch)]
+    uncached_ms = _per_call_ms(lambda: _decrypt_uncached(token), uncached_iterations)
+    cached_ms = _per_call_ms(lambda: encryption.decrypt(token), iterations)
+    many_ms = _per_call_ms(lambda: encryption.decrypt_many(batch_values), iterations)
+    return {
+        "uncached_iterations": uncached_iterations,
+        "iterations": iterations,
+        "pbkdf2_iterations": encryption._ITERATIONS,
+        "uncached_ms": round(uncached_ms, 3),
+        "cached_ms": round(cached_ms, 4),
+        "decrypt_many_batch": batch,
+        "decrypt_many_ms": round(many_ms, 4),
+        "speedup": round(uncached_ms / cached_ms),
+        "correct": correct,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="API key decrypt cost with and without the derived key cache")
+    parser.add_argument("--iterations", type=int, default=2000, help="Decrypts timed with the cached key")
+    parser.add_argument("--uncached-iterations", type=int, default=20, help="Decrypts timed deriving the key each time")
+    parser.add_argument("--batch", type=int, default=3, help="Values per decrypt_many call")
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = run(args.iterations, args.uncached_iterations, args.batch)
+    print(
+        f"decrypt: PBKDF2 per call {report['uncached_ms']} ms, cached key {report['cached_ms']} ms "
+        f"({report['speedup']}x); decrypt_many of {report['decrypt_many_batch']} {report['decrypt_many_ms']} ms"
+    )
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if not report["correct"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
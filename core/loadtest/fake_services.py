@@ -0,0 +1,160 @@
+"""Deterministic local STT, LLM and TTS services with configurable latency, for load tests.
+
+They speak the same frame protocol as the real providers (including TTFB metrics), but
+never touch the network: STT answers every end of user speech with a canned transcript,
+the LLM streams a canned reply, and TTS returns a quiet tone whose length follows the text.
+"""
+
+import asyncio
+import math
+from typing import Any, AsyncGenerator, List, Optional, Set
+
+from pipecatfork.src.pipecat.frames.frames import (
+    ErrorFrame,
+    Frame,
+    LLMContextFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    LLMTextFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecatfork.src.pipecat.processors.frame_processor import FrameDirection
+from pipecatfork.src.pipecat.services.llm_service import LLMService
+from pipecatfork.src.pipecat.services.stt_service import STTService
+from pipecatfork.src.pipecat.services.tts_service import TTSService
+from pipecatfork.src.pipecat.utils.time import time_now_iso8601
+
+FAKE_TRANSCRIPTS = (
+    "Hi, I would like to check the status of my order.",
+    "It was placed last Tuesday.",
+    "Can you send me a confirmation by email?",
+    "Thanks, that is all.",
+)
+
+FAKE_REPLIES = (
+    "Sure, I can help with that. Could you tell me when you placed the order?",
+    "Thanks. I can see it, it is out for delivery and should arrive tomorrow.",
+    "Of course, I have sent the confirmation to the email on file.",
+    "You're welcome, have a great day!",
+)
+
+
+class FakeSTTService(STTService):
+    """Emits the next canned transcript latency_ms after the user stops speaking (VAD)."""
+
+    def __init__(self, *, latency_ms: float = 150, transcripts: Optional[List[str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.latency_ms = latency_ms
+        self.transcripts = list(transcripts or FAKE_TRANSCRIPTS)
+        self._turn = 0
+        self._pending: Set[asyncio.Task] = set()
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        yield None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, VADUserStoppedSpeakingFrame):
+            task = asyncio.create_task(self._transcribe())
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _transcribe(self) -> None:
+        await self.start_ttfb_metrics()
+        await asyncio.sleep(self.latency_ms / 1000)
+        await self.stop_ttfb_metrics()
+        text = self.transcripts[self._turn % len(self.transcripts)]
+        self._turn += 1
+        await self.push_frame(TranscriptionFrame(text, "loadtest-user", time_now_iso8601()))
+
+    async def cleanup(self):
+        for task in list(self._pending):
+            task.cancel()
+        await super().cleanup()
+
+
+class FakeLLMService(LLMService):
+    """Streams the next canned reply: first token after ttft_ms, then one word every token_ms."""
+
+    def __init__(
+        self,
+        *,
+        ttft_ms: float = 350,
+        token_ms: float = 15,
+        replies: Optional[List[str]] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.replies = list(replies or FAKE_REPLIES)
+        self._turn = 0
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if not isinstance(frame, LLMContextFrame):
+            await self.push_frame(frame, direction)
+            return
+        reply = self.replies[self._turn % len(self.replies)]
+        self._turn += 1
+        await self.push_frame(LLMFullResponseStartFrame())
+        await self.start_processing_metrics()
+        try:
+            await self.start_ttfb_metrics()
+            await asyncio.sleep(self.ttft_ms / 1000)
+            await self.stop_ttfb_metrics()
+            for i, word in enumerate(reply.split(" ")):
+                if i:
+                    await asyncio.sleep(self.token_ms / 1000)
+                await self.push_frame(LLMTextFrame(word if i == 0 else f" {word}"))
+        except Exception as e:
+            await self.push_frame(ErrorFrame(f"Fake LLM failed: {e}"))
+        finally:
+            await self.stop_processing_metrics()
+            await self.push_frame(LLMFullResponseEndFrame())
+
+
+class FakeTTSService(TTSService):
+    """Returns a quiet 220 Hz tone, ms_per_char long per character, after ttfb_ms."""
+
+    CHUNK_MS = 40
+
+    def __init__(self, *, ttfb_ms: float = 120, ms_per_char: float = 55, **kwargs):
+        super().__init__(**kwargs)
+        self.ttfb_ms = ttfb_ms
+        self.ms_per_char = ms_per_char
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    def _tone(self, sample_rate: int, duration_ms: float) -> bytes:
+        samples = int(sample_rate * duration_ms / 1000)
+        step = 2 * math.pi * 220 / sample_rate
+        return b"".join(
+            int(1500 * math.sin(step * n)).to_bytes(2, "little", signed=True) for n in range(samples)
+        )
+
+    async def run_tts(self, text: str, *args: Any, **kwargs: Any) -> AsyncGenerator[Frame, None]:
+        context_id = args[0] if args else kwargs.get("context_id")
+        sample_rate = self.sample_rate
+        await self.start_ttfb_metrics()
+        await asyncio.sleep(self.ttfb_ms / 1000)
+        await self.stop_ttfb_metrics()
+        yield TTSStartedFrame()
+        chunk = self._tone(sample_rate, self.CHUNK_MS)
+        for _ in range(max(1, int(len(text) * self.ms_per_char / self.CHUNK_MS))):
+            frame = TTSAudioRawFrame(chunk, sample_rate, 1)
+            if context_id is not None:
+                frame.context_id = context_id
+            yield frame
+        yield TTSStoppedFrame()
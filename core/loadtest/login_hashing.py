@@ -0,0 +1,110 @@
+"""Login burst benchmark: does bcrypt starve the request threadpool?
+
+No server or database: --logins password checks are started at once, either inline on
+the request threadpool (as the sync login handlers did) or through PasswordHasher's own
+bounded pool (as login_async does now):
+
+    python -m core.loadtest.login_hashing --logins 1000 --rounds 10
+
+While each burst runs, a probe plays a cheap sync request: every 10 ms it runs a no-op
+on the request threadpool and records how long it waited. Reported per mode: total
+time, logins per second, the probe's p50/p99/max wait and, for the hasher, its stats().
+Throughput is CPU-bound either way; the probe wait is what other requests feel. Exits 1
+when a check failed or the hasher turned logins away.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import bcrypt
+from fastapi.concurrency import run_in_threadpool
+
+from core.utils.security import PasswordHasher
+
+PASSWORD = "correct horse battery staple"
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
+
+
+async def _probe(waits: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await run_in_threadpool(lambda: None)
+        waits.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run_burst(mode: str, logins: int, stored_hash: str, hasher: Optional[PasswordHasher]) -> Dict[str, Any]:
+    waits: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(waits, stop))
+    start = time.perf_counter()
+    if hasher is None:
+        checks = [run_in_threadpool(bcrypt.checkpw, PASSWORD.encode(), stored_hash.encode()) for _ in range(logins)]
+    else:
+        checks = [hasher.verify_async(PASSWORD, stored_hash) for _ in range(logins)]
+    results = await asyncio.gather(*checks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    waits.sort()
+    report = {
+        "mode": mode,
+        "logins": logins,
+        "seconds": round(elapsed, 2),
+        "logins_per_second": round(logins / elapsed, 1),
+        "failed": sum(1 for r in results if r is not True),
+        "probe_p50_ms": round(_percentile(waits, 0.5) * 1000, 1),
+        "probe_p99_ms": round(_percentile(waits, 0.99) * 1000, 1),
+        "probe_max_ms": round(waits[-1] * 1000, 1),
+    }
+    if hasher is not None:
+        report["hasher"] = hasher.stats()
+    return report
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    stored_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(args.rounds)).decode()
+    reports = []
+    for mode in args.modes.split(","):
+        hasher = PasswordHasher(args.rounds, args.workers, args.max_pending) if mode == "hasher" else None
+        reports.append(asyncio.run(run_burst(mode, args.logins, stored_hash, hasher)))
+    return reports
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent logins: inline bcrypt vs the password hasher pool")
+    parser.add_argument("--logins", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost of the stored hash")
+    parser.add_argument("--modes", default="inline,hasher", help="Comma-separated: inline, hasher")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Hasher threads")
+    parser.add_argument("--max-pending", type=int, default=2000, help="Hasher queue bound")
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    reports = run(args)
+    for report in reports:
+        print(
+            f"{report['mode']:<7} {report['logins']} logins in {report['seconds']}s "
+            f"({report['logins_per_second']}/s) failed={report['failed']}; other requests waited "
+            f"p50={report['probe_p50_ms']}ms p99={report['probe_p99_ms']}ms max={report['probe_max_ms']}ms"
+        )
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(reports, f, indent=2)
+    if any(report["failed"] for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Bot worker startup benchmark: import time and resident memory per transport plug-in.
+
+Each measurement runs in a fresh interpreter, so module caches from one transport
+never hide the cost of another:
+
+    python -m core.loadtest.transport_startup --transports twilio,webrtc,daily --runs 5
+
+Reported per transport: the worker base (core.bot with no transport loaded), the
+plug-in import on top of it, and the resulting RSS. "all" loads every plug-in, which
+is what each worker paid when core.bot imported all transports at module level.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def measure_in_process(transports: List[str]) -> Dict[str, Any]:
+    """Import core.bot, then the given plug-ins, in this (fresh) process."""
+    start = time.perf_counter()
+    import core.bot  # noqa: F401
+    from core.services.transport_registry import transport_registry
+
+    base_seconds = time.perf_counter() - start
+    base_rss = _rss_mb()
+    start = time.perf_counter()
+    errors = {}
+    for name in transports:
+        if transport_registry.resolve(name) is None:
+            record = next((r for r in transport_registry.import_report() if r.name == name), None)
+            errors[name] = record.error if record else "unknown transport"
+    transport_seconds = time.perf_counter() - start
+    rss = _rss_mb()
+    return {
+        "base_ms": base_seconds * 1000,
+        "transport_ms": transport_seconds * 1000,
+        "base_rss_mb": base_rss,
+        "rss_mb": rss,
+        "errors": errors,
+    }
+
+
+def run_child(transports: List[str]) -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, "-m", "core.loadtest.transport_startup", "--child", ",".join(transports)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "LOGURU_LEVEL": "ERROR"},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark(cases: Dict[str, List[str]], runs: int) -> List[Dict[str, Any]]:
+    results = []
+    for label, transports in cases.items():
+        samples = [run_child(transports) for _ in range(runs)]
+
+        def median(key: str) -> Optional[float]:
+            values = [s[key] for s in samples if s[key] is not None]
+            return round(statistics.median(values), 1) if values else None
+
+        results.append(
+            {
+                "transport": label,
+                "base_import_ms": median("base_ms"),
+                "transport_import_ms": median("transport_ms"),
+                "total_import_ms": round(median("base_ms") + median("transport_ms"), 1),
+                "base_rss_mb": median("base_rss_mb"),
+                "rss_mb": median("rss_mb"),
+                "errors": samples[0]["errors"],
+            }
+        )
+    return results
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(f"{'transport':<10} {'base ms':>8} {'+transport ms':>14} {'total ms':>9} {'base MB':>8} {'RSS MB':>7}")
+    for r in results:
+        print(
+            f"{r['transport']:<10} {r['base_import_ms']:>8} {r['transport_import_ms']:>14} "
+            f"{r['total_import_ms']:>9} {r['base_rss_mb']:>8} {r['rss_mb']:>7}"
+        )
+        for name, error in r["errors"].items():
+            print(f"  {name} not available: {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transports", default="twilio,webrtc,daily", help="comma-separated plug-in names")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per transport (median reported)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(measure_in_process([t for t in args.child.split(",") if t])))
+        return
+
+    names = [t.strip() for t in args.transports.split(",") if t.strip()]
+    cases = {"none": [], **{name: [name] for name in names}, "all": names}
+    results = benchmark(cases, args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Twilio media-stream load generator for the bot server.
+
+Opens N concurrent websockets that speak the Twilio Media Streams protocol, streams
+8 kHz u-law audio in real time and measures how long the bot takes to answer. Run the
+bot with LOADTEST_FAKE_SERVICES=true (or point the test number at an agent whose
+providers are "fake") to keep provider latency deterministic.
+
+    python -m core.loadtest.twilio_load --url ws://localhost:7860/ws \\
+        --concurrency 5,10,20,40 --audio caller.wav --server-pid $(pgrep -f core/bot.py)
+
+Each concurrency step reports calls/s, time to first audio (end of the caller's first
+utterance -> first bot audio), per-turn response latency, failures and, with
+--server-pid, CPU seconds and resident memory per call. The first step that breaks
+the latency SLO or the failure budget is reported as the saturation point.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import time
+import uuid
+import wave
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import websockets
+
+from core.utils.audio import resample, ulaw_decode, ulaw_encode
+
+SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000  # u-law: one byte per sample
+SILENCE_BYTE = b"\xff"
+
+
+def load_audio(path: Optional[str]) -> bytes:
+    """8 kHz u-law bytes from a WAV (16-bit PCM, any rate, mixed to mono) or raw .ulaw file.
+
+    Without a file, a synthetic voiced signal is generated: it exercises the pipeline but
+    may not trigger Silero VAD reliably, so use a real recording for meaningful numbers.
+    """
+    if path is None:
+        return synthetic_utterances()
+    if path.endswith((".ulaw", ".raw")):
+        with open(path, "rb") as f:
+            return f.read()
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError("WAV input must be 16-bit PCM")
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        if w.getnchannels() > 1:
+            pcm = pcm.reshape(-1, w.getnchannels()).mean(axis=1).astype(np.int16)
+        rate = w.getframerate()
+    return ulaw_encode(resample(pcm, rate, SAMPLE_RATE))
+
+
+def synthetic_utterances(count: int = 4, speech_s: float = 1.6, pause_s: float = 3.0) -> bytes:
+    """Vowel-like pulse trains with a wobbling pitch, separated by silence."""
+    t = np.arange(int(SAMPLE_RATE * speech_s)) / SAMPLE_RATE
+    pitch = 120 + 25 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.cumsum(pitch) * np.pi / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.sin(np.pi * t / speech_s) ** 0.5 * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    speech = (voiced * envelope * 6000).astype(np.int16)
+    silence = np.zeros(int(SAMPLE_RATE * pause_s), dtype=np.int16)
+    return ulaw_encode(np.concatenate([np.concatenate([speech, silence]) for _ in range(count)]))
+
+
+def utterance_ends(ulaw: bytes, min_pause_ms: int = 500) -> List[float]:
+    """Offsets (s) in the audio where an utterance ends: last loud frame before >= min_pause_ms of quiet."""
+    frames = [ulaw[i:i + FRAME_BYTES] for i in range(0, len(ulaw) - FRAME_BYTES + 1, FRAME_BYTES)]
+    loud = [float(np.sqrt(np.mean(ulaw_decode(f).astype(np.float64) ** 2))) > 500 for f in frames]
+    ends, quiet_needed = [], min_pause_ms // FRAME_MS
+    for i in range(len(loud)):
+        if loud[i] and (i + 1 < len(loud)) and not any(loud[i + 1:i + 1 + quiet_needed]):
+            ends.append((i + 1) * FRAME_MS / 1000)
+    return ends
+
+
+@dataclass
+class CallResult:
+    ok: bool = False
+    error: Optional[str] = None
+    first_audio_ms: Optional[float] = None
+    turn_latencies_ms: List[float] = field(default_factory=list)
+    audio_frames_received: int = 0
+
+
+async def run_call(url: str, audio: bytes, ends: List[float], call_seconds: float) -> CallResult:
+    """One simulated Twilio call: handshake, real-time media, response timing, stop."""
+    result = CallResult()
+    stream_sid, call_sid = f"MZ{uuid.uuid4().hex}", f"CA{uuid.uuid4().hex}"
+    received: List[float] = []
+    try:
+        async with websockets.connect(url, open_timeout=10, max_size=None) as ws:
+            await ws.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+            await ws.send(json.dumps({
+                "event": "start",
+                "sequenceNumber": "1",
+                "streamSid": stream_sid,
+                "start": {
+                    "streamSid": stream_sid,
+                    "accountSid": "AC" + "0" * 32,
+                    "callSid": call_sid,
+                    "tracks": ["inbound"],
+                    "customParameters": {"loadtest": "true"},
+                    "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": SAMPLE_RATE, "channels": 1},
+                },
+            }))
+
+            async def receive() -> None:
+                async for message in ws:
+                    event = json.loads(message)
+                    if event.get("event") == "media":
+                        received.append(time.monotonic())
+
+            receiver = asyncio.create_task(receive())
+            start = time.monotonic()
+            sent_ends: List[float] = []
+            offset, seq = 0, 2
+            while time.monotonic() - start < call_seconds and not receiver.done():
+                in_loop = offset % len(audio)
+                chunk = audio[in_loop:in_loop + FRAME_BYTES].ljust(FRAME_BYTES, SILENCE_BYTE)
+                position = offset / SAMPLE_RATE
+                # The audio loops; note the wall-clock time each utterance end goes out.
+                for end in ends:
+                    if 0 <= end - in_loop / SAMPLE_RATE < FRAME_MS / 1000:
+                        sent_ends.append(start + position + end - in_loop / SAMPLE_RATE)
+                await ws.send(json.dumps({
+                    "event": "media",
+                    "sequenceNumber": str(seq),
+                    "streamSid": stream_sid,
+                    "media": {
+                        "track": "inbound",
+                        "chunk": str(seq - 1),
+                        "timestamp": str(int(position * 1000)),
+                        "payload": base64.b64encode(chunk).decode(),
+                    },
+                }))
+                offset += FRAME_BYTES
+                seq += 1
+                # Pace to real time against the call's own clock (no drift from send time).
+                await asyncio.sleep(max(0.0, start + offset / SAMPLE_RATE - time.monotonic()))
+            await ws.send(json.dumps({"event": "stop", "streamSid": stream_sid, "stop": {"callSid": call_sid}}))
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    result.audio_frames_received = len(received)
+    for end in sent_ends:
+        reply = next((t for t in received if t > end), None)
+        if reply is not None:
+            result.turn_latencies_ms.append((reply - end) * 1000)
+    if result.turn_latencies_ms:
+        result.first_audio_ms = result.turn_latencies_ms[0]
+    result.ok = result.first_audio_ms is not None
+    if not result.ok:
+        result.error = "no bot audio after the caller spoke"
+    return result
+
+
+class ProcessSampler:
+    """CPU seconds and peak RSS of the bot server process, read from /proc (Linux)."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def cpu_seconds(self) -> Optional[float]:
+        if not self.pid:
+            return None
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss_mb(self) -> Optional[float]:
+        if not self.pid:
+            return None
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return None
+
+    async def _sample(self) -> None:
+        while True:
+            self.peak_rss_mb = max(self.peak_rss_mb, self.rss_mb() or 0.0)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak_rss_mb = self.rss_mb() or 0.0
+        if self.pid:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+def pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+async def run_step(args: argparse.Namespace, concurrency: int, audio: bytes, ends: List[float]) -> Dict[str, Any]:
+    sampler = ProcessSampler(args.server_pid)
+    baseline_rss = sampler.rss_mb()
+    cpu_before = sampler.cpu_seconds()
+    sampler.start()
+    started = time.monotonic()
+
+    async def staggered(i: int) -> CallResult:
+        await asyncio.sleep(args.ramp_seconds * i / max(concurrency, 1))
+        return await run_call(args.url, audio, ends, args.call_seconds)
+
+    results: List[CallResult] = await asyncio.gather(*[staggered(i) for i in range(concurrency)])
+    elapsed = time.monotonic() - started
+    await sampler.stop()
+    cpu_after = sampler.cpu_seconds()
+
+    ok = [r for r in results if r.ok]
+    first = [r.first_audio_ms for r in ok]
+    turns = [t for r in ok for t in r.turn_latencies_ms]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r.error:
+            errors[r.error] = errors.get(r.error, 0) + 1
+    step = {
+        "concurrency": concurrency,
+        "calls": len(results),
+        "ok": len(ok),
+        "failure_rate": round(1 - len(ok) / len(results), 3) if results else 0,
+        "calls_per_second": round(len(ok) / elapsed, 2),
+        "first_audio_ms": {f"p{p}": _round(pct(first, p)) for p in (50, 95, 99)},
+        "turn_latency_ms": {f"p{p}": _round(pct(turns, p)) for p in (50, 95, 99)},
+        "errors": errors,
+    }
+    if cpu_before is not None and cpu_after is not None:
+        step["cpu_seconds_per_call"] = round((cpu_after - cpu_before) / max(len(results), 1), 3)
+        step["cpu_utilization"] = round((cpu_after - cpu_before) / elapsed, 2)
+        step["rss_mb_per_call"] = round((sampler.peak_rss_mb - (baseline_rss or 0)) / concurrency, 2)
+        step["peak_rss_mb"] = round(sampler.peak_rss_mb, 1)
+    return step
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def saturated(step: Dict[str, Any], args: argparse.Namespace) -> Optional[str]:
+    p95 = step["turn_latency_ms"]["p95"]
+    if step["failure_rate"] > args.max_failure_rate:
+        return f"failure rate {step['failure_rate']:.1%} > {args.max_failure_rate:.1%}"
+    if p95 is not None and p95 > args.slo_ms:
+        return f"turn latency p95 {p95:.0f} ms > {args.slo_ms:.0f} ms"
+    if step.get("cpu_utilization", 0) >= args.cpu_limit:
+        return f"server CPU at {step['cpu_utilization']:.2f} cores"
+    return None
+
+
+def format_step(step: Dict[str, Any]) -> str:
+    line = (
+        f"c={step['concurrency']:<4} ok={step['ok']}/{step['calls']} calls/s={step['calls_per_second']:<6} "
+        f"first_audio p50/p95/p99={step['first_audio_ms']['p50']}/{step['first_audio_ms']['p95']}/"
+        f"{step['first_audio_ms']['p99']} ms  turn p50/p95={step['turn_latency_ms']['p50']}/"
+        f"{step['turn_latency_ms']['p95']} ms"
+    )
+    if "cpu_seconds_per_call" in step:
+        line += f"  cpu/call={step['cpu_seconds_per_call']}s rss/call={step['rss_mb_per_call']}MB"
+    if step["errors"]:
+        line += f"  errors={step['errors']}"
+    return line
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    audio = load_audio(args.audio)
+    ends = utterance_ends(audio)
+    if not ends:
+        raise SystemExit("No utterances found in the audio (need speech followed by >= 500 ms of silence)")
+    steps, saturation = [], None
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        step = await run_step(args, concurrency, audio, ends)
+        steps.append(step)
+        print(format_step(step), flush=True)
+        reason = saturated(step, args)
+        if reason:
+            saturation = {"concurrency": concurrency, "reason": reason}
+            print(f"Saturated at concurrency {concurrency}: {reason}")
+            break
+        await asyncio.sleep(args.cooldown_seconds)
+    if saturation is None:
+        print("Saturation not reached")
+    return {"steps": steps, "saturation": saturation}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Twilio media-stream load generator for the bot server")
+    parser.add_argument("--url", default="ws://localhost:7860/ws")
+    parser.add_argument("--concurrency", default="1,5,10,20,40", help="Comma-separated concurrent calls per step")
+    parser.add_argument("--audio", default=None, help="Caller audio: 16-bit WAV or raw 8 kHz u-law")
+    parser.add_argument("--call-seconds", type=float, default=20.0)
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="Spread call starts over this long")
+    parser.add_argument("--cooldown-seconds", type=float, default=3.0)
+    parser.add_argument("--server-pid", type=int, default=None, help="Bot server PID for CPU/memory per call")
+    parser.add_argument("--slo-ms", type=float, default=1500.0, help="Turn latency p95 that counts as saturated")
+    parser.add_argument("--max-failure-rate", type=float, default=0.01)
+    parser.add_argument("--cpu-limit", type=float, default=0.9 * (os.cpu_count() or 1), help="Cores")
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
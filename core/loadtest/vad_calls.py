@@ -0,0 +1,116 @@
+"""Per-call VAD cost: memory and time to listen, per-call Silero model vs the shared one.
+
+Each mode runs in a fresh interpreter so one mode's loaded model never hides the cost
+of the other:
+
+    python -m core.loadtest.vad_calls --calls 1,200
+
+A simulated call creates its VAD analyzer the way bot() does and analyzes its first
+8 kHz frame; the analyzers are kept alive, as they are for the length of a call.
+"per-call" builds a SileroVADAnalyzer, which loads its own ONNX model (what every call
+did before the registry); "shared" uses vad_registry.create_analyzer() after the
+one-off vad_registry.load() a worker runs at startup. Reported per mode and call count:
+RSS added per call, time to listen (mean and p95), and for "shared" the startup load.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+SAMPLE_RATE = 8000
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def measure_in_process(mode: str, calls: int) -> Dict[str, Any]:
+    from pipecatfork.src.pipecat.audio.vad.silero import SileroVADAnalyzer
+
+    from core.services.vad_registry import vad_registry
+
+    load_ms = None
+    if mode == "shared":
+        start = time.perf_counter()
+        vad_registry.load()
+        load_ms = (time.perf_counter() - start) * 1000
+    base_rss = _rss_mb()
+    analyzers = []
+    listen_ms = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        analyzer = vad_registry.create_analyzer() if mode == "shared" else SileroVADAnalyzer()
+        analyzer.set_sample_rate(SAMPLE_RATE)
+        await analyzer.analyze_audio(bytes(analyzer.num_frames_required() * 2))
+        listen_ms.append((time.perf_counter() - start) * 1000)
+        analyzers.append(analyzer)
+    rss = _rss_mb()
+    listen_ms.sort()
+    return {
+        "mode": mode,
+        "calls": calls,
+        "load_ms": round(load_ms, 1) if load_ms is not None else None,
+        "mb_per_call": round((rss - base_rss) / calls, 2) if rss is not None and base_rss is not None else None,
+        "listen_mean_ms": round(statistics.mean(listen_ms), 2),
+        "listen_p95_ms": round(listen_ms[min(int(len(listen_ms) * 0.95), len(listen_ms) - 1)], 2),
+    }
+
+
+def run_child(mode: str, calls: int) -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, "-m", "core.loadtest.vad_calls", "--child", f"{mode}:{calls}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "LOGURU_LEVEL": "ERROR"},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-call VAD memory and time to listen")
+    parser.add_argument("--calls", default="1,200", help="Comma-separated concurrent call counts")
+    parser.add_argument("--modes", default="per-call,shared", help="Comma-separated: per-call, shared")
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.child is not None:
+        mode, calls = args.child.split(":")
+        print(json.dumps(asyncio.run(measure_in_process(mode, int(calls)))))
+        return
+
+    reports = [
+        run_child(mode, int(calls))
+        for mode in args.modes.split(",")
+        for calls in args.calls.split(",")
+    ]
+    for r in reports:
+        load = f", startup load {r['load_ms']} ms" if r["load_ms"] is not None else ""
+        print(
+            f"{r['mode']:<8} {r['calls']:>4} calls: {r['mb_per_call']} MB per call, "
+            f"listen mean {r['listen_mean_ms']} ms p95 {r['listen_p95_ms']} ms{load}"
+        )
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
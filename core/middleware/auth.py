@@ -3,15 +3,21 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from typing import Optional, Dict, Any
 import time
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from core.config import settings
+from core.config import secret_store, settings
 from core.context import set_tenant_context
+from core.middleware.token_cache import RevocationLog, verified_token_cache
+from core.database.session import SessionLocal
+from core.models.token_revocation import TokenRevocation
 
 
 security = HTTPBearer()
 
 class JWTClaims(BaseModel):
+    # Instances are shared across requests through the verified token cache.
+    model_config = ConfigDict(frozen=True)
+
     user_id: int
     org_id: Optional[int] = None
     role: Optional[str] = None
@@ -35,6 +41,17 @@ class JWTManager:
         self.secret_key = settings.JWT_SECRET_KEY
         self.algorithm = settings.JWT_ALGORITHM
         self.access_token_expire_hours = settings.ACCESS_TOKEN_EXPIRE_HOURS
+        self.cache_namespace = "core"
+        self.revocations = RevocationLog(
+            self.cache_namespace, SessionLocal, TokenRevocation, sync_seconds=settings.JWT_REVOCATION_SYNC_SECONDS
+        )
+        secret_store.on_change(self.reload_keys)
+
+    def reload_keys(self) -> None:
+        """Pick up a rotated JWT_SECRET_KEY after a secret refresh; claims verified with the old key are dropped."""
+        if settings.JWT_SECRET_KEY != self.secret_key:
+            self.secret_key = settings.JWT_SECRET_KEY
+            verified_token_cache.forget_namespace(self.cache_namespace)
 
     def create_access_token(
         self,
@@ -57,11 +74,26 @@ class JWTManager:
         return token
 
     def decode_token(self, token: str) -> JWTClaims:
+        self.revocations.sync()
+        claims = verified_token_cache.get(self.cache_namespace, token)
+        if claims is None:
+            claims = self._verify(token)
+            verified_token_cache.put(self.cache_namespace, token, claims)
+        if verified_token_cache.is_revoked(self.cache_namespace, token, claims):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        return claims
+
+    def _verify(self, token: str, verify_exp: bool = True) -> JWTClaims:
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(
+                token, self.secret_key, algorithms=[self.algorithm], options={"verify_exp": verify_exp}
+            )
 
             current_time = int(time.time())
-            if payload.get("exp", 0) < current_time:
+            if verify_exp and payload.get("exp", 0) < current_time:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token has expired"
@@ -84,6 +116,21 @@ class JWTManager:
         token = credentials.credentials
         return self.decode_token(token)
 
+    def revoke_token(self, token: str) -> None:
+        """Reject this token for the rest of its lifetime (logout).
+
+        Only the signature is checked: logging out again with a token that is already
+        revoked or expired is a no-op rather than a 401.
+        """
+        claims = self._verify(token, verify_exp=False)
+        if claims.exp < int(time.time()) or verified_token_cache.is_revoked(self.cache_namespace, token, claims):
+            return
+        self.revocations.revoke_token(token, claims.exp)
+
+    def revoke_user(self, user_id: int) -> None:
+        """Reject all tokens issued to the user so far (role change, removal from org)."""
+        self.revocations.revoke_user(user_id, self.access_token_expire_hours * 3600)
+
 
 jwt_manager = JWTManager()
 
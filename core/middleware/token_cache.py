@@ -0,0 +1,213 @@
+"""Process-wide LRU cache of verified JWT claims, with token and per-user revocation."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from core.config import settings
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of claims for tokens whose signature has already been verified.
+
+    Keys are (namespace, sha256(token)) so core and EE tokens, which are signed with
+    different settings, never share entries. An entry lives until the token's exp.
+
+    revoke_token() (logout) rejects one token until it expires, revoke_user() (role
+    change, removal) rejects every token of that user issued at or before the call.
+    Revocations are also applied to tokens that are not cached yet, via is_revoked().
+    They only affect this process; RevocationLog shares them with the other workers.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, int]]" = OrderedDict()
+        self._revoked_tokens: Dict[str, int] = {}
+        # (namespace, user_id) -> (revoked_at, forget_after)
+        self._revoked_users: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, token: str) -> Optional[Any]:
+        key = (namespace, token_digest(token))
+        now = int(time.time())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, exp = entry
+            if exp < now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, namespace: str, token: str, claims: Any) -> None:
+        key = (namespace, token_digest(token))
+        with self._lock:
+            self._entries[key] = (claims, claims.exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, namespace: str, token: str, claims: Any) -> bool:
+        if not self._revoked_tokens and not self._revoked_users:
+            return False
+        if token_digest(token) in self._revoked_tokens:
+            return True
+        revocation = self._revoked_users.get((namespace, claims.user_id))
+        return revocation is not None and claims.iat <= revocation[0]
+
+    def revoke_token(self, namespace: str, token: str, exp: int) -> None:
+        """Reject this token from now until it expires (logout)."""
+        self.revoke_digest(namespace, token_digest(token), exp)
+
+    def revoke_digest(self, namespace: str, digest: str, exp: int) -> None:
+        now = int(time.time())
+        with self._lock:
+            self._entries.pop((namespace, digest), None)
+            self._revoked_tokens[digest] = exp
+            self._prune_revocations(now)
+
+    def revoke_user(
+        self, namespace: str, user_id: int, max_token_lifetime: int, revoked_at: Optional[int] = None
+    ) -> None:
+        """Reject every token of the user issued up to revoked_at (default now; role change, removal from org).
+
+        The revocation is forgotten once every token it could apply to has expired.
+        """
+        now = int(time.time())
+        revoked_at = now if revoked_at is None else revoked_at
+        with self._lock:
+            for key in [
+                k for k, (claims, _) in self._entries.items()
+                if k[0] == namespace and claims.user_id == user_id and claims.iat <= revoked_at
+            ]:
+                del self._entries[key]
+            previous = self._revoked_users.get((namespace, user_id))
+            if previous is None or previous[0] < revoked_at:
+                self._revoked_users[(namespace, user_id)] = (revoked_at, revoked_at + max_token_lifetime)
+            self._prune_revocations(now)
+
+    def _prune_revocations(self, now: int) -> None:
+        for digest in [d for d, exp in self._revoked_tokens.items() if exp < now]:
+            del self._revoked_tokens[digest]
+        for key in [k for k, (_, forget_after) in self._revoked_users.items() if forget_after < now]:
+            del self._revoked_users[key]
+
+    def forget_namespace(self, namespace: str) -> None:
+        """Drop the cached claims of one namespace (its signing key changed); revocations stay."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked_tokens.clear()
+            self._revoked_users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "revoked_tokens": len(self._revoked_tokens),
+                "revoked_users": len(self._revoked_users),
+            }
+
+
+verified_token_cache = VerifiedTokenCache(max_entries=settings.JWT_CLAIMS_CACHE_SIZE)
+
+
+class RevocationLog:
+    """Shares one namespace's revocations between processes through a token_revocations table.
+
+    revoke_token() and revoke_user() write a row and apply it to this process's cache
+    at once. Other processes (uvicorn --workers, other instances) apply it on their next
+    sync(), which decode_token runs at most every sync_seconds. So a logout or role change
+    is enforced everywhere within JWT_REVOCATION_SYNC_SECONDS. If the table cannot be
+    read, a process keeps the revocations it already has and tries again on the next sync.
+    """
+
+    # Rows revoked this long before the previous sync are read again: covers transactions
+    # that commit late and clock differences between servers
+    OVERLAP_SECONDS = 60
+
+    def __init__(
+        self,
+        namespace: str,
+        session_factory: Callable[[], Any],
+        model: Any,
+        cache: VerifiedTokenCache = verified_token_cache,
+        sync_seconds: float = 2.0,
+    ):
+        self.namespace = namespace
+        self.session_factory = session_factory
+        self.model = model
+        self.cache = cache
+        self.sync_seconds = sync_seconds
+        self._sync_lock = threading.Lock()
+        self._synced_at = 0.0
+        self._since: Optional[int] = None
+
+    def revoke_token(self, token: str, exp: int) -> None:
+        digest = token_digest(token)
+        self._write(token_digest=digest, revoked_at=int(time.time()), expires_at=exp)
+        self.cache.revoke_digest(self.namespace, digest, exp)
+
+    def revoke_user(self, user_id: int, max_token_lifetime: int) -> None:
+        now = int(time.time())
+        self._write(user_id=user_id, revoked_at=now, expires_at=now + max_token_lifetime)
+        self.cache.revoke_user(self.namespace, user_id, max_token_lifetime, revoked_at=now)
+
+    def sync(self) -> None:
+        """Apply revocations written by other processes; a no-op until sync_seconds have passed."""
+        if time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        # One thread syncs; the others go on with what is already applied
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._synced_at = time.monotonic()
+            now = int(time.time())
+            model = self.model
+            with self.session_factory() as db:
+                query = db.query(model.token_digest, model.user_id, model.revoked_at, model.expires_at).filter(
+                    model.namespace == self.namespace, model.expires_at >= now
+                )
+                if self._since is not None:
+                    query = query.filter(model.revoked_at >= self._since - self.OVERLAP_SECONDS)
+                rows = query.all()
+            for digest, user_id, revoked_at, expires_at in rows:
+                if digest:
+                    self.cache.revoke_digest(self.namespace, digest, expires_at)
+                elif user_id is not None:
+                    self.cache.revoke_user(self.namespace, user_id, expires_at - revoked_at, revoked_at=revoked_at)
+            self._since = now
+        except Exception as e:
+            logger.warning(f"Token revocation sync failed for {self.namespace}: {e}")
+        finally:
+            self._sync_lock.release()
+
+    def _write(self, **values: Any) -> None:
+        now = int(time.time())
+        with self.session_factory() as db:
+            db.query(self.model).filter(self.model.expires_at < now).delete(synchronize_session=False)
+            db.add(self.model(namespace=self.namespace, **values))
+            db.commit()
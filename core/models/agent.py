@@ -22,6 +22,8 @@ class Agent(TimestampModel):
     total_calls = Column(Integer, default=0)
     total_minutes = Column(Numeric(10, 2), default=0)
     average_rating = Column(Numeric(3, 2), default=0)
+    # Number of rated calls behind average_rating, so the rollup can update it incrementally
+    rated_calls = Column(Integer, default=0)
     created_by = Column(BigInteger, ForeignKey('users.id'))
     meta_data = Column(JSONB, nullable=True, default={})
     status = Column(String, nullable=True, default='active')
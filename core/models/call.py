@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, String, Integer, Numeric, ForeignKey, Index, text
+
+from core.models.base import TimestampModel
+
+
+class Call(TimestampModel):
+    """One telephony/WebRTC call handled by a bot worker; written at call start and end."""
+
+    __tablename__ = 'calls'
+    __table_args__ = (
+        # Ended calls not yet folded into the agent counters (the rollup worker's queue)
+        Index('ix_calls_pending_rollup', 'id', postgresql_where=text('ended_at IS NOT NULL AND rolled_up_at IS NULL')),
+        # Calls not ended yet (the in-progress count on /health/ready); stays as small as the live call count
+        Index('ix_calls_in_progress', 'started_at', postgresql_where=text('ended_at IS NULL')),
+    )
+
+    call_id = Column(String, nullable=False, unique=True)
+    agent_id = Column(BigInteger, ForeignKey('agents.id', ondelete='SET NULL'), nullable=True, index=True)
+    transport = Column(String, nullable=True)
+    from_number = Column(String, nullable=True)
+    to_number = Column(String, nullable=True)
+    # in_progress -> completed | failed
+    status = Column(String, nullable=False, default='in_progress')
+    started_at = Column(BigInteger, nullable=False)
+    ended_at = Column(BigInteger, nullable=True)
+    duration_seconds = Column(Integer, nullable=True)
+    rating = Column(Numeric(3, 2), nullable=True)
+    # Set when the call has been counted in agents.total_calls / total_minutes / average_rating
+    rolled_up_at = Column(BigInteger, nullable=True)
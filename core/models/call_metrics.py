@@ -0,0 +1,39 @@
+from sqlalchemy import Column, BigInteger, String, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+
+from core.models.base import TimestampModel
+
+
+class CallMetrics(TimestampModel):
+    """One latency summary per finished call, written in batches by CallMetricsWriter."""
+
+    __tablename__ = 'call_metrics'
+    __table_args__ = (
+        Index('ix_call_metrics_agent_id_started_at', 'agent_id', 'started_at'),
+        Index('ix_call_metrics_providers', 'llm_provider', 'stt_provider', 'tts_provider'),
+    )
+
+    call_id = Column(String, nullable=True, index=True)
+    agent_id = Column(BigInteger, ForeignKey('agents.id', ondelete='SET NULL'), nullable=True)
+    transport = Column(String, nullable=True)
+    llm_provider = Column(String, nullable=True)
+    llm_model = Column(String, nullable=True)
+    stt_provider = Column(String, nullable=True)
+    tts_provider = Column(String, nullable=True)
+    started_at = Column(BigInteger, nullable=False)
+    ended_at = Column(BigInteger, nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    turns = Column(Integer, nullable=False, default=0)
+    interruptions = Column(Integer, nullable=False, default=0)
+    # Per-call percentiles in milliseconds, as columns so they can be aggregated by provider
+    stt_p50_ms = Column(Integer)
+    stt_p95_ms = Column(Integer)
+    llm_ttft_p50_ms = Column(Integer)
+    llm_ttft_p95_ms = Column(Integer)
+    tts_ttfb_p50_ms = Column(Integer)
+    tts_ttfb_p95_ms = Column(Integer)
+    v2v_p50_ms = Column(Integer)
+    v2v_p95_ms = Column(Integer)
+    v2v_max_ms = Column(Integer)
+    # {metric: {count, mean, p50, p90, p95, p99, max}} plus token / character usage
+    summary = Column(JSONB, nullable=False, default={})
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, String, Integer, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import declared_attr
+
+from core.models.base import TimestampModel
+
+
+class EmailOutboxMixin:
+    """Columns of an outbox row: one email to render and deliver, written in the caller's transaction."""
+
+    template = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    context = Column(JSONB, nullable=False, default={})
+    # pending -> sent, or failed once max attempts are used up
+    status = Column(String, nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    # Due time while pending; pushed forward as a lease while a worker is sending it
+    next_attempt_at = Column(BigInteger, nullable=False)
+    last_error = Column(Text)
+    provider_message_id = Column(String)
+    sent_at = Column(BigInteger)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (Index(f'ix_{cls.__tablename__}_status_next_attempt_at', 'status', 'next_attempt_at'),)
+
+
+class EmailOutbox(EmailOutboxMixin, TimestampModel):
+    __tablename__ = 'email_outbox'
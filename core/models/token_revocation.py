@@ -0,0 +1,28 @@
+from sqlalchemy import Column, BigInteger, String, Index
+from sqlalchemy.orm import declared_attr
+
+from core.models.base import TimestampModel
+
+
+class TokenRevocationMixin:
+    """A logout (token_digest) or a per-user revocation (user_id), shared by every API process."""
+
+    namespace = Column(String, nullable=False)
+    # sha256 of the revoked token; null for a per-user revocation
+    token_digest = Column(String)
+    # Tokens of this user issued at or before revoked_at are rejected
+    user_id = Column(BigInteger)
+    revoked_at = Column(BigInteger, nullable=False)
+    # Once past, no token the row applies to is valid any more
+    expires_at = Column(BigInteger, nullable=False)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (
+            Index(f'ix_{cls.__tablename__}_revoked_at', 'revoked_at'),
+            Index(f'ix_{cls.__tablename__}_expires_at', 'expires_at'),
+        )
+
+
+class TokenRevocation(TokenRevocationMixin, TimestampModel):
+    __tablename__ = 'token_revocations'
@@ -8,6 +8,9 @@ from uuid import UUID
 from fastapi import HTTPException, status
 
 from core.services.base import BaseService
+from core.services.agent_runtime_cache import agent_runtime_cache
+from core.services.message_audio import message_audio_renderer
+from core.config import settings
 from core.models.agent_config import AgentConfig
 from core.models.agent import Agent
 
@@ -108,4 +111,8 @@ class AgentConfigService(BaseService):
                 detail=detail,
             ) from e
         config = self.db.query(AgentConfig).filter(AgentConfig.uuid == config_uuid).first()
+        agent_runtime_cache.invalidate_agent(agent_id)
+        if settings.MESSAGE_AUDIO_ENABLED:
+            # Content-addressed: only messages whose text or voice changed are re-rendered
+            message_audio_renderer.schedule(agent_id)
         return config
@@ -1,67 +1,153 @@
 """Factory to build LLM, STT, and TTS instances from an agent's config and run the bot pipeline."""
 
-from typing import Any, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, List, Optional
 
 from loguru import logger
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
 
+from core.config import settings
 from core.models.agent import Agent
 from core.models.agent_config import AgentConfig
 from core.models.api_key import ApiKey
 from core.models.models import Model
 from core.models.service_provider import ServiceProvider
+from core.services import metrics
+from core.services.agent_runtime_cache import (
+    AgentRuntimeSpec,
+    ProviderSpec,
+    agent_runtime_cache,
+    build_provider_spec,
+)
 from core.services.base import BaseService
-from core.utils.encryption import decrypt
+from core.services.call_drain import call_drain
+from core.services.call_metrics import CallLatencyStats, call_metrics_writer
+from core.services.phone_routing_table import phone_routing_table
+from core.services.phrase_cache import PhraseCachedTTS, phrase_cache
+from core.services.provider_registry import provider_registry
+from core.utils.encryption import decrypt_many
+
+_SERVICE_TYPES = ("llm", "stt", "tts")
+_TELEPHONY_TRANSPORTS = ("twilio", "telnyx", "plivo", "exotel")
+
+
+def _provider_name(spec: Optional[AgentRuntimeSpec], service_type: str, service: Any) -> Optional[str]:
+    """Provider name from the agent's spec; the service's class name for env-configured services."""
+    provider_spec = getattr(spec, service_type, None) if spec else None
+    if provider_spec is not None:
+        return provider_spec.provider_name
+    return type(service).__name__ if service is not None else None
 
 
 class AgentFactoryService(BaseService):
     """Build LLM, STT, TTS instances from agent config and run the voice bot pipeline."""
 
-    def _get_agent_config(self, agent: Any) -> Optional[AgentConfig]:
-        """Get the active agent config for the given agent (Agent model or agent_id)."""
-        agent_id = agent.id if hasattr(agent, "id") else agent
-        return (
-            self.db.query(AgentConfig)
-            .filter(
-                AgentConfig.agent_id == agent_id,
-                AgentConfig.status == "active",
-            )
-            .first()
-        )
-
-    def _get_service_and_credentials(
-        self, service_provider_id: Optional[int], service_type: str
-    ) -> Optional[Tuple[Model, ServiceProvider, str]]:
+    def _load_runtime_spec(self, agent_id: int) -> Optional[AgentRuntimeSpec]:
         """
-        Get the first active Model for the given provider and type, plus decrypted API key.
-        Returns (Model, ServiceProvider, decrypted_api_key) or None.
+        Resolve the active config, the first active model per service type, its provider
+        and its API key in a single query, and compile them into an AgentRuntimeSpec.
+        Returns None if the agent has no active config.
         """
-        if not service_provider_id:
+        aliases = {
+            service_type: (aliased(Model), aliased(ServiceProvider), aliased(ApiKey))
+            for service_type in _SERVICE_TYPES
+        }
+        q = (
+            self.db.query(AgentConfig, *[a for triple in aliases.values() for a in triple], Agent.created_by)
+            .select_from(AgentConfig)
+            .join(Agent, Agent.id == AgentConfig.agent_id)
+        )
+        for service_type, (model, provider, api_key) in aliases.items():
+            provider_id_col = getattr(AgentConfig, f"{service_type}_service_id")
+            first_active_model_id = (
+                select(func.min(Model.id))
+                .where(
+                    Model.service_provider_id == provider_id_col,
+                    Model.service_type == service_type,
+                    Model.status == "active",
+                )
+                .correlate(AgentConfig)
+                .scalar_subquery()
+            )
+            q = (
+                q.outerjoin(model, model.id == first_active_model_id)
+                .outerjoin(provider, provider.id == model.service_provider_id)
+                .outerjoin(api_key, api_key.id == model.api_key_id)
+            )
+        row = q.filter(AgentConfig.agent_id == agent_id, AgentConfig.status == "active").first()
+        if not row:
             return None
-        result = (
-            self.db.query(Model, ServiceProvider)
-            .join(ServiceProvider, Model.service_provider_id == ServiceProvider.id)
-            .filter(
-                Model.service_provider_id == service_provider_id,
-                Model.service_type == service_type,
-                Model.status == "active",
+        config, rest, owner_id = row[0], row[1:-1], row[-1]
+        resolved = [rest[3 * i:3 * i + 3] for i in range(len(_SERVICE_TYPES))]
+        api_key_values = decrypt_many(
+            api_key.api_key_encrypted if api_key is not None else None for _, _, api_key in resolved
+        )
+
+        providers = {}
+        for service_type, (model, provider, api_key), api_key_value in zip(
+            _SERVICE_TYPES, resolved, api_key_values
+        ):
+            if api_key is not None and api_key.api_key_encrypted and api_key_value is None:
+                logger.warning("Failed to decrypt API key for model %s", model.id)
+            providers[service_type] = build_provider_spec(
+                service_type,
+                model,
+                provider,
+                api_key.id if api_key is not None else None,
+                api_key_value,
+                getattr(config, f"{service_type}_metadata", None),
             )
-            .first()
+
+        return AgentRuntimeSpec(
+            agent_id=config.agent_id,
+            config_id=config.id,
+            system_prompt=config.system_prompt,
+            first_message=config.first_message,
+            end_call_message=config.end_call_message,
+            voicemail_message=config.voicemail_message,
+            agent_metadata=MappingProxyType(
+                dict(config.agent_metadata) if isinstance(config.agent_metadata, dict) else {}
+            ),
+            llm=providers["llm"],
+            stt=providers["stt"],
+            tts=providers["tts"],
+            service_provider_ids=frozenset(
+                pid
+                for pid in (config.llm_service_id, config.stt_service_id, config.tts_service_id)
+                if pid is not None
+            ),
+            owner_id=owner_id,
         )
-        if not result:
-            return None
-        svc, provider = result
-        api_key_value = None
-        if svc.api_key_id:
-            api_key = self.db.query(ApiKey).filter(ApiKey.id == svc.api_key_id).first()
-            if api_key and api_key.api_key_encrypted:
-                try:
-                    api_key_value = decrypt(api_key.api_key_encrypted)
-                except Exception as e:
-                    logger.warning("Failed to decrypt API key for model %s: %s", svc.id, e)
-        if not api_key_value:
+
+    def get_runtime_spec(self, agent: Any) -> Optional[AgentRuntimeSpec]:
+        """Return the cached runtime spec for the agent, compiling it on a cache miss."""
+        agent_id = agent.id if hasattr(agent, "id") else agent
+        return agent_runtime_cache.get_or_load(agent_id, lambda: self._load_runtime_spec(agent_id))
+
+    def preload_routed_agents(self) -> int:
+        """Load the phone routing table and the runtime spec of every agent it routes to (worker boot)."""
+        phone_routing_table.load(self.db)
+        return sum(1 for agent_id in phone_routing_table.agent_ids() if self.get_runtime_spec(agent_id) is not None)
+
+    def _build_provider(self, agent: Any, service_type: str) -> Optional[Any]:
+        spec = self.get_runtime_spec(agent)
+        provider_spec = getattr(spec, service_type) if spec else None
+        if not provider_spec:
             return None
-        return (svc, provider, api_key_value)
+        return self._build(provider_spec)
+
+    @staticmethod
+    def _build(provider_spec: ProviderSpec, mixin: Optional[type] = None) -> Optional[Any]:
+        """provider_registry.build(), counting failures in bot_provider_errors_total."""
+        try:
+            service = provider_registry.build(provider_spec, mixin=mixin)
+        except Exception:
+            metrics.provider_error(provider_spec.service_type, provider_spec.provider_name, "build")
+            raise
+        if service is None:
+            metrics.provider_error(provider_spec.service_type, provider_spec.provider_name, "build")
+        return service
 
     def get_llm_for_agent(self, agent: Any) -> Optional[Any]:
         """
@@ -69,65 +155,7 @@ class AgentFactoryService(BaseService):
         Uses agent config's llm_service_id (service_provider) and llm_metadata.
         Returns None if config or credentials are missing or provider is unsupported.
         """
-        config = self._get_agent_config(agent)
-
-        if not config or not config.llm_service_id:
-            return None
-        result = self._get_service_and_credentials(config.llm_service_id, "llm")
-        if not result:
-            return None
-        svc, provider, api_key = result
-        metadata = (config.llm_metadata or {}) if hasattr(config, "llm_metadata") else {}
-        model_meta = (svc.meta_data or {}) if isinstance(getattr(svc, "meta_data", None), dict) else {}
-        model = model_meta.get("model") or metadata.get("model") or "gpt-4o"
-        provider_name = (provider.name or "").strip().lower()
-
-
-        try:
-            if provider_name == "openai":
-                from pipecatfork.src.pipecat.services.openai.llm import OpenAILLMService
-                return OpenAILLMService(api_key=f"{api_key}", model="gpt-4.1")
-            if provider_name == "anthropic":
-                from pipecatfork.src.pipecat.services.anthropic.llm import AnthropicLLMService
-                return AnthropicLLMService(api_key=api_key, model=model)
-            if provider_name == "groq":
-                from pipecatfork.src.pipecat.services.groq.llm import GroqLLMService
-                return GroqLLMService(api_key=api_key, model=model)
-            if provider_name == "openrouter":
-                from pipecatfork.src.pipecat.services.openrouter.llm import OpenRouterLLMService
-                return OpenRouterLLMService(api_key=api_key, model=metadata.get("model") or model)
-            if provider_name == "aws_bedrock":
-                from pipecatfork.src.pipecat.services.aws.llm import AWSBedrockLLMService
-                return AWSBedrockLLMService(api_key=api_key, model=model)
-            if provider_name == "aws_nova_sonic":
-                from pipecatfork.src.pipecat.services.aws.llm import AWSNovaSonicLLMService
-                return AWSNovaSonicLLMService(api_key=api_key, model=model)
-            if provider_name == "google":
-                from pipecatfork.src.pipecat.services.google.llm import GoogleLLMService
-                return GoogleLLMService(api_key=api_key, model=model)
-            if provider_name == "gemini_live":
-                from pipecatfork.src.pipecat.services.google.llm import GeminiLiveLLMService
-                return GeminiLiveLLMService(api_key=api_key, model=model)
-            if provider_name == "grok_realtime":
-                from pipecatfork.src.pipecat.services.grok.llm import GrokRealtimeLLMService
-                return GrokRealtimeLLMService(api_key=api_key, model=model)
-            if provider_name == "base_openai":
-                from pipecatfork.src.pipecat.services.openai.llm import BaseOpenAILLMService
-                return BaseOpenAILLMService(api_key=api_key, model=model)
-            if provider_name == "openai_realtime":
-                from pipecatfork.src.pipecat.services.openai.llm import OpenAIRealtimeLLMService
-                return OpenAIRealtimeLLMService(api_key=api_key, model=model)
-            if provider_name == "openai_realtime_beta":
-                from pipecatfork.src.pipecat.services.openai.llm import OpenAIRealtimeBetaLLMService
-                return OpenAIRealtimeBetaLLMService(api_key=api_key, model=model)
-            if provider_name == "ultravox_realtime":
-                from pipecatfork.src.pipecat.services.ultravox.llm import UltravoxRealtimeLLMService
-                return UltravoxRealtimeLLMService(api_key=api_key, model=model)
-            logger.warning("Unsupported LLM provider: %s", provider.name)
-            return None
-        except ImportError as e:
-            logger.exception("LLM provider %s not available", provider_name)
-            return None
+        return self._build_provider(agent, "llm")
 
     def get_stt_for_agent(self, agent: Any) -> Optional[Any]:
         """
@@ -135,173 +163,46 @@ class AgentFactoryService(BaseService):
         Uses agent config's stt_service_id and stt_metadata.
         Returns None if config or credentials are missing or provider is unsupported.
         """
-        config = self._get_agent_config(agent)
-        if not config or not config.stt_service_id:
-            return None
-        result = self._get_service_and_credentials(config.stt_service_id, "stt")
-        if not result:
-            return None
-        svc, provider, api_key = result
-        provider_name = (provider.name or "").strip().lower()
-
-        try:
-            if provider_name == "deepgram":
-                from pipecatfork.src.pipecat.services.deepgram.stt import DeepgramSTTService
-                return DeepgramSTTService(api_key=api_key)
-            if provider_name == "openai":
-                from pipecatfork.src.pipecat.services.openai.stt import OpenAISTTService
-                return OpenAISTTService(api_key=api_key)
-            if provider_name == "groq":
-                from pipecatfork.src.pipecat.services.groq.stt import GroqSTTService
-                return GroqSTTService(api_key=api_key)
-            if provider_name == "segmented":
-                from pipecatfork.src.pipecat.services.segmented.stt import SegmentedSTTService
-                return SegmentedSTTService(api_key=api_key)
-            if provider_name == "azure":
-                from pipecatfork.src.pipecat.services.azure.stt import AzureSTTService
-                return AzureSTTService(api_key=api_key)
-            if provider_name == "deepgram_sagemaker":
-                from pipecatfork.src.pipecat.services.deepgram.stt import DeepgramSageMakerSTTService
-                return DeepgramSageMakerSTTService(api_key=api_key)
-            if provider_name == "google":
-                from pipecatfork.src.pipecat.services.google.stt import GoogleSTTService
-                return GoogleSTTService(api_key=api_key)
-            if provider_name == "nvidia":
-                from pipecatfork.src.pipecat.services.nvidia.stt import NvidiaSTTService
-                return NvidiaSTTService(api_key=api_key)
-            if provider_name == "sarvam":
-                from pipecatfork.src.pipecat.services.sarvam.stt import SarvamSTTService
-                return SarvamSTTService(api_key=api_key)
-            if provider_name == "speechmatics":
-                from pipecatfork.src.pipecat.services.speechmatics.stt import SpeechmaticsSTTService
-                return SpeechmaticsSTTService(api_key=api_key)
-            logger.warning("Unsupported STT provider: %s", provider.name)
-            return None
-        except ImportError as e:
-            logger.warning("STT provider %s not available: %s", provider_name, e)
-            return None
+        return self._build_provider(agent, "stt")
 
     def get_tts_for_agent(self, agent: Any) -> Optional[Any]:
         """
         Build and return the TTS service instance for the given agent.
         Uses agent config's tts_service_id and tts_metadata.
         Returns None if config or credentials are missing or provider is unsupported.
+        With PHRASE_CACHE_ENABLED, short recurring sentences are served from the phrase cache.
         """
-        config = self._get_agent_config(agent)
-        if not config or not config.tts_service_id:
-            return None
-        result = self._get_service_and_credentials(config.tts_service_id, "tts")
-        if not result:
-            return None
-        svc, provider, api_key = result
-        metadata = (config.tts_metadata or {}) if hasattr(config, "tts_metadata") else {}
-        model_meta = (svc.meta_data or {}) if isinstance(getattr(svc, "meta_data", None), dict) else {}
-        voice_id = model_meta.get("voice_id") or metadata.get("voice_id") or "71a7ad14-091c-4e8e-a314-022ece01c121"
-        provider_name = (provider.name or "").strip().lower()
-
-        try:
-            if provider_name == "cartesia":
-                from pipecatfork.src.pipecat.services.cartesia.tts import CartesiaTTSService
-                return CartesiaTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "openai":
-                from pipecatfork.src.pipecat.services.openai.tts import OpenAITTSService
-                return OpenAITTSService(api_key=api_key)
-            if provider_name == "elevenlabs":
-                from pipecatfork.src.pipecat.services.elevenlabs.tts import ElevenLabsTTSService
-                return ElevenLabsTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "playht":
-                from pipecatfork.src.pipecat.services.playht.tts import PlayHTTTSService
-                user_id = model_meta.get("user_id") or metadata.get("user_id") or ""
-                voice_url = model_meta.get("voice_url") or metadata.get("voice_url") or ""
-                return PlayHTTTSService(api_key=api_key, user_id=user_id, voice_url=voice_url)
-            if provider_name == "word":
-                from pipecatfork.src.pipecat.services.word.tts import WordTTSService
-                return WordTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "asyncai_http":
-                from pipecatfork.src.pipecat.services.asyncai.tts import AsyncAIHttpTTSService
-                return AsyncAIHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "aws_polly":
-                from pipecatfork.src.pipecat.services.aws.tts import AWSPollyTTSService
-                return AWSPollyTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "camb":
-                from pipecatfork.src.pipecat.services.camb.tts import CambTTSService
-                return CambTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "cartesia_http":
-                from pipecatfork.src.pipecat.services.cartesia.tts import CartesiaHttpTTSService
-                return CartesiaHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "deepgram_http":
-                from pipecatfork.src.pipecat.services.deepgram.tts import DeepgramHttpTTSService
-                return DeepgramHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "google_http":
-                from pipecatfork.src.pipecat.services.google.tts import GoogleHttpTTSService
-                return GoogleHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "google_base":
-                from pipecatfork.src.pipecat.services.google.tts import GoogleBaseTTSService
-                return GoogleBaseTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "groq":
-                from pipecatfork.src.pipecat.services.groq.tts import GroqTTSService
-                return GroqTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "hathora":
-                from pipecatfork.src.pipecat.services.hathora.tts import HathoraTTSService
-                return HathoraTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "minimax_http":
-                from pipecatfork.src.pipecat.services.minimax.tts import MiniMaxHttpTTSService
-                return MiniMaxHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "neuphonic_http":
-                from pipecatfork.src.pipecat.services.neuphonic.tts import NeuphonicHttpTTSService
-                return NeuphonicHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "nvidia":
-                from pipecatfork.src.pipecat.services.nvidia.tts import NvidiaTTSService
-                return NvidiaTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "piper":
-                from pipecatfork.src.pipecat.services.piper.tts import PiperTTSService
-                return PiperTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "playht_http":
-                from pipecatfork.src.pipecat.services.playht.tts import PlayHTHttpTTSService
-                user_id = model_meta.get("user_id") or metadata.get("user_id") or ""
-                voice_url = model_meta.get("voice_url") or metadata.get("voice_url") or ""
-                return PlayHTHttpTTSService(api_key=api_key, user_id=user_id, voice_url=voice_url)
-            if provider_name == "rime_http":
-                from pipecatfork.src.pipecat.services.rime.tts import RimeHttpTTSService
-                return RimeHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "sarvam_http":
-                from pipecatfork.src.pipecat.services.sarvam.tts import SarvamHttpTTSService
-                return SarvamHttpTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "speechmatics":
-                from pipecatfork.src.pipecat.services.speechmatics.tts import SpeechmaticsTTSService
-                return SpeechmaticsTTSService(api_key=api_key, voice_id=voice_id)
-            if provider_name == "xtts":
-                from pipecatfork.src.pipecat.services.xtts.tts import XTTSService
-                return XTTSService(api_key=api_key, voice_id=voice_id)
-            logger.warning("Unsupported TTS provider: %s", provider.name)
-            return None
-        except ImportError as e:
-            logger.warning("TTS provider %s not available: %s", provider_name, e)
+        if not settings.PHRASE_CACHE_ENABLED:
+            return self._build_provider(agent, "tts")
+        spec = self.get_runtime_spec(agent)
+        if not spec or not spec.tts:
             return None
+        tts = self._build(spec.tts, mixin=PhraseCachedTTS)
+        if tts is not None:
+            tts.enable_phrase_cache(phrase_cache, spec.agent_id, spec.tts)
+        return tts
 
     def get_agent_bot_data(self, agent: Any) -> Optional[dict]:
         """
         Get all data needed to run the bot for an agent: llm, stt, tts, and messages
-        (system_prompt, optional first_message) from agent config.
+        (system_prompt, optional first_message) from the cached agent runtime spec.
         Returns None if config or any required service is missing.
         """
-        config = self._get_agent_config(agent)
-        if not config or not config.system_prompt:
+        spec = self.get_runtime_spec(agent)
+        if not spec or not spec.system_prompt:
             return None
-        llm = self.get_llm_for_agent(agent)
-        stt = self.get_stt_for_agent(agent)
-        tts = self.get_tts_for_agent(agent)
+        with metrics.call_setup_phase("providers"):
+            llm = self.get_llm_for_agent(agent)
+            stt = self.get_stt_for_agent(agent)
+            tts = self.get_tts_for_agent(agent)
         if not llm or not stt or not tts:
             return None
-        messages: List[dict] = [{"role": "system", "content": config.system_prompt}]
-        if getattr(config, "first_message", None) and config.first_message.strip():
-            messages.append({"role": "assistant", "content": config.first_message.strip()})
         return {
             "llm": llm,
             "stt": stt,
             "tts": tts,
-            "messages": messages,
-            "config": config,
+            "messages": spec.messages(),
+            "spec": spec,
         }
 
     async def run_bot_with_components(
@@ -312,10 +213,19 @@ class AgentFactoryService(BaseService):
         stt: Any,
         tts: Any,
         messages: List[dict],
+        spec: Optional[AgentRuntimeSpec] = None,
     ) -> None:
         """
         Run the voice pipeline with the given transport and services.
         Called by run_bot_for_agent or from bot.py with default components.
+
+        When CALL_METRICS_ENABLED, a CallMetricsObserver records the call's latencies and
+        submits one call_metrics row when the pipeline ends.
+
+        On telephony calls the agent's first message is spoken when the client connects,
+        from the pre-rendered message audio when it is cached, otherwise through the TTS.
+        Either way it is not added to the LLM context again: spec.messages() already holds
+        it as the opening assistant turn. Other transports don't speak it, as before.
         """
         from pipecatfork.src.pipecat.processors.aggregators.llm_context import NOT_GIVEN
         from pipecatfork.src.pipecat.processors.aggregators.llm_context import LLMContext
@@ -334,6 +244,8 @@ class AgentFactoryService(BaseService):
         from pipecatfork.src.pipecat.pipeline.runner import PipelineRunner
         from pipecatfork.src.pipecat.pipeline.task import PipelineParams, PipelineTask
 
+        from core.services.call_metrics_observer import ProviderErrorObserver
+
 
         tools = NOT_GIVEN
         context = LLMContext(messages, tools)
@@ -355,6 +267,20 @@ class AgentFactoryService(BaseService):
             ]
         )
 
+        greeting = self._first_message_frames(spec, runner_args)
+
+        observers = [
+            RTVIObserver(rtvi),
+            ProviderErrorObserver(
+                {service: (service_type, _provider_name(spec, service_type, service))
+                 for service_type, service in (("llm", llm), ("stt", stt), ("tts", tts))}
+            ),
+        ]
+        metrics_observer = None
+        if settings.CALL_METRICS_ENABLED:
+            metrics_observer = self._call_metrics_observer(runner_args, spec, llm, stt, tts)
+            observers.append(metrics_observer)
+
         task = PipelineTask(
             pipeline,
             params=PipelineParams(
@@ -362,7 +288,7 @@ class AgentFactoryService(BaseService):
                 enable_metrics=True,
                 enable_usage_metrics=True,
             ),
-            observers=[RTVIObserver(rtvi)],
+            observers=observers,
         )
 
         @rtvi.event_handler("on_client_ready")
@@ -373,6 +299,8 @@ class AgentFactoryService(BaseService):
         @transport.event_handler("on_client_connected")
         async def on_client_connected(transport, client):
             logger.info("Client connected.")
+            if greeting:
+                await task.queue_frames(greeting)
 
         @transport.event_handler("on_client_disconnected")
         async def on_client_disconnected(transport, participant):
@@ -380,7 +308,57 @@ class AgentFactoryService(BaseService):
             await task.cancel()
 
         runner = PipelineRunner(handle_sigint=getattr(runner_args, "handle_sigint", False))
-        await runner.run(task)
+        call_drain.set_pipeline(task)
+        agent_label = metrics.call_started(spec.agent_id if spec else None)
+        try:
+            await runner.run(task)
+        finally:
+            metrics.call_ended(agent_label)
+            call_drain.set_pipeline(None)
+            if metrics_observer is not None:
+                metrics_observer.finish()
+
+    @staticmethod
+    def _first_message_frames(spec: Optional[AgentRuntimeSpec], runner_args: Any) -> List[Any]:
+        from pipecatfork.src.pipecat.frames.frames import TTSSpeakFrame
+
+        from core.services.message_audio import message_audio_renderer, message_text
+
+        text = message_text(spec, "first_message") if spec else None
+        body = getattr(runner_args, "body", None) or {}
+        if not text or body.get("transport_type") not in _TELEPHONY_TRANSPORTS:
+            return []
+        if settings.MESSAGE_AUDIO_ENABLED:
+            audio = message_audio_renderer.lookup(spec, "first_message")
+            if audio is not None:
+                return message_audio_renderer.output_frames(audio)
+            # Not rendered yet (or the voice changed since the last save); next call gets it
+            message_audio_renderer.schedule(spec.agent_id)
+        return [TTSSpeakFrame(text, append_to_context=False)]
+
+    @staticmethod
+    def _call_metrics_observer(
+        runner_args: Any, spec: Optional[AgentRuntimeSpec], llm: Any, stt: Any, tts: Any
+    ) -> Any:
+        from core.services.call_metrics_observer import CallMetricsObserver
+
+        body = getattr(runner_args, "body", None) or {}
+        call_data = body.get("call_data") or {}
+
+        def provider(service_type: str, fallback: Any) -> Optional[str]:
+            return _provider_name(spec, service_type, fallback)
+
+        llm_spec = spec.llm if spec else None
+        stats = CallLatencyStats(
+            call_id=call_data.get("call_id"),
+            agent_id=spec.agent_id if spec else None,
+            transport=body.get("transport_type"),
+            llm_provider=provider("llm", llm),
+            llm_model=getattr(llm, "model_name", None) or (llm_spec.model_meta.get("model") if llm_spec else None),
+            stt_provider=provider("stt", stt),
+            tts_provider=provider("tts", tts),
+        )
+        return CallMetricsObserver(stats, call_metrics_writer, llm=llm, stt=stt, tts=tts)
 
     async def run_bot_for_agent(
         self, agent: Any, transport: Any, runner_args: Any
@@ -388,8 +366,14 @@ class AgentFactoryService(BaseService):
         """
         Get all agent data (llm, stt, tts, prompt) from config and run the bot pipeline.
         Raises ValueError if agent has no config or missing services.
+
+        Everything the call needs is resolved up front and the session is closed before
+        the pipeline starts, so a call never keeps a pooled connection checked out for its
+        duration. Writes made during or after the call must open their own short-lived
+        session with get_db_context().
         """
         data = self.get_agent_bot_data(agent)
+        self.db.close()
         if not data:
             raise ValueError(
                 "Agent has no active config or missing LLM/STT/TTS services. "
@@ -402,4 +386,5 @@ class AgentFactoryService(BaseService):
             stt=data["stt"],
             tts=data["tts"],
             messages=data["messages"],
+            spec=data["spec"],
         )
\ No newline at end of file
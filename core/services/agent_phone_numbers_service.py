@@ -8,6 +8,7 @@ from uuid import UUID
 from fastapi import HTTPException, status
 
 from core.services.base import BaseService
+from core.services.phone_routing_table import normalize_phone_number, phone_routing_table
 from core.models.agent_phone_numbers import AgentPhoneNumbers
 from core.models.agent import Agent
 
@@ -76,7 +77,7 @@ class AgentPhoneNumbersService(BaseService):
         row_id = data.get("id")
         row_uuid_raw = data.get("uuid")
         agent_id = int(data["agent_id"])
-        phone_number = data["phone_number"].strip()
+        phone_number = normalize_phone_number(data["phone_number"]) or data["phone_number"].strip()
         agent = self.db.query(Agent).filter(Agent.id == agent_id).first()
         if not agent:
             raise HTTPException(
@@ -135,4 +136,5 @@ class AgentPhoneNumbersService(BaseService):
                 detail=detail,
             ) from e
         row = self.db.query(AgentPhoneNumbers).filter(AgentPhoneNumbers.uuid == row_uuid).first()
+        phone_routing_table.upsert(row.uuid, row.phone_number, agent.id, agent.name)
         return row
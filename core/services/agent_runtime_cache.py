@@ -0,0 +1,284 @@
+"""Process-wide cache of compiled, immutable agent runtime specs used at call setup."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database.session import SessionLocal
+from core.models.agent import Agent
+from core.models.agent_config import AgentConfig
+from core.models.api_key import ApiKey
+from core.models.models import Model
+from core.models.service_provider import ServiceProvider
+
+# Every table an AgentRuntimeSpec is compiled from
+_SPEC_SOURCES = (Agent, AgentConfig, Model, ApiKey, ServiceProvider)
+
+
+def _freeze(value: Optional[dict]) -> Mapping:
+    return MappingProxyType(dict(value) if isinstance(value, dict) else {})
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """Resolved provider for one service type (llm, stt or tts) of an agent."""
+
+    service_type: str
+    service_provider_id: int
+    provider_name: str
+    model_id: int
+    api_key_id: Optional[int]
+    api_key: str
+    model_meta: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    metadata: Mapping = field(default_factory=lambda: MappingProxyType({}))
+
+
+@dataclass(frozen=True)
+class AgentRuntimeSpec:
+    """Everything needed to build the voice pipeline for an agent, without touching the DB."""
+
+    agent_id: int
+    config_id: int
+    system_prompt: Optional[str]
+    first_message: Optional[str]
+    end_call_message: Optional[str]
+    voicemail_message: Optional[str]
+    agent_metadata: Mapping
+    llm: Optional[ProviderSpec]
+    stt: Optional[ProviderSpec]
+    tts: Optional[ProviderSpec]
+    service_provider_ids: FrozenSet[int] = frozenset()
+    owner_id: Optional[int] = None
+
+    @property
+    def api_key_ids(self) -> FrozenSet[int]:
+        return frozenset(
+            p.api_key_id for p in (self.llm, self.stt, self.tts) if p is not None and p.api_key_id
+        )
+
+    def messages(self) -> List[dict]:
+        """Return a fresh message list (the LLM context mutates it during the call)."""
+        if not self.system_prompt:
+            return []
+        messages: List[dict] = [{"role": "system", "content": self.system_prompt}]
+        if self.first_message and self.first_message.strip():
+            messages.append({"role": "assistant", "content": self.first_message.strip()})
+        return messages
+
+
+def build_provider_spec(
+    service_type: str, model, provider, api_key_id: Optional[int], api_key: Optional[str], metadata: Optional[dict]
+) -> Optional[ProviderSpec]:
+    if model is None or provider is None or not api_key:
+        return None
+    return ProviderSpec(
+        service_type=service_type,
+        service_provider_id=provider.id,
+        provider_name=(provider.name or "").strip().lower(),
+        model_id=model.id,
+        api_key_id=api_key_id,
+        api_key=api_key,
+        model_meta=_freeze(model.meta_data),
+        metadata=_freeze(metadata),
+    )
+
+
+class AgentRuntimeCache:
+    """Thread-safe cache of AgentRuntimeSpec keyed by agent id.
+
+    Entries are dropped explicitly by the upsert paths that change their inputs
+    (agent, agent config, model, API key, service provider). Writes made by another
+    process (the API server, for a bot worker) are picked up by a daemon thread
+    (ensure_refreshing()): every refresh_seconds it compares a version stamp of those
+    tables with the previous one and clears the cache when it changed. The TTL is the
+    backstop if that check keeps failing.
+
+    Invalidations bump a per-agent generation (or, for provider, API key and full
+    invalidations, a global epoch); a load that started before one is not cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        session_factory: Optional[Callable[[], Session]] = None,
+        refresh_seconds: float = 5.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[AgentRuntimeSpec, float]] = {}
+        self._by_service_provider: Dict[int, Set[int]] = {}
+        self._by_api_key: Dict[int, Set[int]] = {}
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._version: Optional[Tuple[Any, ...]] = None
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.discarded_loads = 0
+
+    def get(self, agent_id: int) -> Optional[AgentRuntimeSpec]:
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            spec, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(agent_id)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return spec
+
+    def put(self, spec: AgentRuntimeSpec) -> None:
+        with self._lock:
+            self._put(spec)
+
+    def _put(self, spec: AgentRuntimeSpec) -> None:
+        self._remove(spec.agent_id)
+        self._entries[spec.agent_id] = (spec, time.monotonic() + self.ttl_seconds)
+        for provider_id in spec.service_provider_ids:
+            self._by_service_provider.setdefault(provider_id, set()).add(spec.agent_id)
+        for api_key_id in spec.api_key_ids:
+            self._by_api_key.setdefault(api_key_id, set()).add(spec.agent_id)
+
+    def get_or_load(
+        self, agent_id: int, loader: Callable[[], Optional[AgentRuntimeSpec]]
+    ) -> Optional[AgentRuntimeSpec]:
+        self.ensure_refreshing()
+        spec = self.get(agent_id)
+        if spec is not None:
+            return spec
+        generation = self._generation(agent_id)
+        spec = loader()
+        if spec is not None:
+            with self._lock:
+                # Invalidated while loading: return what was read, but don't cache it
+                if self._generation(agent_id) == generation:
+                    self._put(spec)
+                else:
+                    self.discarded_loads += 1
+        return spec
+
+    def _generation(self, agent_id: int) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(agent_id, 0)
+
+    def invalidate_agent(self, agent_id: Optional[int]) -> None:
+        if agent_id is None:
+            return
+        agent_id = int(agent_id)
+        with self._lock:
+            self._generations[agent_id] = self._generations.get(agent_id, 0) + 1
+            self._remove(agent_id)
+
+    def invalidate_service_providers(self, service_provider_ids: Iterable[Optional[int]]) -> None:
+        with self._lock:
+            # Agents still loading are not in the index yet
+            self._epoch += 1
+            for provider_id in service_provider_ids:
+                if provider_id is None:
+                    continue
+                for agent_id in list(self._by_service_provider.get(int(provider_id), ())):
+                    self._remove(agent_id)
+
+    def invalidate_api_key(self, api_key_id: Optional[int]) -> None:
+        if api_key_id is None:
+            return
+        with self._lock:
+            self._epoch += 1
+            for agent_id in list(self._by_api_key.get(int(api_key_id), ())):
+                self._remove(agent_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_service_provider.clear()
+            self._by_api_key.clear()
+
+    def refresh(self, db: Session) -> bool:
+        """Clear the cache if the spec source tables changed since the last check. Returns True if cleared."""
+        version = self._read_version(db)
+        changed = self._version is not None and version != self._version
+        self._version = version
+        if changed:
+            logger.info("Agent runtime spec sources changed; clearing the agent runtime cache")
+            self.clear()
+        return changed
+
+    def ensure_refreshing(self) -> None:
+        """Start the version check thread if it is not running (first use, or in a forked worker)."""
+        if self.session_factory is None or self.refresh_seconds <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="agent-runtime-refresh", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                with self.session_factory() as db:
+                    self.refresh(db)
+            except Exception as e:
+                logger.warning(f"Agent runtime cache version check failed: {e}")
+            time.sleep(self.refresh_seconds)
+
+    @staticmethod
+    def _read_version(db: Session) -> Tuple[Any, ...]:
+        # Per table: a delete lowers the count or, with inserts, raises the id sum (ids
+        # only grow); updates raise max(updated_at), which every write path sets
+        columns = []
+        for model in _SPEC_SOURCES:
+            columns.extend(
+                select(aggregate).scalar_subquery()
+                for aggregate in (func.count(model.id), func.sum(model.id), func.max(model.updated_at))
+            )
+        return tuple(db.execute(select(*columns)).one())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "discarded_loads": self.discarded_loads,
+            }
+
+    def _remove(self, agent_id: int) -> None:
+        entry = self._entries.pop(agent_id, None)
+        if entry is None:
+            return
+        spec = entry[0]
+        for provider_id in spec.service_provider_ids:
+            agents = self._by_service_provider.get(provider_id)
+            if agents is not None:
+                agents.discard(agent_id)
+                if not agents:
+                    del self._by_service_provider[provider_id]
+        for api_key_id in spec.api_key_ids:
+            agents = self._by_api_key.get(api_key_id)
+            if agents is not None:
+                agents.discard(agent_id)
+                if not agents:
+                    del self._by_api_key[api_key_id]
+
+
+agent_runtime_cache = AgentRuntimeCache(
+    ttl_seconds=settings.AGENT_RUNTIME_CACHE_TTL_SECONDS,
+    session_factory=SessionLocal,
+    refresh_seconds=settings.AGENT_RUNTIME_CACHE_REFRESH_SECONDS,
+)
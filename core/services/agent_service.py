@@ -1,7 +1,8 @@
+from dataclasses import replace
 from decimal import Decimal
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import Dict, Any
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 import time
 import uuid as uuid_lib
 from uuid import UUID
@@ -12,9 +13,11 @@ from core.services.base import BaseService
 from core.models.agent import Agent
 from core.models.agent_config import AgentConfig
 from core.models.agent_phone_numbers import AgentPhoneNumbers
-from core.models.service_provider import ServiceProvider
 from core.models.enums import AgentType
 from core.services.agent_config_service import AgentConfigService
+from core.services.agent_runtime_cache import agent_runtime_cache
+from core.services.phone_routing_table import phone_routing_table
+from core.utils.pagination import ListParams, apply_filters, apply_keyset, paginate
 
 # Keys from request JSON to store in agent_config.agent_metadata
 AGENT_METADATA_KEYS = (
@@ -51,6 +54,79 @@ def _agent_unique_constraint_detail(exc: IntegrityError) -> str:
     return "Unique constraint violated."
 
 
+_AGENT_LIST_COLUMNS = (
+    Agent.id, Agent.uuid, Agent.name, Agent.description, Agent.is_public, Agent.tags,
+    Agent.total_calls, Agent.total_minutes, Agent.average_rating, Agent.created_by,
+    Agent.created_at, Agent.updated_at, Agent.meta_data, Agent.status, Agent.agent_type,
+)
+_CONFIG_LIST_COLUMNS = (
+    AgentConfig.id.label("config_id"),
+    AgentConfig.llm_service_id.label("llm_service_id"),
+    AgentConfig.tts_service_id.label("tts_service_id"),
+    AgentConfig.stt_service_id.label("stt_service_id"),
+    AgentConfig.first_message.label("first_message"),
+    AgentConfig.system_prompt.label("system_prompt"),
+    AgentConfig.end_call_message.label("end_call_message"),
+    AgentConfig.voicemail_message.label("voicemail_message"),
+    AgentConfig.html_prompt.label("html_prompt"),
+    AgentConfig.status.label("config_status"),
+    AgentConfig.llm_metadata.label("llm_metadata"),
+    AgentConfig.tts_metadata.label("tts_metadata"),
+    AgentConfig.stt_metadata.label("stt_metadata"),
+    AgentConfig.agent_metadata.label("agent_metadata"),
+)
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _agent_list_item(row: Mapping[str, Any], phone: Optional[Tuple[str, Any]]) -> Dict[str, Any]:
+    """Build the flat agent + config response item from one row of _AGENT_LIST_COLUMNS/_CONFIG_LIST_COLUMNS."""
+    total_minutes = row["total_minutes"]
+    average_rating = row["average_rating"]
+    agent_type = row["agent_type"]
+    item = {
+        "id": row["id"],
+        "uuid": str(row["uuid"]),
+        "name": row["name"],
+        "description": row["description"],
+        "is_public": row["is_public"],
+        "tags": row["tags"],
+        "total_calls": row["total_calls"],
+        "total_minutes": float(total_minutes) if total_minutes is not None else None,
+        "average_rating": float(average_rating) if average_rating is not None else None,
+        "created_by": row["created_by"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "meta_data": row["meta_data"],
+        "status": row["status"],
+        "agent_type": agent_type.value if agent_type is not None else None,
+        "phone_number": phone[0] if phone else None,
+        "country_code": phone[1] if phone else None,
+    }
+    if row.get("config_id") is None:
+        item["html_prompt"] = None
+        return item
+    agent_meta = _as_dict(row["agent_metadata"])
+    item.update({
+        "llm_service_id": row["llm_service_id"],
+        "tts_service_id": row["tts_service_id"],
+        "stt_service_id": row["stt_service_id"],
+        "llm_model_id": _as_dict(row["llm_metadata"]).get("model_id"),
+        "tts_model_id": _as_dict(row["tts_metadata"]).get("model_id"),
+        "stt_model_id": _as_dict(row["stt_metadata"]).get("model_id"),
+        "first_message": row["first_message"],
+        "system_prompt": row["system_prompt"],
+        "end_call_message": row["end_call_message"],
+        "voicemail_message": row["voicemail_message"],
+        "html_prompt": row["html_prompt"],
+        "config_status": row["config_status"],
+        **{k: agent_meta.get(k) for k in AGENT_METADATA_KEYS},
+    })
+    return item
+
+
 class AgentService(BaseService):
     CREATED_ATTRS = (
         "name", "description", "is_public", "tags",
@@ -156,6 +232,8 @@ class AgentService(BaseService):
                 detail=detail,
             ) from e
         agent = self.db.query(Agent).filter(Agent.uuid == agent_uuid).first()
+        agent_runtime_cache.invalidate_agent(agent.id)
+        phone_routing_table.rename_agent(agent.id, agent.name)
 
         # When id present: edit both agent and agent_config. When id absent: create agent then create agent_config.
         # Run config upsert when system_prompt is provided (create/update) or when html_prompt is provided (update).
@@ -172,61 +250,16 @@ class AgentService(BaseService):
 
     def _agent_response_item(self, agent: Agent, config: Any) -> Dict[str, Any]:
         """Build response dict: agent + config as single flat object (no agent_config key)."""
-        phone_rows = (
-            self.db.query(AgentPhoneNumbers)
+        phone = (
+            self.db.query(AgentPhoneNumbers.phone_number, AgentPhoneNumbers.country_code)
             .filter(AgentPhoneNumbers.agent_id == agent.id)
-            .all()
+            .order_by(AgentPhoneNumbers.id)
+            .first()
         )
-
-        item = {
-            "id": agent.id,
-            "uuid": str(agent.uuid),
-            "name": agent.name,
-            "description": agent.description,
-            "is_public": agent.is_public,
-            "tags": agent.tags,
-            "total_calls": agent.total_calls,
-            "total_minutes": float(agent.total_minutes) if agent.total_minutes is not None else None,
-            "average_rating": float(agent.average_rating) if agent.average_rating is not None else None,
-            "created_by": agent.created_by,
-            "created_at": agent.created_at,
-            "updated_at": agent.updated_at,
-            "meta_data": agent.meta_data,
-            "status": agent.status,
-            "agent_type": agent.agent_type.value if agent.agent_type is not None else None,
-            "phone_number": phone_rows[0].phone_number if phone_rows else None,
-            "country_code": phone_rows[0].country_code if phone_rows else None,
-            
-        }
-        # Phone numbers for this agent (phone_number and country_code only)
-
-        # item["phone_numbers"] = [
-        #     {"phone_number": p.phone_number, "country_code": p.country_code}
-        #     for p in phone_rows
-        # ]
-        if config:
-            agent_meta = config.agent_metadata if isinstance(config.agent_metadata, dict) else {}
-            llm_meta = config.llm_metadata if isinstance(config.llm_metadata, dict) else {}
-            tts_meta = config.tts_metadata if isinstance(config.tts_metadata, dict) else {}
-            stt_meta = config.stt_metadata if isinstance(config.stt_metadata, dict) else {}
-            item.update({
-                "llm_service_id": config.llm_service_id,
-                "tts_service_id": config.tts_service_id,
-                "stt_service_id": config.stt_service_id,
-                "llm_model_id": llm_meta.get("model_id"),
-                "tts_model_id": tts_meta.get("model_id"),
-                "stt_model_id": stt_meta.get("model_id"),
-                "first_message": config.first_message,
-                "system_prompt": config.system_prompt,
-                "end_call_message": config.end_call_message,
-                "voicemail_message": config.voicemail_message,
-                "html_prompt": config.html_prompt,
-                "config_status": config.status,
-                **{k: agent_meta.get(k) for k in AGENT_METADATA_KEYS},
-            })
-        else:
-            item["html_prompt"] = None
-        return item
+        row = {col.key: getattr(agent, col.key) for col in _AGENT_LIST_COLUMNS}
+        if config is not None:
+            row.update({col.key: getattr(config, col.element.key) for col in _CONFIG_LIST_COLUMNS})
+        return _agent_list_item(row, phone)
 
     def _build_agent_config_data(
         self, agent_id: int, data: Dict[str, Any], existing_config: AgentConfig | None = None
@@ -279,28 +312,55 @@ class AgentService(BaseService):
         }
         return config_data
 
-    def get_all_agents(self, agent_id=None, created_by=None):
-        """Return all agents with joined agent_config and service_providers (llm, tts, stt). If agent_id is given, return only that agent."""
-        from sqlalchemy.orm import aliased
-
-        llm_provider = aliased(ServiceProvider)
-        tts_provider = aliased(ServiceProvider)
-        stt_provider = aliased(ServiceProvider)
+    def get_all_agents(self, agent_id=None, created_by=None, params: Optional[ListParams] = None):
+        """Return all agents flattened with their agent_config and first phone number. If agent_id is given, return only that agent.
 
+        Two queries regardless of agent count: agents outer-joined with their config
+        (plain columns, no ORM entities), then one batched IN query for phone numbers.
+        params adds the shared list contract (keyset paging on id, filters, fields).
+        """
+        params = params or ListParams()
+        if params.agent_type is not None:
+            agent_type = self._normalize_agent_type(params.agent_type)
+            if agent_type is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid agent_type",
+                )
+            params = replace(params, agent_type=agent_type)
         q = (
-            self.db.query(Agent, AgentConfig, llm_provider, tts_provider, stt_provider)
+            self.db.query(*_AGENT_LIST_COLUMNS, *_CONFIG_LIST_COLUMNS)
+            .select_from(Agent)
             .outerjoin(AgentConfig, AgentConfig.agent_id == Agent.id)
-            .outerjoin(llm_provider, AgentConfig.llm_service_id == llm_provider.id)
-            .outerjoin(tts_provider, AgentConfig.tts_service_id == tts_provider.id)
-            .outerjoin(stt_provider, AgentConfig.stt_service_id == stt_provider.id)
         )
         if agent_id is not None:
             q = q.filter(Agent.id == agent_id)
         if created_by is not None:
             q = q.filter(Agent.created_by == created_by)
-        rows = q.order_by(Agent.id).all()
+        q = apply_filters(q, params, {
+            "status": Agent.status,
+            "agent_type": Agent.agent_type,
+            "tags": Agent.tags,
+            "created_by": Agent.created_by,
+        })
+        rows = apply_keyset(q, Agent.id, params).all()
+        if params.fields is None or params.fields & {"phone_number", "country_code"}:
+            phones = self._first_phone_numbers([row.id for row in rows])
+        else:
+            phones = {}
+        return paginate([_agent_list_item(row._mapping, phones.get(row.id)) for row in rows], params)
 
-        result = []
-        for agent, config, llm_sp, tts_sp, stt_sp in rows:
-            result.append(self._agent_response_item(agent, config))
-        return result
+    def _first_phone_numbers(self, agent_ids: List[int]) -> Dict[int, Tuple[str, Any]]:
+        """Map agent_id -> (phone_number, country_code) of its first phone number, in one query."""
+        if not agent_ids:
+            return {}
+        phones: Dict[int, Tuple[str, Any]] = {}
+        rows = (
+            self.db.query(AgentPhoneNumbers.agent_id, AgentPhoneNumbers.phone_number, AgentPhoneNumbers.country_code)
+            .filter(AgentPhoneNumbers.agent_id.in_(agent_ids))
+            .order_by(AgentPhoneNumbers.id)
+            .all()
+        )
+        for agent_id, phone_number, country_code in rows:
+            phones.setdefault(agent_id, (phone_number, country_code))
+        return phones
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from uuid import UUID
 import uuid as uuid_lib
 import time
@@ -7,9 +7,11 @@ import time
 from fastapi import HTTPException, status
 
 from core.services.base import BaseService
+from core.services.agent_runtime_cache import agent_runtime_cache
 from core.models.api_key import ApiKey
 from core.models.service_provider import ServiceProvider
 from core.utils.encryption import encrypt, decrypt
+from core.utils.pagination import ListParams, apply_filters, apply_keyset, paginate
 
 
 class ApiKeyService(BaseService):
@@ -73,6 +75,7 @@ class ApiKeyService(BaseService):
 
         record_uuid = values["uuid"]
         api_key = self.db.query(ApiKey).filter(ApiKey.uuid == record_uuid).first()
+        agent_runtime_cache.invalidate_api_key(api_key.id)
 
         return {
             "id": api_key.id,
@@ -87,14 +90,20 @@ class ApiKeyService(BaseService):
             "updated_at": api_key.updated_at
         }
 
-    def get_all_api_keys(self) -> List[Dict[str, Any]]:
-        results = self.db.query(ApiKey, ServiceProvider).join(
+    def get_all_api_keys(self, params: Optional[ListParams] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        params = params or ListParams()
+        query = self.db.query(ApiKey, ServiceProvider).join(
             ServiceProvider, ApiKey.service_provider_id == ServiceProvider.id
-        ).filter(
-            ApiKey.status == 'active'
-        ).all()
-
-        return [{
+        )
+        if params.status is None:
+            query = query.filter(ApiKey.status == 'active')
+        query = apply_filters(query, params, {
+            "status": ApiKey.status,
+            "created_by": ApiKey.created_by,
+        })
+        results = apply_keyset(query, ApiKey.id, params).all()
+
+        return paginate([{
             "id": key.id,
             "uuid": str(key.uuid),
             "name": key.name,
@@ -108,7 +117,7 @@ class ApiKeyService(BaseService):
             "usage_count": key.usage_count,
             "created_at": key.created_at,
             "expires_at": key.expires_at
-        } for key, provider in results]
+        } for key, provider in results], params)
 
     def get_api_key(self, api_key_id: int) -> Dict[str, Any]:
         result = self.db.query(ApiKey, ServiceProvider).join(
@@ -159,6 +168,7 @@ class ApiKeyService(BaseService):
 
         self.db.delete(key)
         self.db.commit()
+        agent_runtime_cache.invalidate_api_key(api_key_id)
 
         return {"message": "API key deleted successfully"}
 
@@ -0,0 +1,266 @@
+"""Content-addressed cache of synthesized audio, with LRU memory and disk tiers."""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Encoding ("ulaw" or "pcm_s16le", mono) and sample rate of cached audio."""
+
+    encoding: str
+    sample_rate: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.encoding}_{self.sample_rate}"
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.sample_rate * (1 if self.encoding == "ulaw" else 2)
+
+
+TELEPHONY_FORMAT = AudioFormat("ulaw", 8000)
+
+
+def audio_cache_key(text: str, provider: str, voice: Mapping[str, Any], fmt: AudioFormat) -> str:
+    """sha256 over everything that changes the rendered audio.
+
+    voice holds the provider's synthesis parameters (voice id, model, language, ...),
+    never credentials. Editing the text or the voice yields a new key, so stale audio
+    is simply never looked up again and ages out of the LRU tiers.
+    """
+    payload = json.dumps(
+        {"text": text, "provider": provider, "voice": dict(voice), "format": fmt.name},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Audio bytes by content key: an in-process LRU in front of an LRU directory.
+
+    The directory may be shared by the API process (which renders on config save) and
+    bot workers (which play at call start). Files are written atomically and their
+    mtime is bumped on every hit, so disk eviction drops the least recently played
+    entries first, whichever process played them.
+    """
+
+    # Copy disk hits into the memory tier
+    promote_disk_hits = True
+
+    def __init__(self, directory: str, max_memory_bytes: int, max_disk_bytes: int):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+        path = self._path(key)
+        try:
+            data = self._read_disk(key, path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Audio cache read failed for {key}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            if self.promote_disk_hits:
+                self._remember(key, data)
+        return data
+
+    def _read_disk(self, key: str, path: str) -> Any:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Audio cache write failed for {key}: {e}")
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict_disk()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            data = self._memory.pop(key, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _scan_disk(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict_disk(self) -> None:
+        """Bring the directory back under 90% of max_disk_bytes, least recently used first."""
+        entries = self._scan_disk()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            target = int(self.max_disk_bytes * 0.9)
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "disk_evictions": self.evictions,
+            }
+
+
+class MmapAudioCache(AudioCache):
+    """AudioCache whose disk tier is served from read-only memory maps.
+
+    Disk hits are returned as the mmap itself instead of being copied into the memory
+    tier: the pages live in the OS page cache, shared by every worker process mapping
+    the same file. Up to max_open_maps mappings stay open; a dropped mapping is closed
+    once its last reader releases it. Since open mappings are read without touching
+    the file, the mtime used for disk LRU is bumped at most once per touch_interval.
+    """
+
+    promote_disk_hits = False
+
+    def __init__(
+        self,
+        directory: str,
+        max_memory_bytes: int,
+        max_disk_bytes: int,
+        max_open_maps: int = 512,
+        touch_interval_seconds: float = 60.0,
+    ):
+        super().__init__(directory, max_memory_bytes, max_disk_bytes)
+        self.max_open_maps = max_open_maps
+        self.touch_interval_seconds = touch_interval_seconds
+        self._maps: "OrderedDict[str, Tuple[mmap.mmap, float]]" = OrderedDict()
+
+    def _read_disk(self, key: str, path: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._maps.get(key)
+            if entry is not None:
+                self._maps.move_to_end(key)
+                mapped, touched_at = entry
+                if now - touched_at < self.touch_interval_seconds:
+                    return mapped
+        if entry is not None:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted from disk by another process; the mapping stays valid.
+                pass
+            with self._lock:
+                if key in self._maps:
+                    self._maps[key] = (mapped, now)
+            return mapped
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        os.utime(path)
+        with self._lock:
+            self._maps[key] = (mapped, now)
+            while len(self._maps) > self.max_open_maps:
+                self._maps.popitem(last=False)
+        return mapped
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._maps.pop(key, None)
+        super().discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        result = super().stats()
+        result["open_maps"] = len(self._maps)
+        return result
@@ -4,6 +4,7 @@ from typing import List, Optional, Dict, Any
 import time
 from uuid import UUID
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from core.services.base import BaseService
 from core.models.user import User
@@ -14,7 +15,7 @@ from core.models.password_reset import PasswordReset
 from core.models.organization_access_request import OrganizationAccessRequest
 from core.models.enums import UserStatus, Role, InviteStatus, AuthProvider, AccessRequestStatus
 from core.middleware.auth import jwt_manager
-from core.utils.security import hash_password, verify_password, generate_verification_code, generate_token
+from core.utils.security import hash_password, verify_password, generate_verification_code, generate_token, password_hasher
 from core.services.email_service import MailService
 from core.config import settings
 
@@ -23,10 +24,8 @@ class AuthService(BaseService):
     def __init__(self, db: Session, user_id: Optional[int] = None):
         super().__init__(db, user_id)
 
-    def signup(self, email: str, password: str, username: Optional[str] = None,
-               profile: Optional[Dict] = None) -> Dict[str, Any]:
-        current_time = int(time.time())
-
+    def validate_signup(self, email: str, username: Optional[str] = None) -> None:
+        """Raise 400 when the email or username is taken."""
         existing_user = self.db.query(User).filter(User.email == email).first()
         if existing_user:
             raise HTTPException(
@@ -42,7 +41,22 @@ class AuthService(BaseService):
                     detail="Username already taken"
                 )
 
-        password_hash = hash_password(password)
+    async def signup_async(self, email: str, password: str, username: Optional[str] = None,
+                           profile: Optional[Dict] = None) -> Dict[str, Any]:
+        """signup() for async routes: the duplicate checks run before bcrypt, so a taken email costs no hash."""
+        await run_in_threadpool(self.validate_signup, email, username)
+        password_hash = await password_hasher.hash_async(password)
+        return await run_in_threadpool(
+            self.signup, email, password, username, profile, password_hash=password_hash
+        )
+
+    def signup(self, email: str, password: str, username: Optional[str] = None,
+               profile: Optional[Dict] = None, password_hash: Optional[str] = None) -> Dict[str, Any]:
+        current_time = int(time.time())
+
+        self.validate_signup(email, username)
+
+        password_hash = password_hash or hash_password(password)
 
         user = User(
             email=email,
@@ -62,8 +76,8 @@ class AuthService(BaseService):
         verification = self.create_email_verification(user.id, email)
         verification_url = f"{settings.APPLICATION_URL}/auth/verify_signup?email={email}&code={verification.code}&user_id={user.id}"
 
-        mail_service = MailService()
-        mail_service.send_signup_email(email, verification_url, username or email.split('@')[0])
+        MailService(self.db).send_signup_email(email, verification_url, username or email.split('@')[0])
+        self.db.commit()
 
         return {
             "user_id": user.id,
@@ -140,8 +154,8 @@ class AuthService(BaseService):
         verification = self.create_email_verification(user.id, email)
         verification_url = f"{settings.APPLICATION_URL}/auth/verify_signup?email={email}&code={verification.code}&user_id={user.id}"
 
-        mail_service = MailService()
-        mail_service.send_signup_email(email, verification_url, user.username or email.split('@')[0])
+        MailService(self.db).send_signup_email(email, verification_url, user.username or email.split('@')[0])
+        self.db.commit()
 
         return {"message": "Verification email sent successfully"}
 
@@ -162,7 +176,7 @@ class AuthService(BaseService):
         )
 
         self.db.add(verification)
-        self.db.commit()
+        self.db.flush()
 
         return verification
 
@@ -314,13 +328,12 @@ class AuthService(BaseService):
         )
 
         self.db.add(invitation)
-        self.db.commit()
-        self.db.refresh(invitation)
 
         invite_url = f"{settings.APPLICATION_URL}/verify/user_to_workspace?email={email}&code={invitation.invitation_token}"
 
-        mail_service = MailService()
-        mail_service.send_invite_email(email, invite_url)
+        MailService(self.db).send_invite_email(email, invite_url)
+        self.db.commit()
+        self.db.refresh(invitation)
 
         return {
             "id": invitation.id,
@@ -416,6 +429,7 @@ class AuthService(BaseService):
 
         self.db.delete(member)
         self.db.commit()
+        jwt_manager.revoke_user(member.user_id)
 
         return {"message": "Member removed successfully"}
 
@@ -475,6 +489,7 @@ class AuthService(BaseService):
         member.role = role_enum
         member.updated_at = int(time.time())
         self.db.commit()
+        jwt_manager.revoke_user(member.user_id)
 
         return {
             "member_id": member.id,
@@ -559,19 +574,34 @@ class AuthService(BaseService):
             )
 
     def login(self, email: str, password: str) -> Dict[str, Any]:
+        user = self._find_login_user(email)
+        if not verify_password(password, user.password_hash):
+            self._reject_login()
+        new_hash = hash_password(password) if password_hasher.needs_rehash(user.password_hash) else None
+        return self._complete_login(user, new_hash)
+
+    async def login_async(self, email: str, password: str) -> Dict[str, Any]:
+        """login() for async routes: bcrypt runs on the hasher pool, DB work on the threadpool."""
+        user = await run_in_threadpool(self._find_login_user, email)
+        if not await password_hasher.verify_async(password, user.password_hash):
+            self._reject_login()
+        new_hash = await password_hasher.hash_async(password) if password_hasher.needs_rehash(user.password_hash) else None
+        return await run_in_threadpool(self._complete_login, user, new_hash)
+
+    def _find_login_user(self, email: str) -> User:
         user = self.db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
-
-        if not user.password_hash or not verify_password(password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
+        if not user or not user.password_hash:
+            self._reject_login()
+        return user
+
+    @staticmethod
+    def _reject_login() -> None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
 
+    def _complete_login(self, user: User, new_password_hash: Optional[str] = None) -> Dict[str, Any]:
         if user.status != UserStatus.ACTIVE:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -579,6 +609,9 @@ class AuthService(BaseService):
             )
 
         user.last_login_at = int(time.time())
+        if new_password_hash:
+            # Cost factor changed since this hash was made; upgrade it transparently.
+            user.password_hash = new_password_hash
         self.db.commit()
 
         access_token = jwt_manager.create_access_token(
@@ -613,16 +646,16 @@ class AuthService(BaseService):
         )
 
         self.db.add(reset)
-        self.db.commit()
 
         verification_url = f"{settings.APPLICATION_URL}/auth/reset-password?token={reset.token}&email={user.email}"
 
-        mail_service = MailService()
-        mail_service.send_forgot_password_email(email, verification_url)
+        MailService(self.db).send_forgot_password_email(email, verification_url)
+        self.db.commit()
 
         return {"message": "If the email exists, you will receive a password reset link"}
 
-    def accept_forgot_password(self, email: str, password: str, token: str) -> Dict[str, str]:
+    def validate_reset_token(self, email: str, token: str) -> PasswordReset:
+        """The unused, unexpired reset for email and token; 400 otherwise."""
         current_time = int(time.time())
 
         reset = self.db.query(PasswordReset).filter(
@@ -637,6 +670,21 @@ class AuthService(BaseService):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid or expired reset token"
             )
+        return reset
+
+    async def accept_forgot_password_async(self, email: str, password: str, token: str) -> Dict[str, str]:
+        """accept_forgot_password() for async routes: the token is checked before bcrypt runs."""
+        await run_in_threadpool(self.validate_reset_token, email, token)
+        password_hash = await password_hasher.hash_async(password)
+        return await run_in_threadpool(
+            self.accept_forgot_password, email, password, token, password_hash=password_hash
+        )
+
+    def accept_forgot_password(self, email: str, password: str, token: str,
+                               password_hash: Optional[str] = None) -> Dict[str, str]:
+        current_time = int(time.time())
+
+        reset = self.validate_reset_token(email, token)
 
         user = self.db.query(User).filter(User.id == reset.user_id).first()
         if not user:
@@ -645,7 +693,7 @@ class AuthService(BaseService):
                 detail="User not found"
             )
 
-        user.password_hash = hash_password(password)
+        user.password_hash = password_hash or hash_password(password)
         user.updated_at = current_time
 
         reset.used = True
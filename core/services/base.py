@@ -1,10 +1,13 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from typing import Optional, Union, List, Dict, Any
+from typing import Optional, Union, List, Dict, Any, Callable, TypeVar
 from uuid import UUID
 
 from core.context import get_current_org_id, get_current_user_id
 
+T = TypeVar("T")
+
 
 class BaseService:
     def __init__(self, db: Session, user_id: Optional[int] = None):
@@ -19,6 +22,20 @@ class BaseService:
     def user_id(self) -> Optional[int]:
         return self._user_id or get_current_user_id()
 
+    @classmethod
+    async def run_async(cls, db: AsyncSession, fn: Callable[..., T], user_id: Optional[int] = None) -> T:
+        """Run fn(service) on an AsyncSession; no threadpool thread is held while it waits on the database.
+
+        The service methods are the same sync ORM code used elsewhere. run_sync executes
+        them against the asyncpg connection in a greenlet on the event loop thread: only
+        the database waits are handed back to the loop, everything else in fn runs on it.
+        So fn must be database-bound service code. Anything CPU-heavy or blocking outside
+        the session (bcrypt, HTTP calls to providers, file I/O, large encodes) stalls every
+        request on the loop while it runs; endpoints doing that stay sync def on the
+        threadpool, or offload that part with run_in_threadpool before calling run_async.
+        """
+        return await db.run_sync(lambda session: fn(cls(session, user_id=user_id)))
+
     def upsert(self, model, values: Dict[str, Any], conflict_fields: List[str],
                update_fields: List[str], extra_update: Optional[Dict[str, Any]] = None):
         stmt = pg_insert(model).values(**values)
@@ -1,67 +1,52 @@
 """Service to resolve the bot (agent) for incoming telephony calls by phone number."""
 
-import os
 from typing import Optional, Tuple, Any, Dict
 
-import aiohttp
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from core.models.agent import Agent
-from core.models.agent_phone_numbers import AgentPhoneNumbers
+from core.services import metrics
+from core.services.agent_factory_service import AgentFactoryService
 from core.services.base import BaseService
+from core.services.call_admission import CallLease, CallRejected, busy_twiml, call_admission
+from core.services.telephony_client import telephony_client
+from core.services.phone_routing_table import (
+    RoutedAgent,
+    normalize_phone_number,
+    phone_routing_table,
+)
 
 
 class BotRunnerService(BaseService):
     """Resolve the bot (agent) for incoming telephony calls by phone number."""
 
     def _normalize_phone_number(self, phone_number: str) -> str:
-        """Normalize phone number for lookup (strip, optional E.164)."""
-        if not phone_number:
-            return ""
-        return phone_number.strip()
+        """Normalize phone number for lookup (E.164 when it can be parsed)."""
+        return normalize_phone_number(phone_number)
 
-    def get_bot_for_phone_number(self, phone_number: str) -> Optional[Agent]:
+    def get_bot_for_phone_number(self, phone_number: str) -> Optional[RoutedAgent]:
         """Find the agent (bot) associated with the given phone number (the number the call came to).
 
+        A dict read on the in-memory routing table; no DB access on the call path. Its
+        refresh thread picks up numbers added or removed by other processes within
+        PHONE_ROUTING_REFRESH_SECONDS.
+
         Args:
             phone_number: The 'To' number (our number that received the call).
 
         Returns:
-            The Agent for that phone number, or None if not found.
+            The RoutedAgent (id, name) for that phone number, or None if not found.
         """
         normalized = self._normalize_phone_number(phone_number)
         if not normalized:
             return None
-        agent_phone = (
-            self.db.query(AgentPhoneNumbers)
-            .filter(AgentPhoneNumbers.phone_number == normalized)
-            .first()
-        )
-        if not agent_phone:
-            return None
-        agent = self.db.query(Agent).filter(Agent.id == agent_phone.agent_id).first()
-        return agent
+        phone_routing_table.ensure_refreshing()
+        return phone_routing_table.lookup(normalized)
 
     async def _fetch_twilio_to_number(self, call_sid: str) -> Optional[str]:
-        """Fetch the 'to' number for a Twilio call from Twilio REST API."""
-        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-        if not account_sid or not auth_token:
-            logger.warning("Missing Twilio credentials, cannot resolve to_number")
-            return None
-        url = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Calls/{call_sid}.json"
-        try:
-            auth = aiohttp.BasicAuth(account_sid, auth_token)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, auth=auth) as response:
-                    if response.status != 200:
-                        return None
-                    data = await response.json()
-                    return data.get("to")
-        except Exception as e:
-            logger.error("Error fetching Twilio call info: %s", e)
-            return None
+        """Fetch the 'to' number for a Twilio call (shared, cached lookup with the Twilio transport plug-in)."""
+        call_info = await telephony_client.get_call_info(call_sid)
+        return call_info.get("to_number")
 
     async def get_to_number_from_call_data_async(
         self, transport_type: str, call_data: Dict[str, Any]
@@ -76,7 +61,7 @@ class BotRunnerService(BaseService):
 
     async def get_bot_for_incoming_call(
         self, websocket: Any
-    ) -> Tuple[Optional[Agent], str, Dict[str, Any]]:
+    ) -> Tuple[Optional[RoutedAgent], str, Dict[str, Any]]:
         """Parse the WebSocket (first messages from /ws), determine the 'to' number, and return the bot (agent) for that number.
 
         Consumes the first telephony messages from the websocket (same as parse_telephony_websocket).
@@ -92,20 +77,36 @@ class BotRunnerService(BaseService):
         from pipecatfork.src.pipecat.runner.utils import parse_telephony_websocket
 
         transport_type, call_data = await parse_telephony_websocket(websocket)
-        print("transport_type ===========", transport_type)
-        print("call_data ===========", call_data)
-        to_number = await self.get_to_number_from_call_data_async(transport_type, call_data)
+        logger.debug(f"Parsed {transport_type} websocket, call_data={call_data}")
+        with metrics.call_setup_phase("routing"):
+            to_number = await self.get_to_number_from_call_data_async(transport_type, call_data)
+            agent = self.get_bot_for_phone_number(to_number) if to_number else None
         if not to_number:
             logger.warning("Could not determine 'to' phone number from call data")
             return None, transport_type, call_data
-        agent = self.get_bot_for_phone_number(to_number)
         if agent:
-            logger.info(
-                "Resolved bot for to_number=%s -> agent_id=%s name=%s",
-                to_number,
-                agent.id,
-                agent.name,
-            )
+            logger.info(f"Resolved bot for to_number={to_number} -> agent_id={agent.id} name={agent.name}")
         else:
-            logger.warning("No agent found for phone number: %s", to_number)
+            logger.warning(f"No agent found for phone number: {to_number}")
         return agent, transport_type, call_data
+
+    async def admit_incoming_call(self, agent: RoutedAgent, transport_type: str, call_id: str) -> Optional[CallLease]:
+        """Take the call's concurrency slots, or turn the caller away with a busy response.
+
+        Returns the lease to release when the call ends, or None if the call was rejected
+        (a Twilio call is then told to call back and hung up).
+        """
+        # First resolution of the agent's spec in the call; later lookups hit the cache
+        with metrics.call_setup_phase("config"):
+            spec = AgentFactoryService(self.db).get_runtime_spec(agent)
+        # Don't hold a pooled connection while queued for a slot.
+        self.db.close()
+        try:
+            if spec is None:
+                return await call_admission.admit(call_id, agent.id)
+            return await call_admission.admit_for_spec(call_id, spec)
+        except CallRejected as e:
+            logger.warning(f"Rejecting call {call_id} for agent_id={agent.id}: {e}")
+            if transport_type == "twilio":
+                await telephony_client.update_call(call_id, busy_twiml(in_progress=True))
+            return None
@@ -0,0 +1,450 @@
+"""Pre-fork supervisor for the bot server: one listening socket, N forked workers.
+
+The supervisor loads the heavy shared state once (VAD model, transports, provider
+SDKs, routing table and agent runtime specs), freezes it out of the garbage
+collector's reach and forks the workers, so those pages stay shared copy-on-write.
+
+The supervisor owns the listening socket. Each accepted connection is passed (the file
+descriptor, over a Unix socket pair) to the ready worker with the fewest open
+connections; the worker attaches it to its uvicorn server. Workers run the pipecat
+runner's main() unchanged, except that its final uvicorn.run() serves handed-over
+connections instead of binding the port.
+
+Signals to the supervisor:
+- SIGHUP: rolling restart. Each worker in turn gets a replacement; once that is ready
+  the old worker takes no new connections and is stopped when its last one closes
+  (or after restart_timeout_seconds).
+- SIGTERM / SIGINT: SIGTERM the workers, which drain: each finishes the calls it has
+  (up to BOT_DRAIN_DEADLINE_SECONDS), meanwhile answering /health/ready with 503 and
+  turning new calls away, then exits. Workers still running after
+  shutdown_timeout_seconds are killed.
+Workers that die are respawned, with backoff if they keep dying right after start.
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import selectors
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from multiprocessing.sharedctypes import RawArray
+from typing import Any, Callable, Dict, List, Optional
+
+import uvicorn
+from loguru import logger
+
+from core.services import metrics
+from core.services.call_drain import call_drain
+
+# Per-slot counters shared with the workers (each written by one side only)
+_READY, _OPEN, _RECEIVED = range(3)
+_FIELDS = 3
+
+# A worker that dies sooner than this after starting counts as crashing
+_MIN_UPTIME_SECONDS = 10.0
+_MAX_RESPAWN_DELAY_SECONDS = 30.0
+
+
+@dataclass
+class _Worker:
+    slot: int
+    pid: int
+    channel: socket.socket
+    started_at: float
+    handed: int = 0
+    retiring: bool = False
+    retire_deadline: float = 0.0
+
+
+class BotSupervisor:
+    """Forks `workers` copies of serve() after preload(), and balances connections across them."""
+
+    def __init__(
+        self,
+        serve: Callable[[], None],
+        workers: int,
+        host: str,
+        port: int,
+        preload: Optional[Callable[[], None]] = None,
+        restart_timeout_seconds: float = 600.0,
+        shutdown_timeout_seconds: float = 30.0,
+        backlog: int = 2048,
+    ):
+        self.serve = serve
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.preload = preload
+        self.restart_timeout_seconds = restart_timeout_seconds
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self.backlog = backlog
+        # Twice the worker count: a rolling restart runs old and new worker side by side
+        self._shared = RawArray("q", 2 * workers * _FIELDS)
+        self._workers: Dict[int, _Worker] = {}
+        self._listener: Optional[socket.socket] = None
+        self._selector = selectors.DefaultSelector()
+        self._accepting = False
+        self._stopping = False
+        self._restart_requested = False
+        self._restart_queue: List[int] = []
+        self._replacement: Optional[int] = None
+        self._crashes = 0
+        self._respawn_at = 0.0
+        self.handed_off = 0
+        self.respawned = 0
+
+    # Shared counters
+
+    def _get(self, slot: int, field: int) -> int:
+        return self._shared[slot * _FIELDS + field]
+
+    def _load(self, worker: _Worker) -> int:
+        """Open connections plus the ones handed over that the worker has not picked up yet."""
+        in_flight = worker.handed - self._get(worker.slot, _RECEIVED)
+        return self._get(worker.slot, _OPEN) + max(in_flight, 0)
+
+    def _ready(self, worker: _Worker) -> bool:
+        return self._get(worker.slot, _READY) == 1 and not worker.retiring
+
+    # Worker processes
+
+    def _free_slot(self) -> int:
+        used = {w.slot for w in self._workers.values()}
+        return next(slot for slot in range(2 * self.workers) if slot not in used)
+
+    def _spawn(self) -> _Worker:
+        slot = self._free_slot()
+        for field in range(_FIELDS):
+            self._shared[slot * _FIELDS + field] = 0
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            self._run_worker(slot, child_end)
+        child_end.close()
+        parent_end.setblocking(False)
+        worker = _Worker(slot=slot, pid=pid, channel=parent_end, started_at=time.monotonic())
+        self._workers[pid] = worker
+        logger.info(f"Started bot worker pid={pid} (slot {slot})")
+        return worker
+
+    def _run_worker(self, slot: int, channel: socket.socket) -> None:
+        """Child side of fork(): never returns."""
+        status = 0
+        try:
+            for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            if self._listener is not None:
+                self._listener.close()
+            for worker in self._workers.values():
+                worker.channel.close()
+            self._selector.close()
+            _after_fork_in_worker()
+            # POST /admin/drain in a worker drains them all, through the supervisor's SIGTERM
+            call_drain.supervisor_pid = os.getppid()
+
+            def run(app: Any, **kwargs: Any) -> None:
+                _HandoffServer(uvicorn.Config(app, **kwargs), channel, self._shared, slot).run(sockets=[])
+
+            uvicorn.run = run
+            self.serve()
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 0
+        except BaseException:
+            logger.exception("Bot worker crashed")
+            status = 1
+        finally:
+            os._exit(status)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            metrics.mark_process_dead(pid)
+            worker = self._workers.pop(pid, None)
+            if worker is None:
+                continue
+            worker.channel.close()
+            if worker.retiring or self._stopping:
+                logger.info(f"Bot worker pid={pid} exited")
+                continue
+            uptime = time.monotonic() - worker.started_at
+            logger.warning(f"Bot worker pid={pid} died (exit code {os.waitstatus_to_exitcode(status)}) after {uptime:.0f}s")
+            if pid == self._replacement:
+                logger.warning("Replacement worker died before it was ready; rolling restart aborted")
+                self._replacement = None
+                self._restart_queue.clear()
+            self._crashes = self._crashes + 1 if uptime < _MIN_UPTIME_SECONDS else 0
+            delay = min(2 ** self._crashes - 1, _MAX_RESPAWN_DELAY_SECONDS)
+            self._respawn_at = max(self._respawn_at, time.monotonic() + delay)
+
+    def _active(self) -> List[_Worker]:
+        return [w for w in self._workers.values() if not w.retiring]
+
+    def _maintain(self) -> None:
+        """Respawn missing workers and advance a rolling restart."""
+        # While a replacement runs next to the worker it replaces, there is one extra
+        replacing = self._replacement is not None and bool(self._restart_queue) and self._restart_queue[0] in self._workers
+        missing = self.workers + int(replacing) - len(self._active())
+        if missing > 0 and time.monotonic() >= self._respawn_at and not self._stopping:
+            for _ in range(missing):
+                self._spawn()
+                self.respawned += 1
+
+        if self._restart_requested:
+            self._restart_requested = False
+            if self._restart_queue or self._replacement is not None:
+                logger.info("Rolling restart already in progress")
+            else:
+                self._restart_queue = [w.pid for w in self._active()]
+                logger.info(f"Rolling restart of {len(self._restart_queue)} bot workers")
+
+        if self._replacement is None and self._restart_queue:
+            if self._restart_queue[0] in self._workers:
+                self._replacement = self._spawn().pid
+            else:
+                self._restart_queue.pop(0)
+        if self._replacement is not None:
+            replacement = self._workers.get(self._replacement)
+            old = self._workers.get(self._restart_queue[0]) if self._restart_queue else None
+            if replacement is not None and self._ready(replacement):
+                self._replacement = None
+                if old is not None:
+                    old.retiring = True
+                    old.retire_deadline = time.monotonic() + self.restart_timeout_seconds
+                self._restart_queue.pop(0)
+
+        for worker in self._workers.values():
+            if worker.retiring and worker.retire_deadline and (
+                self._load(worker) == 0 or time.monotonic() >= worker.retire_deadline
+            ):
+                worker.retire_deadline = 0.0
+                logger.info(f"Stopping bot worker pid={worker.pid} ({self._load(worker)} connections left)")
+                os.kill(worker.pid, signal.SIGTERM)
+
+    # Connections
+
+    def _set_accepting(self, accepting: bool) -> None:
+        if accepting != self._accepting and self._listener is not None:
+            if accepting:
+                self._selector.register(self._listener, selectors.EVENT_READ)
+            else:
+                self._selector.unregister(self._listener)
+            self._accepting = accepting
+
+    def _accept(self) -> None:
+        for _ in range(64):
+            try:
+                conn, _ = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                self._hand_off(conn)
+            finally:
+                conn.close()
+
+    def _hand_off(self, conn: socket.socket) -> None:
+        # While stopping, every worker is draining and none is ready; they still answer
+        # health checks (503) and turn new calls away, which beats refusing the connection
+        candidates = self._workers.values() if self._stopping else filter(self._ready, self._workers.values())
+        for worker in sorted(candidates, key=self._load):
+            try:
+                socket.send_fds(worker.channel, [b"c"], [conn.fileno()])
+            except BlockingIOError:
+                # The worker is not reading its channel; try the next one
+                continue
+            except OSError as e:
+                logger.warning(f"Could not hand a connection to bot worker pid={worker.pid}: {e}")
+                continue
+            worker.handed += 1
+            self.handed_off += 1
+            return
+        logger.warning("No bot worker could take the connection; closing it")
+
+    # Main loop
+
+    def _on_signal(self, signum: int, _frame: Any) -> None:
+        if signum == signal.SIGHUP:
+            self._restart_requested = True
+        else:
+            self._stopping = True
+
+    def run(self) -> None:
+        metrics.reset_multiproc_dir()
+        if self.preload is not None:
+            start = time.perf_counter()
+            self.preload()
+            logger.info(f"Preloaded shared worker state in {time.perf_counter() - start:.1f}s")
+        # Pool gauges written while preloading; the supervisor serves nothing itself
+        metrics.mark_process_dead(os.getpid())
+        # Keep the preloaded objects out of collections so the GC never writes to (and unshares) their pages
+        gc.collect()
+        gc.freeze()
+
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._on_signal)
+        self._listener = socket.create_server((self.host, self.port), backlog=self.backlog)
+        self._listener.setblocking(False)
+        logger.info(f"Bot supervisor listening on {self.host}:{self.port} with {self.workers} workers")
+        for _ in range(self.workers):
+            self._spawn()
+
+        while not self._stopping:
+            self._reap()
+            self._maintain()
+            self._set_accepting(any(self._ready(w) for w in self._workers.values()))
+            for _key, _ in self._selector.select(timeout=0.1 if self._accepting else 0.05):
+                self._accept()
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        logger.info(f"Stopping bot supervisor ({len(self._workers)} workers)")
+        for worker in self._workers.values():
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.shutdown_timeout_seconds
+        while self._workers and time.monotonic() < deadline:
+            self._reap()
+            self._set_accepting(bool(self._workers))
+            for _key, _ in self._selector.select(timeout=0.1):
+                self._accept()
+        self._set_accepting(False)
+        self._listener.close()
+        for worker in self._workers.values():
+            logger.warning(f"Bot worker pid={worker.pid} did not stop in time; killing it")
+            os.kill(worker.pid, signal.SIGKILL)
+
+
+def _after_fork_in_worker() -> None:
+    """Per-process state that must not be inherited from the supervisor."""
+    from core.config import secret_store
+    from core.database.base import async_engine, engine
+    from core.services.agent_runtime_cache import agent_runtime_cache
+    from core.services.phone_routing_table import phone_routing_table
+
+    # Pooled connections belong to the supervisor; the worker opens its own
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    secret_store.after_fork()
+    # Threads don't survive fork(); keep this worker's routing table and specs current from boot
+    phone_routing_table.ensure_refreshing()
+    agent_runtime_cache.ensure_refreshing()
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn Server whose first SIGTERM drains calls (core.services.call_drain) instead of stopping.
+
+    The server keeps serving, so calls in progress go on and /health/ready reports the
+    drain, and exits once the drain is over. A second SIGTERM, or SIGINT, stops it at once.
+    """
+
+    def __init__(self, config: Any):
+        super().__init__(config)
+        self._drain_signalled = False
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def handle_exit(self, sig: int, frame: Any) -> None:
+        if sig == signal.SIGTERM and not self._drain_signalled:
+            # Only flag it: logging from a signal handler can deadlock
+            self._drain_signalled = True
+            self._captured_signals.append(sig)
+            return
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if self._drain_signalled:
+            call_drain.begin("SIGTERM")
+        if call_drain.draining and self._drain_task is None:
+            self._drain_task = asyncio.create_task(call_drain.wait_drained())
+        if self._drain_task is not None and self._drain_task.done():
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def serve_draining(app: Any, **kwargs: Any) -> None:
+    """Drop-in for uvicorn.run (as called by the pipecat runner) that serves with DrainingServer."""
+    DrainingServer(uvicorn.Config(app, **kwargs)).run()
+
+
+class _HandoffServer(DrainingServer):
+    """uvicorn Server that listens on nothing and serves connections received over a Unix socket."""
+
+    def __init__(self, config: Any, channel: socket.socket, shared: Any, slot: int):
+        super().__init__(config)
+        self.channel = channel
+        self.shared = shared
+        self.slot = slot
+        self._publisher: Optional[asyncio.Task] = None
+
+    def _set(self, field: int, value: int) -> None:
+        self.shared[self.slot * _FIELDS + field] = value
+
+    def _create_protocol(self) -> asyncio.Protocol:
+        return self.config.http_protocol_class(
+            config=self.config, server_state=self.server_state, app_state=self.lifespan.state
+        )
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets=[])
+        if self.should_exit:
+            return
+        self.channel.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.channel.fileno(), self._receive)
+        self._publisher = asyncio.create_task(self._publish_load())
+        self._set(_READY, 1)
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        self._set(_READY, 0)
+        asyncio.get_running_loop().remove_reader(self.channel.fileno())
+        if self._publisher is not None:
+            self._publisher.cancel()
+        await super().shutdown(sockets=[])
+
+    def _receive(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                message, fds, _, _ = socket.recv_fds(self.channel, 1, 1)
+            except (BlockingIOError, InterruptedError):
+                return
+            if not message and not fds:
+                # Supervisor is gone
+                loop.remove_reader(self.channel.fileno())
+                self.should_exit = True
+                return
+            for fd in fds:
+                loop.create_task(self._attach(socket.socket(fileno=fd)))
+
+    async def _attach(self, conn: socket.socket) -> None:
+        try:
+            await asyncio.get_running_loop().connect_accepted_socket(self._create_protocol, conn)
+        except Exception as e:
+            logger.warning(f"Could not attach handed-over connection: {e}")
+            conn.close()
+        finally:
+            self._set(_OPEN, len(self.server_state.connections))
+            self.shared[self.slot * _FIELDS + _RECEIVED] += 1
+
+    async def _publish_load(self) -> None:
+        while True:
+            self._set(_OPEN, len(self.server_state.connections))
+            if call_drain.draining:
+                self._set(_READY, 0)
+            await asyncio.sleep(0.1)
+
+
+def listen_address(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """--host / --port from the runner's command line (everything else is left to the runner)."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=7860)
+    return parser.parse_known_args(argv)[0]
@@ -0,0 +1,231 @@
+"""Per-org, per-agent and per-API-key limits on concurrent calls in this bot worker."""
+
+import asyncio
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from core.config import settings
+from core.services.agent_runtime_cache import AgentRuntimeSpec
+
+SCOPES = ("org", "agent", "api_key")
+
+BUSY_MESSAGE = "All of our agents are busy right now. Please call back in a few minutes."
+
+
+def busy_twiml(in_progress: bool = False, message: str = BUSY_MESSAGE) -> str:
+    """TwiML for a call we cannot take.
+
+    A ringing call is rejected with a busy signal. A call that is already connected to
+    the media stream can no longer be rejected, so it is told to call back and hung up.
+    """
+    if not in_progress:
+        return '<?xml version="1.0" encoding="UTF-8"?><Response><Reject reason="busy"/></Response>'
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<Response><Say>{escape(message)}</Say><Hangup/></Response>"
+    )
+
+
+class CallRejected(Exception):
+    """Raised by CallAdmissionController.admit when a limit stayed full for the whole queue wait."""
+
+    def __init__(self, scope: str, key: Any, limit: int):
+        self.scope = scope
+        self.key = key
+        self.limit = limit
+        super().__init__(f"{scope} {key} is at its limit of {limit} concurrent calls")
+
+
+@dataclass(frozen=True)
+class CallLease:
+    """Slots held by one admitted call; hand back with CallAdmissionController.release.
+
+    token identifies the lease: the same call_id can be admitted twice (a Twilio media
+    stream reconnecting with its CallSid), and each admission holds its own slots.
+    """
+
+    call_id: str
+    slots: Tuple[Tuple[str, Any], ...]
+    admitted_at: float
+    waited_seconds: float
+    token: int = 0
+
+
+class CallAdmissionController:
+    """Counts active calls per org, agent and provider API key and admits a call only if all have room.
+
+    A call that does not fit waits up to queue_seconds for a slot to free up (at most
+    max_queued calls wait at once), then is rejected with CallRejected. A limit of 0
+    means unlimited. Counts are per process: with several bot workers each one enforces
+    the limits on its own calls.
+    """
+
+    def __init__(
+        self,
+        org_limit: int = 0,
+        agent_limit: int = 0,
+        api_key_limit: int = 0,
+        queue_seconds: float = 2.0,
+        max_queued: int = 100,
+    ):
+        self.limits = {"org": org_limit, "agent": agent_limit, "api_key": api_key_limit}
+        self.queue_seconds = queue_seconds
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._active: Dict[Tuple[str, Any], int] = {}
+        self._calls: Dict[int, CallLease] = {}
+        self._tokens = itertools.count(1)
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queued = 0
+        self.admitted = 0
+        self.admitted_after_wait = 0
+        self.rejected = 0
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    def _requested_slots(
+        self,
+        agent_id: int,
+        org_id: Any,
+        api_key_ids: Iterable[int],
+        agent_limit: Optional[int],
+    ) -> List[Tuple[str, Any, int]]:
+        slots = [("agent", agent_id, agent_limit if agent_limit is not None else self.limits["agent"])]
+        if org_id is not None:
+            slots.append(("org", org_id, self.limits["org"]))
+        slots.extend(("api_key", key_id, self.limits["api_key"]) for key_id in sorted(set(api_key_ids)))
+        return slots
+
+    def _first_full(self, slots: List[Tuple[str, Any, int]]) -> Optional[Tuple[str, Any, int]]:
+        for scope, key, limit in slots:
+            if limit > 0 and self._active.get((scope, key), 0) >= limit:
+                return scope, key, limit
+        return None
+
+    def _try_acquire(self, call_id: str, slots: List[Tuple[str, Any, int]], waited: float) -> Optional[CallLease]:
+        with self._lock:
+            if self._first_full(slots) is not None:
+                return None
+            for scope, key, _ in slots:
+                self._active[(scope, key)] = self._active.get((scope, key), 0) + 1
+            lease = CallLease(
+                call_id=call_id,
+                slots=tuple((scope, key) for scope, key, _ in slots),
+                admitted_at=time.time(),
+                waited_seconds=waited,
+                token=next(self._tokens),
+            )
+            self._calls[lease.token] = lease
+            self.admitted += 1
+            if waited:
+                self.admitted_after_wait += 1
+            return lease
+
+    async def admit(
+        self,
+        call_id: str,
+        agent_id: int,
+        org_id: Any = None,
+        api_key_ids: Iterable[int] = (),
+        agent_limit: Optional[int] = None,
+    ) -> CallLease:
+        """Take a slot in every scope the call belongs to, waiting up to queue_seconds.
+
+        agent_limit overrides the default per-agent limit for this agent.
+        Raises CallRejected if a scope is still full when the wait runs out.
+        """
+        slots = self._requested_slots(agent_id, org_id, api_key_ids, agent_limit)
+        lease = self._try_acquire(call_id, slots, 0.0)
+        if lease is not None:
+            return lease
+
+        condition = self._get_condition()
+        start = time.monotonic()
+        deadline = start + self.queue_seconds
+        async with condition:
+            while True:
+                lease = self._try_acquire(call_id, slots, time.monotonic() - start)
+                if lease is not None:
+                    return lease
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.queued >= self.max_queued:
+                    with self._lock:
+                        full = self._first_full(slots) or slots[0]
+                        self.rejected += 1
+                    raise CallRejected(*full)
+                self.queued += 1
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self.queued -= 1
+
+    async def admit_for_spec(self, call_id: str, spec: AgentRuntimeSpec) -> CallLease:
+        """admit() for an agent's runtime spec.
+
+        The org is the agent's owner (core agents are not tied to an organization), the
+        API keys are the provider keys the call will use, and agent_metadata may carry a
+        max_concurrent_calls override for the agent.
+        """
+        override = spec.agent_metadata.get("max_concurrent_calls")
+        return await self.admit(
+            call_id,
+            spec.agent_id,
+            org_id=spec.owner_id,
+            api_key_ids=spec.api_key_ids,
+            agent_limit=int(override) if override is not None else None,
+        )
+
+    async def release(self, lease: CallLease) -> None:
+        with self._lock:
+            if self._calls.pop(lease.token, None) is None:
+                return
+            for slot in lease.slots:
+                remaining = self._active.get(slot, 0) - 1
+                if remaining > 0:
+                    self._active[slot] = remaining
+                else:
+                    self._active.pop(slot, None)
+        if self._condition is not None and self._condition_loop is asyncio.get_running_loop():
+            async with self._condition:
+                self._condition.notify_all()
+
+    @property
+    def active_calls(self) -> int:
+        return len(self._calls)
+
+    def occupancy(self) -> Dict[str, Any]:
+        """Live counts per scope and key, plus admission totals."""
+        with self._lock:
+            by_scope: Dict[str, Dict[str, int]] = {scope: {} for scope in SCOPES}
+            for (scope, key), count in self._active.items():
+                by_scope[scope][str(key)] = count
+            return {
+                "active_calls": len(self._calls),
+                "queued": self.queued,
+                "limits": dict(self.limits),
+                "occupancy": by_scope,
+                "admitted": self.admitted,
+                "admitted_after_wait": self.admitted_after_wait,
+                "rejected": self.rejected,
+            }
+
+
+call_admission = CallAdmissionController(
+    org_limit=settings.CALL_LIMIT_PER_ORG,
+    agent_limit=settings.CALL_LIMIT_PER_AGENT,
+    api_key_limit=settings.CALL_LIMIT_PER_API_KEY,
+    queue_seconds=settings.CALL_ADMISSION_QUEUE_SECONDS,
+    max_queued=settings.CALL_ADMISSION_MAX_QUEUED,
+)
@@ -0,0 +1,129 @@
+"""Drain mode for a bot worker: finish the calls in progress, take no new ones, then exit.
+
+A drain starts on SIGTERM (see DrainingServer in core.services.bot_supervisor) or from
+POST /admin/drain. From then on bot() turns new calls away before doing any work for
+them and /health/ready reports 503, while every call already taken is left to end on
+its own. A call counts from the moment bot() takes it, so one still setting up its
+transport or pipeline holds the drain open too. At the deadline the ones still running
+are cancelled, and the server exits.
+"""
+
+import asyncio
+import os
+import signal
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from core.config import settings
+
+
+class CallDrain:
+    """Live calls of this process, and whether the process is draining.
+
+    A call is the asyncio task running bot(), mapped to its PipelineTask once the
+    pipeline starts, so the deadline can cancel the pipeline cleanly.
+    """
+
+    def __init__(self, deadline_seconds: float, poll_interval_seconds: float = 0.5):
+        self.deadline_seconds = deadline_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._calls: Dict[asyncio.Task, Any] = {}
+        self.draining = False
+        self.reason: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._calls_at_start = 0
+        self.calls_started = 0
+        self.calls_rejected = 0
+        self.calls_cancelled = 0
+        # Set in a worker forked by BotSupervisor: a drain request drains every worker
+        self.supervisor_pid: Optional[int] = None
+
+    @property
+    def active_calls(self) -> int:
+        return len(self._calls)
+
+    def track(self, call: asyncio.Task) -> None:
+        """Register a call from the moment bot() takes it; pair with untrack() when bot() returns."""
+        self._calls[call] = None
+        self.calls_started += 1
+
+    def untrack(self, call: asyncio.Task) -> None:
+        self._calls.pop(call, None)
+
+    def set_pipeline(self, pipeline_task: Any) -> None:
+        """Attach the running PipelineTask (None once runner.run() returns) to the current call, if tracked."""
+        call = asyncio.current_task()
+        if call in self._calls:
+            self._calls[call] = pipeline_task
+
+    def reject(self) -> None:
+        self.calls_rejected += 1
+
+    def request(self, reason: str) -> None:
+        """Drain this process, or under a supervisor, all of its workers (the supervisor SIGTERMs each)."""
+        if self.supervisor_pid is not None:
+            logger.info(f"Asking bot supervisor pid={self.supervisor_pid} to drain all workers ({reason})")
+            os.kill(self.supervisor_pid, signal.SIGTERM)
+            return
+        self.begin(reason)
+
+    def begin(self, reason: str, deadline_seconds: Optional[float] = None) -> bool:
+        """Enter drain mode; False if already draining."""
+        if self.draining:
+            return False
+        self.draining = True
+        self.reason = reason
+        self._started_at = time.monotonic()
+        self._deadline = self._started_at + (self.deadline_seconds if deadline_seconds is None else deadline_seconds)
+        self._calls_at_start = self.active_calls
+        logger.info(
+            f"Draining ({reason}): {self._calls_at_start} calls in progress, "
+            f"deadline in {self._deadline - self._started_at:.0f}s"
+        )
+        return True
+
+    async def wait_drained(self) -> None:
+        """Return once no call is left, cancelling whatever still runs at the deadline."""
+        last_logged = None
+        while self._calls and time.monotonic() < self._deadline:
+            if self.active_calls != last_logged:
+                last_logged = self.active_calls
+                logger.info(f"Draining: {last_logged} calls left, {self.seconds_left():.0f}s to deadline")
+            await asyncio.sleep(self.poll_interval_seconds)
+        remaining = list(self._calls.items())
+        if remaining:
+            logger.warning(f"Drain deadline reached; cancelling {len(remaining)} calls")
+            self.calls_cancelled += len(remaining)
+            # Running pipelines get a CancelFrame; calls still setting up are cancelled outright
+            await asyncio.gather(
+                *(pipeline.cancel() for _, pipeline in remaining if pipeline is not None),
+                return_exceptions=True,
+            )
+            for call, pipeline in remaining:
+                if pipeline is None:
+                    call.cancel()
+        logger.info("Drained")
+
+    def seconds_left(self) -> Optional[float]:
+        if self._deadline is None:
+            return None
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        seconds_left = self.seconds_left()
+        return {
+            "draining": self.draining,
+            "reason": self.reason,
+            "active_calls": self.active_calls,
+            "calls_at_drain_start": self._calls_at_start if self.draining else None,
+            "seconds_to_deadline": round(seconds_left, 1) if seconds_left is not None else None,
+            "calls_started": self.calls_started,
+            "calls_rejected": self.calls_rejected,
+            "calls_cancelled_at_deadline": self.calls_cancelled,
+        }
+
+
+call_drain = CallDrain(deadline_seconds=settings.BOT_DRAIN_DEADLINE_SECONDS)
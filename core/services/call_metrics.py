@@ -0,0 +1,240 @@
+"""Per-call latency aggregation and a batched, off-pipeline writer for call_metrics rows."""
+
+import atexit
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.exc import DisconnectionError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database.session import SessionLocal
+from core.models.call_metrics import CallMetrics
+
+METRICS = ("stt", "llm_ttft", "tts_ttfb", "v2v")
+PERCENTILES = (50, 90, 95, 99)
+
+# Errors worth retrying the same rows for: the database or the pool, not the rows
+TRANSIENT_ERRORS = (OperationalError, DisconnectionError, PoolTimeoutError)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        raise ValueError("percentile of an empty list")
+    rank = (len(sorted_values) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+@dataclass
+class CallLatencyStats:
+    """Latency samples (ms) of one call, collected turn by turn, and the row they summarize to."""
+
+    call_id: Optional[str] = None
+    agent_id: Optional[int] = None
+    transport: Optional[str] = None
+    llm_provider: Optional[str] = None
+    llm_model: Optional[str] = None
+    stt_provider: Optional[str] = None
+    tts_provider: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    samples: Dict[str, List[float]] = field(default_factory=lambda: {m: [] for m in METRICS})
+    turns: int = 0
+    interruptions: int = 0
+    usage: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, metric: str, milliseconds: float) -> None:
+        if milliseconds >= 0:
+            self.samples[metric].append(milliseconds)
+
+    def add_usage(self, key: str, amount: int) -> None:
+        self.usage[key] = self.usage.get(key, 0) + amount
+
+    def summarize(self, metric: str) -> Optional[Dict[str, float]]:
+        values = sorted(self.samples[metric])
+        if not values:
+            return None
+        result = {"count": len(values), "mean": round(sum(values) / len(values), 1), "max": round(values[-1], 1)}
+        for pct in PERCENTILES:
+            result[f"p{pct}"] = round(percentile(values, pct), 1)
+        return result
+
+    def to_row(self, ended_at: Optional[float] = None) -> Dict[str, Any]:
+        ended_at = ended_at or time.time()
+        summaries = {metric: self.summarize(metric) for metric in METRICS}
+
+        def pct(metric: str, key: str) -> Optional[int]:
+            summary = summaries[metric]
+            return int(round(summary[key])) if summary else None
+
+        now = int(time.time())
+        return {
+            "call_id": self.call_id,
+            "agent_id": self.agent_id,
+            "transport": self.transport,
+            "llm_provider": self.llm_provider,
+            "llm_model": self.llm_model,
+            "stt_provider": self.stt_provider,
+            "tts_provider": self.tts_provider,
+            "started_at": int(self.started_at),
+            "ended_at": int(ended_at),
+            "duration_ms": int((ended_at - self.started_at) * 1000),
+            "turns": self.turns,
+            "interruptions": self.interruptions,
+            "stt_p50_ms": pct("stt", "p50"),
+            "stt_p95_ms": pct("stt", "p95"),
+            "llm_ttft_p50_ms": pct("llm_ttft", "p50"),
+            "llm_ttft_p95_ms": pct("llm_ttft", "p95"),
+            "tts_ttfb_p50_ms": pct("tts_ttfb", "p50"),
+            "tts_ttfb_p95_ms": pct("tts_ttfb", "p95"),
+            "v2v_p50_ms": pct("v2v", "p50"),
+            "v2v_p95_ms": pct("v2v", "p95"),
+            "v2v_max_ms": pct("v2v", "max"),
+            "summary": {
+                "latency_ms": {metric: s for metric, s in summaries.items() if s},
+                "usage": dict(self.usage),
+            },
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+class CallMetricsWriter:
+    """Buffers finished-call rows and inserts them in batches from a background thread.
+
+    submit() only appends to an in-memory buffer, so the pipeline never waits on the
+    database. The thread flushes when batch_size rows are waiting or every
+    flush_interval_seconds. If the database is unreachable, rows stay buffered (the
+    oldest are dropped beyond max_buffered) and are retried on the next flush. A batch
+    failing for any other reason (e.g. an IntegrityError from an agent deleted mid-call)
+    is inserted row by row instead, and the rows that still fail are logged and dropped,
+    so one bad row cannot hold up the rows behind it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 100,
+        flush_interval_seconds: float = 5.0,
+        max_buffered: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max_buffered
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.failed_flushes = 0
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._buffer.append(row)
+            while len(self._buffer) > self.max_buffered:
+                self._buffer.popleft()
+                self.dropped += 1
+            pending = len(self._buffer)
+        self._ensure_started()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="call-metrics-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Insert everything buffered, one multi-row INSERT per batch. Returns rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    break
+                try:
+                    self._insert(batch)
+                except TRANSIENT_ERRORS as e:
+                    self._requeue(batch, e)
+                    break
+                except Exception as e:
+                    logger.warning(f"Failed to write {len(batch)} call metrics rows, inserting them one by one: {e}")
+                    inserted, remaining = self._insert_rows(batch)
+                    written += inserted
+                    self.written += inserted
+                    if remaining:
+                        break
+                    continue
+                written += len(batch)
+                self.written += len(batch)
+        return written
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        with self.session_factory() as db:
+            db.execute(insert(CallMetrics), rows)
+            db.commit()
+
+    def _insert_rows(self, batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Insert a failed batch row by row, dropping rows the database rejects. Returns (inserted, requeued)."""
+        inserted = 0
+        for index, row in enumerate(batch):
+            try:
+                self._insert([row])
+            except TRANSIENT_ERRORS as e:
+                remaining = batch[index:]
+                self._requeue(remaining, e)
+                return inserted, len(remaining)
+            except Exception as e:
+                self.rejected += 1
+                logger.error(f"Dropping call metrics row for call {row.get('call_id')}: {e}")
+                continue
+            inserted += 1
+        return inserted, 0
+
+    def _requeue(self, rows: List[Dict[str, Any]], error: Exception) -> None:
+        self.failed_flushes += 1
+        logger.warning(f"Failed to write {len(rows)} call metrics rows, will retry: {error}")
+        with self._lock:
+            self._buffer.extendleft(reversed(rows))
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+call_metrics_writer = CallMetricsWriter(
+    SessionLocal,
+    batch_size=settings.CALL_METRICS_BATCH_SIZE,
+    flush_interval_seconds=settings.CALL_METRICS_FLUSH_SECONDS,
+)
+atexit.register(call_metrics_writer.flush)
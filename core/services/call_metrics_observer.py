@@ -0,0 +1,132 @@
+"""Pipeline observers: per-call latency stats from frame timings and metrics frames, and
+provider error counts (core.services.metrics) from error frames."""
+
+from typing import Any, Dict, Optional, Tuple
+
+from pipecatfork.src.pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    ErrorFrame,
+    MetricsFrame,
+    TranscriptionFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecatfork.src.pipecat.metrics.metrics import (
+    LLMUsageMetricsData,
+    TTFBMetricsData,
+    TTSUsageMetricsData,
+)
+from pipecatfork.src.pipecat.observers.base_observer import BaseObserver, FramePushed
+
+from core.services import metrics
+from core.services.call_metrics import CallLatencyStats, CallMetricsWriter
+
+_NS_PER_MS = 1_000_000
+
+
+class CallMetricsObserver(BaseObserver):
+    """Collects per-turn latencies for one call and submits one summary row when the call ends.
+
+    - stt: user stopped speaking (VAD) -> first final transcription
+    - llm_ttft / tts_ttfb: TTFB metrics reported by the call's LLM and TTS services
+    - v2v: user stopped speaking (VAD) -> bot started speaking
+
+    Frames are seen once per hop through the pipeline, so turn markers only count the
+    first time they are seen, and metrics frames are de-duplicated by frame id.
+    """
+
+    def __init__(
+        self,
+        stats: CallLatencyStats,
+        writer: CallMetricsWriter,
+        llm: Any = None,
+        stt: Any = None,
+        tts: Any = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.stats = stats
+        self.writer = writer
+        self._processor_metric = {
+            getattr(service, "name", None): metric
+            for service, metric in ((llm, "llm_ttft"), (tts, "tts_ttfb"))
+            if service is not None
+        }
+        self._user_stopped_at: Optional[int] = None
+        self._transcribed = False
+        self._bot_speaking = False
+        self._seen_metrics_frames: set = set()
+        self._finished = False
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+        if isinstance(frame, VADUserStartedSpeakingFrame):
+            if self._bot_speaking and self._user_stopped_at is None:
+                self.stats.interruptions += 1
+            # The user kept talking; the turn ends at their next stop.
+            self._user_stopped_at = None
+            self._transcribed = False
+        elif isinstance(frame, VADUserStoppedSpeakingFrame):
+            if self._user_stopped_at is None:
+                self._user_stopped_at = data.timestamp
+        elif isinstance(frame, TranscriptionFrame):
+            if self._user_stopped_at is not None and not self._transcribed:
+                self._transcribed = True
+                self.stats.add("stt", (data.timestamp - self._user_stopped_at) / _NS_PER_MS)
+        elif isinstance(frame, BotStartedSpeakingFrame):
+            if not self._bot_speaking and self._user_stopped_at is not None:
+                self.stats.add("v2v", (data.timestamp - self._user_stopped_at) / _NS_PER_MS)
+                self.stats.turns += 1
+                self._user_stopped_at = None
+                self._transcribed = False
+            self._bot_speaking = True
+        elif isinstance(frame, BotStoppedSpeakingFrame):
+            self._bot_speaking = False
+        elif isinstance(frame, MetricsFrame):
+            if frame.id in self._seen_metrics_frames:
+                return
+            if len(self._seen_metrics_frames) > 1000:
+                self._seen_metrics_frames.clear()
+            self._seen_metrics_frames.add(frame.id)
+            self._handle_metrics(frame)
+
+    def _handle_metrics(self, frame: MetricsFrame) -> None:
+        for item in frame.data:
+            if isinstance(item, TTFBMetricsData):
+                metric = self._processor_metric.get(item.processor)
+                if metric and item.value > 0:
+                    self.stats.add(metric, item.value * 1000)
+            elif isinstance(item, LLMUsageMetricsData):
+                self.stats.add_usage("llm_prompt_tokens", item.value.prompt_tokens)
+                self.stats.add_usage("llm_completion_tokens", item.value.completion_tokens)
+            elif isinstance(item, TTSUsageMetricsData):
+                self.stats.add_usage("tts_characters", item.value)
+
+    def finish(self) -> None:
+        """Hand the call's summary to the writer (idempotent; call when the pipeline ends)."""
+        if self._finished:
+            return
+        self._finished = True
+        self.writer.submit(self.stats.to_row())
+
+
+class ProviderErrorObserver(BaseObserver):
+    """Counts errors raised by the call's LLM, STT and TTS services, by provider name.
+
+    providers maps each service instance to its (service_type, provider_name).
+    """
+
+    def __init__(self, providers: Dict[Any, Tuple[str, Optional[str]]], **kwargs):
+        super().__init__(**kwargs)
+        self._providers = {id(service): labels for service, labels in providers.items() if service is not None}
+        self._seen_error_frames: set = set()
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+        if not isinstance(frame, ErrorFrame) or frame.id in self._seen_error_frames:
+            return
+        self._seen_error_frames.add(frame.id)
+        labels = self._providers.get(id(getattr(frame, "processor", None) or data.source))
+        if labels is not None:
+            metrics.provider_error(labels[0], labels[1], "call")
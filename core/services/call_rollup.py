@@ -0,0 +1,303 @@
+"""Folds ended calls into agents.total_calls / total_minutes / average_rating in batches.
+
+Calls left open by a bot worker that was killed or crashed (ended_at never set) are
+closed as failed once they are older than stale_after_seconds, so they get counted and
+stop showing as in progress on /health/ready.
+
+Run the backfill with: python -m core.services.call_rollup backfill [--agent-id ID]
+"""
+
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import BigInteger, Integer, Numeric, case, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database.session import SessionLocal
+from core.models.agent import Agent
+from core.models.call import Call
+
+# Rollup batches hold this advisory lock shared (they may run concurrently);
+# the backfill holds it exclusively so it never interleaves with a batch.
+ROLLUP_LOCK_KEY = 7_140_016
+
+_MINUTE = Decimal(60)
+_CENT = Decimal("0.01")
+
+
+def _agent_deltas(rows: List[Tuple[Optional[int], Optional[int], Optional[Decimal]]]) -> List[Tuple[int, int, Decimal, Decimal, int]]:
+    """(agent_id, duration_seconds, rating) rows -> (agent_id, calls, minutes, rating_sum, rated) per agent, sorted by agent_id."""
+    totals: Dict[int, List[Any]] = {}
+    for agent_id, duration_seconds, rating in rows:
+        if agent_id is None:
+            continue
+        entry = totals.setdefault(agent_id, [0, 0, Decimal(0), 0])
+        entry[0] += 1
+        entry[1] += duration_seconds or 0
+        if rating is not None:
+            entry[2] += Decimal(rating)
+            entry[3] += 1
+    return [
+        (agent_id, calls, (Decimal(seconds) / _MINUTE).quantize(_CENT), rating_sum, rated)
+        for agent_id, (calls, seconds, rating_sum, rated) in sorted(totals.items())
+    ]
+
+
+def agent_counter_update(deltas: List[Tuple[int, int, Decimal, Decimal, int]]):
+    """UPDATE agents ... FROM (VALUES ...) adding the deltas; one statement for the whole batch."""
+    v = values(
+        column("agent_id", BigInteger),
+        column("calls", Integer),
+        column("minutes", Numeric(12, 2)),
+        column("rating_sum", Numeric(12, 2)),
+        column("rated", Integer),
+        name="v",
+    ).data(deltas)
+    rated_before = func.coalesce(Agent.rated_calls, 0)
+    return (
+        update(Agent)
+        .where(Agent.id == v.c.agent_id)
+        .values(
+            total_calls=func.coalesce(Agent.total_calls, 0) + v.c.calls,
+            total_minutes=func.coalesce(Agent.total_minutes, 0) + v.c.minutes,
+            rated_calls=rated_before + v.c.rated,
+            average_rating=case(
+                (
+                    v.c.rated > 0,
+                    (func.coalesce(Agent.average_rating, 0) * rated_before + v.c.rating_sum)
+                    / (rated_before + v.c.rated),
+                ),
+                else_=Agent.average_rating,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+class CallRollupWorker:
+    """Periodically claims ended, not yet counted calls and adds them to their agents' counters.
+
+    Each batch runs in one transaction: claim up to batch_size calls with FOR UPDATE SKIP
+    LOCKED and mark them rolled up, lock the affected agent rows in id order, then apply
+    every agent's delta in a single UPDATE ... FROM (VALUES ...). Hot agents get one row
+    update per batch instead of one per call, and a call is counted exactly once even
+    with several API processes running the worker.
+
+    Before rolling up, calls still open after stale_after_seconds are reaped: marked
+    failed with ended_at set and no duration (how long they really ran is unknown), so
+    the rollup adds them to total_calls but not to total_minutes. 0 disables the reaper.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 1000,
+        interval_seconds: float = 10.0,
+        stale_after_seconds: float = 6 * 3600,
+        name: str = "call-rollup",
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.name = name
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.calls_rolled_up = 0
+        self.calls_reaped = 0
+        self.batches = 0
+        self.last_batch_seconds: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name=self.name)
+        logger.info(f"Started {self.name} worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> int:
+        """Reap stale calls, then roll up batches until the backlog is drained. Returns the number of calls counted."""
+        await asyncio.to_thread(self.reap_stale_calls)
+        total = 0
+        while True:
+            counted = await asyncio.to_thread(self.rollup_batch)
+            total += counted
+            if counted < self.batch_size:
+                return total
+
+    def reap_stale_calls(self) -> int:
+        """Close calls started more than stale_after_seconds ago that never ended. Returns how many."""
+        if not self.stale_after_seconds:
+            return 0
+        now = int(time.time())
+        with self.session_factory() as db:
+            # Served by the partial index ix_calls_in_progress; a late end_call() is a no-op
+            reaped = db.execute(
+                update(Call)
+                .where(Call.ended_at.is_(None), Call.started_at < now - int(self.stale_after_seconds))
+                .values(status="failed", ended_at=now, updated_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        if reaped:
+            self.calls_reaped += reaped
+            logger.warning(f"{self.name}: marked {reaped} calls open for over {self.stale_after_seconds:.0f}s as failed")
+        return reaped
+
+    def rollup_batch(self) -> int:
+        start = time.perf_counter()
+        now = int(time.time())
+        with self.session_factory() as db:
+            db.execute(select(func.pg_advisory_xact_lock_shared(ROLLUP_LOCK_KEY)))
+            pending = (
+                select(Call.id)
+                .where(Call.ended_at.isnot(None), Call.rolled_up_at.is_(None))
+                .order_by(Call.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = db.execute(
+                update(Call)
+                .where(Call.id.in_(pending.scalar_subquery()))
+                .values(rolled_up_at=now)
+                .returning(Call.agent_id, Call.duration_seconds, Call.rating)
+                .execution_options(synchronize_session=False)
+            ).all()
+            deltas = _agent_deltas(rows)
+            if deltas:
+                # Lock agent rows in a fixed order so concurrent batches cannot deadlock.
+                db.execute(
+                    select(Agent.id)
+                    .where(Agent.id.in_([d[0] for d in deltas]))
+                    .order_by(Agent.id)
+                    .with_for_update()
+                )
+                db.execute(agent_counter_update(deltas))
+            db.commit()
+        if rows:
+            self.batches += 1
+            self.calls_rolled_up += len(rows)
+            self.last_batch_seconds = time.perf_counter() - start
+        return len(rows)
+
+    def pending(self) -> int:
+        with self.session_factory() as db:
+            return db.query(func.count(Call.id)).filter(
+                Call.ended_at.isnot(None), Call.rolled_up_at.is_(None)
+            ).scalar() or 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "batches": self.batches,
+            "calls_rolled_up": self.calls_rolled_up,
+            "calls_reaped": self.calls_reaped,
+            "last_batch_ms": round(self.last_batch_seconds * 1000, 1) if self.last_batch_seconds else None,
+        }
+
+
+def backfill_agent_counters(db: Session, agent_id: Optional[int] = None) -> int:
+    """Recompute agent counters from the full call history (all agents, or one).
+
+    Marks every ended call as rolled up and overwrites total_calls, total_minutes,
+    rated_calls and average_rating; agents without ended calls are reset to zero.
+    Returns the number of agents updated.
+    """
+    now = int(time.time())
+    db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_KEY)))
+    ended = [Call.ended_at.isnot(None)]
+    if agent_id is not None:
+        ended.append(Call.agent_id == agent_id)
+    db.execute(
+        update(Call)
+        .where(*ended, Call.rolled_up_at.is_(None))
+        .values(rolled_up_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    history = (
+        select(
+            Call.agent_id.label("agent_id"),
+            func.count(Call.id).label("calls"),
+            func.round(func.coalesce(func.sum(Call.duration_seconds), 0) / 60.0, 2).label("minutes"),
+            func.count(Call.rating).label("rated"),
+            func.round(func.avg(Call.rating), 2).label("average_rating"),
+        )
+        .where(*ended, Call.agent_id.isnot(None))
+        .group_by(Call.agent_id)
+        .subquery()
+    )
+    agents = update(Agent)
+    if agent_id is not None:
+        agents = agents.where(Agent.id == agent_id)
+    reset = db.execute(
+        agents.where(~Agent.id.in_(select(history.c.agent_id)))
+        .values(total_calls=0, total_minutes=0, rated_calls=0, average_rating=0)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    updated = db.execute(
+        update(Agent)
+        .where(Agent.id == history.c.agent_id)
+        .values(
+            total_calls=history.c.calls,
+            total_minutes=history.c.minutes,
+            rated_calls=history.c.rated,
+            average_rating=func.coalesce(history.c.average_rating, 0),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return reset + updated
+
+
+call_rollup_worker = CallRollupWorker(
+    SessionLocal,
+    batch_size=settings.CALL_ROLLUP_BATCH_SIZE,
+    interval_seconds=settings.CALL_ROLLUP_INTERVAL_SECONDS,
+    stale_after_seconds=settings.CALL_STALE_AFTER_HOURS * 3600,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill = sub.add_parser("backfill", help="Recompute agent call counters from call history")
+    backfill.add_argument("--agent-id", type=int, default=None)
+    sub.add_parser("run-once", help="Reap stale calls, roll up all pending ended calls and exit")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        with SessionLocal() as db:
+            count = backfill_agent_counters(db, args.agent_id)
+        logger.info(f"Recomputed call counters for {count} agents")
+    else:
+        counted = asyncio.run(call_rollup_worker.run_once())
+        logger.info(f"Rolled up {counted} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Call records written by the bot worker at call start and end."""
+
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core.database.session import get_db_context
+from core.models.call import Call
+from core.services.base import BaseService
+
+
+class CallService(BaseService):
+    def start_call(
+        self,
+        call_id: str,
+        agent_id: Optional[int],
+        transport: Optional[str] = None,
+        from_number: Optional[str] = None,
+        to_number: Optional[str] = None,
+    ) -> None:
+        """Insert the call row; a repeated start for the same call_id (reconnect) is ignored."""
+        now = int(time.time())
+        stmt = pg_insert(Call).values(
+            call_id=call_id,
+            agent_id=agent_id,
+            transport=transport,
+            from_number=from_number,
+            to_number=to_number,
+            status="in_progress",
+            started_at=now,
+            created_at=now,
+            updated_at=now,
+        ).on_conflict_do_nothing(index_elements=["call_id"])
+        self.db.execute(stmt)
+        self.db.commit()
+
+    def end_call(self, call_id: str, status: str = "completed") -> None:
+        """Close the call in one UPDATE; duration is computed by the database. Ending twice is a no-op."""
+        now = int(time.time())
+        self.db.execute(
+            update(Call)
+            .where(Call.call_id == call_id, Call.ended_at.is_(None))
+            .values(
+                status=status,
+                ended_at=now,
+                duration_seconds=now - Call.started_at,
+                updated_at=now,
+            )
+        )
+        self.db.commit()
+
+
+def record_call_start(call_id: str, agent_id: Optional[int], transport: Optional[str] = None,
+                      from_number: Optional[str] = None, to_number: Optional[str] = None) -> None:
+    """start_call() on its own short-lived session; never raises, a call must not fail on bookkeeping."""
+    try:
+        with get_db_context() as db:
+            CallService(db).start_call(call_id, agent_id, transport, from_number, to_number)
+    except Exception as e:
+        logger.warning(f"Failed to record start of call {call_id}: {e}")
+
+
+def record_call_end(call_id: str, status: str = "completed") -> None:
+    try:
+        with get_db_context() as db:
+            CallService(db).end_call(call_id, status)
+    except Exception as e:
+        logger.warning(f"Failed to record end of call {call_id}: {e}")
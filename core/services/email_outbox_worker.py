@@ -0,0 +1,220 @@
+"""Async worker pool that delivers queued rows from an email outbox table."""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database.session import SessionLocal
+from core.models.email_outbox import EmailOutbox
+from core.services.email_service import OUTBOX_PENDING_FLAG, OutgoingEmail, get_email_transport, render_email
+
+_workers: List["EmailOutboxWorker"] = []
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_outbox_workers(session: Session) -> None:
+    if session.info.pop(OUTBOX_PENDING_FLAG, False):
+        for worker in _workers:
+            worker.wake()
+
+
+class EmailOutboxWorker:
+    """Claims due outbox rows in batches and sends them through a transport.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several workers (and
+    several API processes) can share one table. A claim pushes next_attempt_at forward
+    by lease_seconds; a row whose worker died is picked up again after the lease.
+    Failed sends are retried with exponential backoff and jitter until max_attempts,
+    then marked failed. Delivery is at-least-once.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        outbox_model: Any,
+        transport_factory: Callable[[], Any],
+        concurrency: int = 2,
+        batch_size: int = 50,
+        max_attempts: int = 8,
+        poll_interval_seconds: float = 2.0,
+        lease_seconds: int = 120,
+        backoff_base_seconds: float = 5.0,
+        backoff_max_seconds: float = 3600.0,
+        name: str = "email-outbox",
+    ):
+        self.session_factory = session_factory
+        self.outbox_model = outbox_model
+        self.transport_factory = transport_factory
+        self.transport: Any = None
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.name = name
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop (e.g. from a FastAPI startup hook)."""
+        if self._tasks:
+            return
+        if self.transport is None:
+            self.transport = self.transport_factory()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(i), name=f"{self.name}-{i}") for i in range(self.concurrency)
+        ]
+        _workers.append(self)
+        logger.info(f"Started {self.concurrency} {self.name} workers")
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        self._stopping = True
+        self.wake()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self in _workers:
+            _workers.remove(self)
+
+    def wake(self) -> None:
+        """Thread-safe: run a claim pass now instead of waiting for the poll interval."""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"{self.name} worker {index} failed: {e}")
+                processed = 0
+            if processed == self.batch_size or self._stopping:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_once(self) -> int:
+        """Claim, send and record one batch. Returns the number of rows claimed."""
+        if self.transport is None:
+            self.transport = self.transport_factory()
+        claimed = await asyncio.to_thread(self._claim_batch)
+        if not claimed:
+            return 0
+        emails: List[OutgoingEmail] = []
+        outcomes: Dict[int, Tuple[bool, Optional[str], Optional[str]]] = {}
+        for row_id, template, recipient, context, attempts in claimed:
+            try:
+                emails.append(render_email(row_id, template, recipient, context or {}))
+            except Exception as e:
+                # A template error will not fix itself; fail the row without retrying.
+                outcomes[row_id] = (False, None, f"render: {e}")
+        if emails:
+            try:
+                message_ids = await asyncio.to_thread(self.transport.send_batch, emails)
+                for email, message_id in zip(emails, message_ids):
+                    outcomes[email.outbox_id] = (True, message_id, None)
+            except Exception as e:
+                logger.warning(f"{self.name}: batch of {len(emails)} failed: {e}")
+                for email in emails:
+                    outcomes[email.outbox_id] = (False, None, str(e))
+        attempts_by_id = {row[0]: row[4] for row in claimed}
+        await asyncio.to_thread(self._record, outcomes, attempts_by_id)
+        return len(claimed)
+
+    def _claim_batch(self) -> List[Tuple[int, str, str, dict, int]]:
+        model = self.outbox_model
+        now = int(time.time())
+        with self.session_factory() as db:
+            rows = (
+                db.query(model)
+                .filter(model.status == "pending", model.next_attempt_at <= now)
+                .order_by(model.next_attempt_at, model.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            claimed = []
+            for row in rows:
+                row.attempts = (row.attempts or 0) + 1
+                row.next_attempt_at = now + self.lease_seconds
+                row.updated_at = now
+                claimed.append((row.id, row.template, row.recipient, dict(row.context or {}), row.attempts))
+            db.commit()
+        return claimed
+
+    def _backoff(self, attempts: int) -> int:
+        delay = min(self.backoff_base_seconds * (2 ** (attempts - 1)), self.backoff_max_seconds)
+        return int(delay * random.uniform(0.8, 1.2))
+
+    def _record(self, outcomes: Dict[int, Tuple[bool, Optional[str], Optional[str]]], attempts_by_id: Dict[int, int]) -> None:
+        model = self.outbox_model
+        now = int(time.time())
+        with self.session_factory() as db:
+            for row in db.query(model).filter(model.id.in_(list(outcomes))).all():
+                ok, message_id, error = outcomes[row.id]
+                row.updated_at = now
+                if ok:
+                    row.status = "sent"
+                    row.sent_at = now
+                    row.provider_message_id = message_id
+                    row.last_error = None
+                    self.sent += 1
+                elif error.startswith("render:") or attempts_by_id[row.id] >= self.max_attempts:
+                    row.status = "failed"
+                    row.last_error = error
+                    self.failed += 1
+                    logger.error(f"{self.name}: giving up on email {row.id} to {row.recipient}: {error}")
+                else:
+                    row.next_attempt_at = now + self._backoff(attempts_by_id[row.id])
+                    row.last_error = error
+                    self.retried += 1
+            db.commit()
+
+    def queue_depth(self) -> int:
+        """Rows still waiting to be sent (including retries and in-flight claims)."""
+        model = self.outbox_model
+        with self.session_factory() as db:
+            return db.query(func.count(model.id)).filter(model.status == "pending").scalar() or 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": len(self._tasks),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+email_outbox_worker = EmailOutboxWorker(
+    SessionLocal,
+    EmailOutbox,
+    get_email_transport,
+    concurrency=settings.EMAIL_WORKER_CONCURRENCY,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+)
@@ -1,116 +1,200 @@
+"""Email templates, delivery transports and the outbox-backed MailService."""
+
+import html
+from dataclasses import dataclass
+from string import Template
+from typing import Any, Dict, List, Optional
+
 import resend
-from loguru import logger
+from sqlalchemy.orm import Session
 
 from core.config import settings
+from core.models.email_outbox import EmailOutbox
 
+# Session.info flag telling the outbox worker (via an after_commit hook) that new rows are due.
+OUTBOX_PENDING_FLAG = "email_outbox_pending"
 
-class MailService:
-    def __init__(self):
-        resend.api_key = settings.RESEND_API_KEY
 
-    def send_signup_email(self, to: str, verification_url: str, username: str = "User"):
-        try:
-            html_template = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            </head>
-            <body style="margin: 0; padding: 0; background-color: #f9fafb; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;">
-                <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f9fafb; padding: 40px 20px;">
+@dataclass(frozen=True)
+class EmailTemplate:
+    """Subject plus an HTML body parsed once at import; values are HTML-escaped on render."""
+
+    subject: str
+    body: Template
+
+    def render(self, context: Dict[str, Any]) -> str:
+        return self.body.substitute({k: html.escape(str(v), quote=True) for k, v in context.items()})
+
+
+EMAIL_TEMPLATES: Dict[str, EmailTemplate] = {
+    "signup": EmailTemplate(
+        subject="Verify your Tone account",
+        body=Template("""\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; background-color: #f9fafb; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;">
+    <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f9fafb; padding: 40px 20px;">
+        <tr>
+            <td align="center">
+                <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 12px; border: 1px solid #e5e7eb; overflow: hidden;">
+                    <tr>
+                        <td style="padding: 40px 40px 20px 40px;">
+                            <h1 style="margin: 0; font-size: 28px; font-weight: 700; color: #111827;">Tone</h1>
+                        </td>
+                    </tr>
                     <tr>
-                        <td align="center">
-                            <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 12px; border: 1px solid #e5e7eb; overflow: hidden;">
-                                <tr>
-                                    <td style="padding: 40px 40px 20px 40px;">
-                                        <h1 style="margin: 0; font-size: 28px; font-weight: 700; color: #111827;">Tone</h1>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td align="center" style="padding: 20px 40px;">
-                                        <div style="width: 120px; height: 100px; position: relative;">
-                                            <div style="background-color: #F5C842; border-radius: 0 0 16px 16px; width: 100px; height: 60px; margin: 30px auto 0 auto;"></div>
-                                        </div>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td align="center" style="padding: 20px 40px 10px 40px;">
-                                        <h2 style="margin: 0; font-size: 24px; font-weight: 700; color: #111827;">Hi! {username}</h2>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td align="center" style="padding: 0 40px 10px 40px;">
-                                        <h3 style="margin: 0; font-size: 20px; font-weight: 600; color: #111827;">Welcome to Tone</h3>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td align="center" style="padding: 0 40px 30px 40px;">
-                                        <p style="margin: 0; font-size: 14px; color: #6b7280; line-height: 1.6; max-width: 400px;">
-                                            Tone helps you manage your organization efficiently with powerful tools for team collaboration and productivity.
-                                        </p>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td align="center" style="padding: 0 40px 40px 40px;">
-                                        <a href="{verification_url}" style="display: inline-block; background-color: #111827; color: #ffffff; text-decoration: none; padding: 14px 32px; border-radius: 8px; font-size: 14px; font-weight: 500;">
-                                            Confirm your Email
-                                        </a>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td align="center" style="padding: 0 40px 40px 40px;">
-                                        <p style="margin: 0; font-size: 12px; color: #9ca3af;">
-                                            If you didn't create an account, you can safely ignore this email.
-                                        </p>
-                                    </td>
-                                </tr>
-                            </table>
+                        <td align="center" style="padding: 20px 40px;">
+                            <div style="width: 120px; height: 100px; position: relative;">
+                                <div style="background-color: #F5C842; border-radius: 0 0 16px 16px; width: 100px; height: 60px; margin: 30px auto 0 auto;"></div>
+                            </div>
+                        </td>
+                    </tr>
+                    <tr>
+                        <td align="center" style="padding: 20px 40px 10px 40px;">
+                            <h2 style="margin: 0; font-size: 24px; font-weight: 700; color: #111827;">Hi! ${username}</h2>
+                        </td>
+                    </tr>
+                    <tr>
+                        <td align="center" style="padding: 0 40px 10px 40px;">
+                            <h3 style="margin: 0; font-size: 20px; font-weight: 600; color: #111827;">Welcome to Tone</h3>
+                        </td>
+                    </tr>
+                    <tr>
+                        <td align="center" style="padding: 0 40px 30px 40px;">
+                            <p style="margin: 0; font-size: 14px; color: #6b7280; line-height: 1.6; max-width: 400px;">
+                                Tone helps you manage your organization efficiently with powerful tools for team collaboration and productivity.
+                            </p>
+                        </td>
+                    </tr>
+                    <tr>
+                        <td align="center" style="padding: 0 40px 40px 40px;">
+                            <a href="${verification_url}" style="display: inline-block; background-color: #111827; color: #ffffff; text-decoration: none; padding: 14px 32px; border-radius: 8px; font-size: 14px; font-weight: 500;">
+                                Confirm your Email
+                            </a>
+                        </td>
+                    </tr>
+                    <tr>
+                        <td align="center" style="padding: 0 40px 40px 40px;">
+                            <p style="margin: 0; font-size: 12px; color: #9ca3af;">
+                                If you didn't create an account, you can safely ignore this email.
+                            </p>
                         </td>
                     </tr>
                 </table>
-            </body>
-            </html>
-            """
-            params = {
-                "from": "no-reply@updates.suryaweb.app",
-                "to": [to],
-                "subject": "Verify your Tone account",
-                "html": html_template,
-            }
-            result = resend.Emails.send(params)
-            return result
-
-        except Exception as e:
-            logger.error(f"An error occurred while sending email: {e}")
-            return None
+            </td>
+        </tr>
+    </table>
+</body>
+</html>
+"""),
+    ),
+    "forgot_password": EmailTemplate(
+        subject="Forgot Password Email",
+        body=Template('<p>Please click this link to reset your password: <a href="${verification_url}">${verification_url}</a></p>'),
+    ),
+    "invite": EmailTemplate(
+        subject="You've been invited to join Tone",
+        body=Template('<p>Please click this to accept the invitation: <a href="${invite_url}">${invite_url}</a></p>'),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class OutgoingEmail:
+    outbox_id: int
+    to: str
+    subject: str
+    html: str
+
+
+def render_email(outbox_id: int, template: str, recipient: str, context: Dict[str, Any]) -> OutgoingEmail:
+    email_template = EMAIL_TEMPLATES[template]
+    return OutgoingEmail(
+        outbox_id=outbox_id,
+        to=recipient,
+        subject=email_template.subject,
+        html=email_template.render(context),
+    )
+
+
+class ResendTransport:
+    """Sends a batch with one Resend batch API call (all-or-nothing)."""
+
+    def __init__(self, api_key: str, sender: str):
+        self.api_key = api_key
+        self.sender = sender
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[str]]:
+        resend.api_key = self.api_key
+        response = resend.Batch.send([
+            {"from": self.sender, "to": [email.to], "subject": email.subject, "html": email.html}
+            for email in emails
+        ])
+        data = response.get("data", []) if isinstance(response, dict) else response
+        ids = [item.get("id") if isinstance(item, dict) else None for item in data or []]
+        return ids + [None] * (len(emails) - len(ids))
+
+
+class FakeEmailTransport:
+    """Records emails instead of sending them; for local development and tests.
+
+    fail_next makes the next N batches raise, to exercise retries.
+    """
+
+    def __init__(self, fail_next: int = 0):
+        self.sent: List[OutgoingEmail] = []
+        self.batches = 0
+        self.fail_next = fail_next
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[str]]:
+        self.batches += 1
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise RuntimeError("fake transport failure")
+        self.sent.extend(emails)
+        return [f"fake-{email.outbox_id}" for email in emails]
+
+
+def get_email_transport():
+    if settings.EMAIL_TRANSPORT == "fake":
+        return FakeEmailTransport()
+    return ResendTransport(api_key=settings.RESEND_API_KEY, sender=settings.EMAIL_FROM)
+
+
+class MailService:
+    """Queues emails in the outbox table on the caller's session.
+
+    Nothing is sent until the caller commits; the outbox worker then delivers the rows.
+    """
+
+    def __init__(self, db: Session, outbox_model=EmailOutbox):
+        self.db = db
+        self.outbox_model = outbox_model
+
+    def enqueue(self, template: str, to: str, **context: Any):
+        if template not in EMAIL_TEMPLATES:
+            raise ValueError(f"Unknown email template: {template}")
+        row = self.outbox_model(
+            template=template,
+            recipient=to,
+            context=context,
+            status="pending",
+            attempts=0,
+            next_attempt_at=0,
+        )
+        self.db.add(row)
+        self.db.info[OUTBOX_PENDING_FLAG] = True
+        return row
+
+    def send_signup_email(self, to: str, verification_url: str, username: str = "User"):
+        return self.enqueue("signup", to, verification_url=verification_url, username=username)
 
     def send_forgot_password_email(self, to: str, verification_url: str):
-        try:
-            params = {
-                "from": "no-reply@updates.suryaweb.app",
-                "to": [to],
-                "subject": "Forgot Password Email",
-                "html": f'<p>Please click this link to reset your password: <a href="{verification_url}">{verification_url}</a></p>',
-            }
-            result = resend.Emails.send(params)
-            return result
-
-        except Exception as e:
-            logger.error(f"An error occurred while sending email: {e}")
-            return None
+        return self.enqueue("forgot_password", to, verification_url=verification_url)
 
     def send_invite_email(self, to: str, invite_url: str):
-        try:
-            params = {
-                "from": "no-reply@updates.suryaweb.app",
-                "to": [to],
-                "subject": "You've been invited to join Tone",
-                "html": f'<p>Please click this to accept the invitation: <a href="{invite_url}">{invite_url}</a></p>',
-            }
-            result = resend.Emails.send(params)
-            return result
-
-        except Exception as e:
-            logger.error(f"An error occurred while sending email: {e}")
-            return None
+        return self.enqueue("invite", to, invite_url=invite_url)
@@ -0,0 +1,257 @@
+"""Liveness and readiness reports for the API servers and the bot server.
+
+/health/live only says the process is serving requests. /health/ready says whether the
+instance should get traffic, and carries the load figures the autoscaler acts on:
+
+- database: a SELECT 1 through the app's session factory, with a timeout;
+- pools: checked-out and overflow connections of each SQLAlchemy engine;
+- threadpool: busy and waiting slots of the anyio limiter that runs sync endpoints;
+- calls in progress, email outbox backlog, cache hit rates and background worker stats.
+
+"saturation" is the highest pool or threadpool utilization (0..1), for the autoscaler.
+Readiness fails (503) when the database probe fails. A pool or the threadpool at its
+configured maximum only marks the report "degraded" by default: load is spread evenly,
+so when one instance is saturated the others are close, and pulling it would push its
+traffic onto them until the whole fleet is out. With the saturation gate enabled,
+readiness also fails once saturation has stayed at the maximum for sustain_seconds,
+and recovers when it drops below the recover level (hysteresis, so the instance does
+not flap in and out). A deep email backlog only marks the report "degraded" too.
+"""
+
+import asyncio
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import anyio.to_thread
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, text
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+OK, DEGRADED, UNAVAILABLE = "ok", "degraded", "unavailable"
+
+StatsFn = Callable[[], Dict[str, Any]]
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Checked-out and overflow connections of the engine's QueuePool, and the share of capacity in use."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__}
+    size = pool.size()
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    # max_overflow < 0 means no limit, so there is no capacity to saturate
+    capacity = size + max_overflow if max_overflow >= 0 else None
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "utilization": round(checked_out / capacity, 3) if capacity else None,
+    }
+
+
+def threadpool_stats() -> Dict[str, Any]:
+    """Slots of the default anyio thread limiter (sync endpoints and dependencies); needs a running loop."""
+    stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    total = stats.total_tokens
+    return {
+        "busy": stats.borrowed_tokens,
+        "size": total if math.isfinite(total) else None,
+        "waiting": stats.tasks_waiting,
+        "utilization": round(stats.borrowed_tokens / total, 3) if math.isfinite(total) and total else None,
+    }
+
+
+class HealthMonitor:
+    """Builds the readiness report of one server process; see the module docstring.
+
+    A report is reused for cache_seconds, so frequent probes from several load balancers
+    cost one database round trip. The database probe runs in a thread; one that has not
+    returned by the timeout (e.g. waiting for a pooled connection) fails the check and is
+    not started again until it returns.
+    """
+
+    def __init__(
+        self,
+        edition: str,
+        session_factory: Callable[[], Any],
+        engines: Mapping[str, Engine],
+        count_calls: bool = False,
+        email_outbox: Any = None,
+        caches: Optional[Mapping[str, StatsFn]] = None,
+        components: Optional[Mapping[str, StatsFn]] = None,
+        db_timeout_seconds: float = 2.0,
+        pool_utilization_max: float = 0.9,
+        threadpool_utilization_max: float = 0.9,
+        email_queue_degraded: int = 1000,
+        cache_seconds: float = 1.0,
+        saturation_gate: bool = False,
+        saturation_sustain_seconds: float = 30.0,
+        saturation_recover: float = 0.7,
+    ):
+        self.edition = edition
+        self.session_factory = session_factory
+        self.engines = dict(engines)
+        self.count_calls = count_calls
+        self.email_outbox = email_outbox
+        self.caches = dict(caches or {})
+        self.components = dict(components or {})
+        self.db_timeout_seconds = db_timeout_seconds
+        self.pool_utilization_max = pool_utilization_max
+        self.threadpool_utilization_max = threadpool_utilization_max
+        self.email_queue_degraded = email_queue_degraded
+        self.cache_seconds = cache_seconds
+        self.saturation_gate = saturation_gate
+        self.saturation_sustain_seconds = saturation_sustain_seconds
+        self.saturation_recover = saturation_recover
+        self.started_at = time.time()
+        self._saturated_since: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._probe: Optional[asyncio.Future] = None
+        self._report: Optional[Tuple[bool, Dict[str, Any]]] = None
+        self._report_at = 0.0
+
+    def live(self) -> Dict[str, Any]:
+        return {
+            "status": OK,
+            "edition": self.edition,
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+
+    async def ready(self) -> Tuple[bool, Dict[str, Any]]:
+        """(ready, report); ready is False when the report's status is "unavailable"."""
+        if self._report is not None and time.monotonic() - self._report_at < self.cache_seconds:
+            return self._report
+        async with self._lock:
+            if self._report is None or time.monotonic() - self._report_at >= self.cache_seconds:
+                self._report = await self._build()
+                self._report_at = time.monotonic()
+        return self._report
+
+    async def _build(self) -> Tuple[bool, Dict[str, Any]]:
+        probe = await self._run_probe()
+        pools = {name: pool_stats(engine) for name, engine in self.engines.items()}
+        threadpool = threadpool_stats()
+
+        failures = []
+        if probe.get("error"):
+            failures.append(f"database: {probe['error']}")
+        saturated = []
+        for name, pool in pools.items():
+            if pool.get("utilization") is not None and pool["utilization"] >= self.pool_utilization_max:
+                saturated.append(f"pool {name}: {pool['checked_out']} of {pool['capacity']} connections checked out")
+        if threadpool["utilization"] is not None and threadpool["utilization"] >= self.threadpool_utilization_max:
+            saturated.append(f"threadpool: {threadpool['busy']} of {threadpool['size']} busy, {threadpool['waiting']} waiting")
+        utilizations = [p["utilization"] for p in pools.values() if p.get("utilization") is not None]
+        if threadpool["utilization"] is not None:
+            utilizations.append(threadpool["utilization"])
+        saturation = max(utilizations, default=0.0)
+        saturated_for = self._track_saturation(bool(saturated), saturation)
+
+        warnings = []
+        if saturated_for is not None and self.saturation_gate and saturated_for >= self.saturation_sustain_seconds:
+            failures.extend(saturated or [f"saturation {saturation} not yet below {self.saturation_recover}"])
+        else:
+            warnings.extend(saturated)
+        queue_depth = probe.get("email_queue_depth")
+        if queue_depth is not None and queue_depth >= self.email_queue_degraded:
+            warnings.append(f"email outbox: {queue_depth} emails pending")
+
+        report: Dict[str, Any] = {
+            "status": UNAVAILABLE if failures else DEGRADED if warnings else OK,
+            "edition": self.edition,
+            "pid": os.getpid(),
+            "saturation": saturation,
+            "saturated_for_seconds": round(saturated_for, 1) if saturated_for is not None else None,
+            "reasons": failures + warnings,
+            "database": {"latency_ms": probe.get("latency_ms"), "error": probe.get("error")},
+            "pools": pools,
+            "threadpool": threadpool,
+        }
+        if self.count_calls:
+            report["calls"] = {"in_progress": probe.get("calls_in_progress")}
+        if self.email_outbox is not None:
+            report["email_outbox"] = {"queue_depth": queue_depth, **self.email_outbox.stats()}
+        caches = {name: stats() for name, stats in self.caches.items()}
+        report["cache_hit_rates"] = {name: stats.get("hit_rate") for name, stats in caches.items()}
+        report["caches"] = caches
+        for name, stats in self.components.items():
+            report[name] = stats()
+        return not failures, report
+
+    def _track_saturation(self, saturated: bool, saturation: float) -> Optional[float]:
+        """Seconds since saturation reached the maximum, until it drops below saturation_recover; else None."""
+        now = time.monotonic()
+        if saturated:
+            if self._saturated_since is None:
+                self._saturated_since = now
+        elif saturation < self.saturation_recover:
+            self._saturated_since = None
+        return now - self._saturated_since if self._saturated_since is not None else None
+
+    async def _run_probe(self) -> Dict[str, Any]:
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.ensure_future(asyncio.to_thread(self._probe_database))
+            # Retrieve the outcome even if nobody is waiting for it any more
+            self._probe.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._probe), self.db_timeout_seconds)
+        except asyncio.TimeoutError:
+            return {"error": f"no answer within {self.db_timeout_seconds:g}s"}
+        except Exception as e:
+            # First line only: driver errors go on with hints and documentation links
+            return {"error": f"{type(e).__name__}: {next(iter(str(e).splitlines()), '')}"}
+
+    def _probe_database(self) -> Dict[str, Any]:
+        from core.models.call import Call
+
+        start = time.perf_counter()
+        with self.session_factory() as db:
+            db.execute(text("SELECT 1"))
+            result: Dict[str, Any] = {"latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+            if self.count_calls:
+                # Served by the partial index ix_calls_in_progress
+                result["calls_in_progress"] = (
+                    db.query(func.count(Call.id)).filter(Call.ended_at.is_(None)).scalar() or 0
+                )
+        if self.email_outbox is not None:
+            result["email_queue_depth"] = self.email_outbox.queue_depth()
+        return result
+
+
+def health_router(monitor: HealthMonitor) -> APIRouter:
+    """/health/live and /health/ready for an app; ready answers 503 when the instance should get no traffic."""
+    router = APIRouter()
+
+    @router.get("/health/live")
+    def live():
+        return monitor.live()
+
+    @router.get("/health/ready")
+    async def ready():
+        is_ready, report = await monitor.ready()
+        return JSONResponse(report, status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return router
+
+
+def health_thresholds() -> Dict[str, Any]:
+    """HealthMonitor keyword arguments from the HEALTH_* settings."""
+    return {
+        "db_timeout_seconds": settings.HEALTH_DB_TIMEOUT_SECONDS,
+        "pool_utilization_max": settings.HEALTH_POOL_UTILIZATION_MAX,
+        "threadpool_utilization_max": settings.HEALTH_THREADPOOL_UTILIZATION_MAX,
+        "email_queue_degraded": settings.HEALTH_EMAIL_QUEUE_DEGRADED,
+        "cache_seconds": settings.HEALTH_CACHE_SECONDS,
+        "saturation_gate": settings.HEALTH_SATURATION_GATE,
+        "saturation_sustain_seconds": settings.HEALTH_SATURATION_SUSTAIN_SECONDS,
+        "saturation_recover": settings.HEALTH_SATURATION_RECOVER,
+    }
+
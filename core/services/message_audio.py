@@ -0,0 +1,211 @@
+"""Pre-rendered audio for an agent's static utterances (first, end-call and voicemail messages).
+
+The API renders them with the agent's TTS provider when the config is saved; bot
+workers look them up by content key at call start and push the audio straight to the
+transport instead of waiting on a live TTS round-trip.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+from loguru import logger
+
+from core.config import settings
+from core.services.agent_runtime_cache import AgentRuntimeSpec
+from core.services.audio_cache import TELEPHONY_FORMAT, AudioCache, AudioFormat, audio_cache_key
+from core.services.provider_registry import provider_registry
+from core.utils.audio import resample, ulaw_decode, ulaw_encode
+
+MESSAGE_FIELDS = ("first_message", "end_call_message", "voicemail_message")
+
+
+def message_text(spec: AgentRuntimeSpec, field: str) -> Optional[str]:
+    text = getattr(spec, field, None)
+    return text.strip() if text and text.strip() else None
+
+
+def tts_voice(spec: AgentRuntimeSpec) -> Optional[Dict[str, Any]]:
+    """The agent's TTS synthesis parameters (provider kwargs without credentials)."""
+    return provider_registry.voice_params(spec.tts) if spec.tts is not None else None
+
+
+def message_audio_key(spec: AgentRuntimeSpec, field: str, fmt: AudioFormat = TELEPHONY_FORMAT) -> Optional[str]:
+    text = message_text(spec, field)
+    voice = tts_voice(spec) if text else None
+    if voice is None:
+        return None
+    return audio_cache_key(text, spec.tts.provider_name, voice, fmt)
+
+
+def encode_audio(pcm: bytes, sample_rate: int, fmt: AudioFormat) -> bytes:
+    """16-bit mono PCM at sample_rate -> bytes in fmt."""
+    samples = resample(np.frombuffer(pcm, dtype=np.int16), sample_rate, fmt.sample_rate)
+    return ulaw_encode(samples) if fmt.encoding == "ulaw" else samples.tobytes()
+
+
+def decode_audio(audio: bytes, fmt: AudioFormat) -> bytes:
+    """Bytes in fmt -> 16-bit mono PCM at fmt.sample_rate."""
+    return ulaw_decode(audio).tobytes() if fmt.encoding == "ulaw" else audio
+
+
+async def synthesize(tts: Any, text: str, fmt: AudioFormat, timeout_seconds: float) -> bytes:
+    """Run text through a TTS service in a two-stage pipeline and return the audio in fmt."""
+    from pipecatfork.src.pipecat.frames.frames import (
+        EndFrame,
+        ErrorFrame,
+        Frame,
+        TTSAudioRawFrame,
+        TTSSpeakFrame,
+        TTSStoppedFrame,
+    )
+    from pipecatfork.src.pipecat.pipeline.pipeline import Pipeline
+    from pipecatfork.src.pipecat.pipeline.runner import PipelineRunner
+    from pipecatfork.src.pipecat.pipeline.task import PipelineParams, PipelineTask
+    from pipecatfork.src.pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+    chunks: List[bytes] = []
+    done = asyncio.Event()
+    errors: List[str] = []
+
+    class Collector(FrameProcessor):
+        async def process_frame(self, frame: Frame, direction: FrameDirection):
+            await super().process_frame(frame, direction)
+            if isinstance(frame, TTSAudioRawFrame):
+                chunks.append(encode_audio(frame.audio, frame.sample_rate, fmt))
+            elif isinstance(frame, TTSStoppedFrame):
+                done.set()
+            elif isinstance(frame, ErrorFrame):
+                errors.append(str(frame.error))
+                done.set()
+            await self.push_frame(frame, direction)
+
+    task = PipelineTask(
+        Pipeline([tts, Collector()]),
+        params=PipelineParams(audio_out_sample_rate=fmt.sample_rate),
+    )
+    runner = PipelineRunner(handle_sigint=False)
+    running = asyncio.create_task(runner.run(task))
+    try:
+        await task.queue_frame(TTSSpeakFrame(text))
+        await asyncio.wait_for(done.wait(), timeout_seconds)
+        await task.queue_frame(EndFrame())
+        await asyncio.wait_for(running, timeout_seconds)
+    finally:
+        if not running.done():
+            await task.cancel()
+            await asyncio.gather(running, return_exceptions=True)
+    if errors:
+        raise RuntimeError(errors[0])
+    if not chunks:
+        raise RuntimeError("TTS produced no audio")
+    return b"".join(chunks)
+
+
+class MessageAudioRenderer:
+    """Renders an agent's static messages into the audio cache, one agent at a time, off the caller's thread.
+
+    schedule() is fire-and-forget: the API calls it after a config save, bot workers on a
+    cache miss. Messages already cached under their current key are skipped, so repeated
+    saves that change neither text nor voice cost nothing.
+    """
+
+    def __init__(self, cache: AudioCache, fmt: AudioFormat = TELEPHONY_FORMAT, timeout_seconds: float = 30.0):
+        self.cache = cache
+        self.fmt = fmt
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="message-audio")
+        self._lock = threading.Lock()
+        self._pending: Set[int] = set()
+        self.rendered = 0
+        self.failed = 0
+        self.render_seconds = 0.0
+
+    def schedule(self, agent_id: Optional[int]) -> None:
+        if agent_id is None:
+            return
+        with self._lock:
+            if agent_id in self._pending:
+                return
+            self._pending.add(agent_id)
+        self._executor.submit(self._render_in_thread, int(agent_id))
+
+    def _render_in_thread(self, agent_id: int) -> None:
+        try:
+            asyncio.run(self.render_agent(agent_id))
+        except Exception as e:
+            logger.warning(f"Rendering messages for agent {agent_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(agent_id)
+
+    def _load_spec(self, agent_id: int) -> Optional[AgentRuntimeSpec]:
+        from core.database.session import get_db_context
+        from core.services.agent_factory_service import AgentFactoryService
+
+        with get_db_context() as db:
+            return AgentFactoryService(db).get_runtime_spec(agent_id)
+
+    async def render_agent(self, agent_id: int) -> int:
+        """Render every static message of the agent that is not cached yet. Returns how many were rendered."""
+        spec = await asyncio.to_thread(self._load_spec, agent_id)
+        if spec is None:
+            return 0
+        count = 0
+        for field in MESSAGE_FIELDS:
+            key = message_audio_key(spec, field, self.fmt)
+            if key is None or self.cache.contains(key):
+                continue
+            tts = provider_registry.build(spec.tts)
+            if tts is None:
+                return count
+            start = time.perf_counter()
+            try:
+                audio = await synthesize(tts, message_text(spec, field), self.fmt, self.timeout_seconds)
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Rendering {field} for agent {agent_id} failed: {e}")
+                continue
+            self.render_seconds += time.perf_counter() - start
+            self.cache.put(key, audio)
+            self.rendered += 1
+            count += 1
+            logger.info(
+                f"Rendered {field} for agent {agent_id}: {len(audio) / self.fmt.bytes_per_second:.1f}s of audio"
+            )
+        return count
+
+    def lookup(self, spec: AgentRuntimeSpec, field: str) -> Optional[bytes]:
+        """Cached audio of the message in this renderer's format, or None (missing or not rendered yet)."""
+        key = message_audio_key(spec, field, self.fmt)
+        return self.cache.get(key) if key else None
+
+    def output_frames(self, audio: bytes) -> List[Any]:
+        from pipecatfork.src.pipecat.frames.frames import OutputAudioRawFrame
+
+        return [OutputAudioRawFrame(decode_audio(audio, self.fmt), self.fmt.sample_rate, 1)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "pending": len(self._pending),
+            "render_seconds": round(self.render_seconds, 2),
+            "cache": self.cache.stats(),
+        }
+
+
+message_audio_cache = AudioCache(
+    os.path.join(settings.AUDIO_CACHE_DIR, "messages"),
+    max_memory_bytes=settings.MESSAGE_AUDIO_MEMORY_MB * 1024 * 1024,
+    max_disk_bytes=settings.MESSAGE_AUDIO_DISK_MB * 1024 * 1024,
+)
+message_audio_renderer = MessageAudioRenderer(
+    message_audio_cache,
+    TELEPHONY_FORMAT,
+    timeout_seconds=settings.MESSAGE_AUDIO_RENDER_TIMEOUT_SECONDS,
+)
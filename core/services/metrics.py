@@ -0,0 +1,298 @@
+"""Prometheus metrics for the API servers and the bot server, served on /metrics.
+
+- http_request_duration_seconds{app, method, route, status}: route is the path template
+  ("/api/v1/agent/{agent_id}"), status the class ("2xx"); unmatched paths share one label.
+- http_request_db_queries / http_request_db_seconds{app, route}: statements and time spent
+  in the database per request, from SQLAlchemy cursor events on instrumented engines.
+- db_pool_checked_out / db_pool_overflow / db_pool_capacity{engine}.
+- bot_active_calls{agent}: agent ids past METRICS_MAX_AGENT_LABELS are reported as "other".
+- bot_call_setup_seconds{phase}: routing (to number -> agent), config (agent runtime
+  spec) and providers (LLM/STT/TTS construction).
+- bot_provider_errors_total{service_type, provider, stage}: provider construction
+  failures and errors raised by the provider in the call pipeline.
+
+Several processes behind one port (uvicorn --workers, the bot supervisor's workers) each
+write their samples to METRICS_MULTIPROC_DIR, and a scrape of any of them aggregates the
+directory. prometheus_client reads the directory at import, so this module must be the
+first to import it.
+"""
+
+import contextvars
+import fcntl
+import glob
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from core.config import settings
+
+if settings.METRICS_MULTIPROC_DIR:
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = settings.METRICS_MULTIPROC_DIR
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+_MULTIPROC_DIR = settings.METRICS_MULTIPROC_DIR or None
+_UNMATCHED_ROUTE = "<unmatched>"
+OTHER = "other"
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["app", "method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per HTTP request",
+    ["app", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database statements per HTTP request",
+    ["app", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections checked out of the pool", ["engine"], multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["engine"], multiprocess_mode="livesum"
+)
+POOL_CAPACITY = Gauge(
+    "db_pool_capacity", "Pool size plus max overflow", ["engine"], multiprocess_mode="livesum"
+)
+ACTIVE_CALLS = Gauge("bot_active_calls", "Calls in progress", ["agent"], multiprocess_mode="livesum")
+CALL_SETUP_SECONDS = Histogram(
+    "bot_call_setup_seconds",
+    "Call setup time by phase",
+    ["phase"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PROVIDER_ERRORS = Counter(
+    "bot_provider_errors", "Provider errors by provider", ["service_type", "provider", "stage"]
+)
+
+
+class BoundedLabel:
+    """Maps label values to themselves until max_values distinct ones are seen, then to "other"."""
+
+    def __init__(self, max_values: int):
+        self.max_values = max_values
+        self._lock = threading.Lock()
+        self._values: set = set()
+
+    def __call__(self, value: Any) -> str:
+        value = str(value)
+        if value in self._values:
+            return value
+        with self._lock:
+            if len(self._values) < self.max_values:
+                self._values.add(value)
+                return value
+        return OTHER
+
+
+agent_label = BoundedLabel(settings.METRICS_MAX_AGENT_LABELS)
+
+
+# Requests
+
+class _DbTally:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set per request by MetricsMiddleware; sync endpoints and async sessions see the same tally
+_request_db: contextvars.ContextVar[Optional[_DbTally]] = contextvars.ContextVar("request_db", default=None)
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return _UNMATCHED_ROUTE
+    # Routes of mounted apps (api_v1) are relative to the mount point
+    return scope.get("root_path", "") + path
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and database use of each HTTP request."""
+
+    def __init__(self, app: Any, app_name: str):
+        self.app = app
+        self.app_name = app_name
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        tally = _DbTally()
+        token = _request_db.set(tally)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db.reset(token)
+            route = route_label(scope)
+            REQUEST_SECONDS.labels(self.app_name, scope["method"], route, f"{status[0] // 100}xx").observe(elapsed)
+            REQUEST_DB_QUERIES.labels(self.app_name, route).observe(tally.queries)
+            REQUEST_DB_SECONDS.labels(self.app_name, route).observe(tally.seconds)
+
+
+def metrics_response() -> Any:
+    from fastapi import Response
+
+    if _MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def instrument_app(app: Any, app_name: str) -> None:
+    """Add the request middleware and GET /metrics to a FastAPI app."""
+    app.add_middleware(MetricsMiddleware, app_name=app_name)
+    app.add_api_route("/metrics", metrics_response, methods=["GET"], include_in_schema=False)
+
+
+# Database
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Pool gauges and per-request statement counts for a (sync) engine; for async ones pass .sync_engine."""
+    checked_out = POOL_CHECKED_OUT.labels(name)
+    overflow = POOL_OVERFLOW.labels(name)
+    capacity = POOL_CAPACITY.labels(name)
+
+    def update_pool() -> None:
+        # Read engine.pool each time: a forked worker's dispose() replaces it (events are kept)
+        pool = engine.pool
+        if hasattr(pool, "overflow"):
+            overflow.set(max(pool.overflow(), 0))
+            max_overflow = getattr(pool, "_max_overflow", 0)
+            if max_overflow >= 0:
+                capacity.set(pool.size() + max_overflow)
+
+    update_pool()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        checked_out.inc()
+        update_pool()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection: Any, record: Any) -> None:
+        checked_out.dec()
+        update_pool()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if _request_db.get() is not None:
+            conn.info["metrics_query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        tally = _request_db.get()
+        started = conn.info.pop("metrics_query_start", None)
+        if tally is not None and started is not None:
+            tally.queries += 1
+            tally.seconds += time.perf_counter() - started
+
+
+# Calls
+
+@contextmanager
+def call_setup_phase(phase: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        CALL_SETUP_SECONDS.labels(phase).observe(time.perf_counter() - start)
+
+
+def call_started(agent_id: Optional[int]) -> str:
+    """Count the call against its agent; returns the label to pass to call_ended()."""
+    label = agent_label(agent_id) if agent_id is not None else "none"
+    ACTIVE_CALLS.labels(label).inc()
+    return label
+
+
+def call_ended(label: str) -> None:
+    ACTIVE_CALLS.labels(label).dec()
+
+
+def provider_error(service_type: str, provider_name: Optional[str], stage: str) -> None:
+    """stage: "build" (construction failed or provider unavailable) or "call" (error during the call)."""
+    from core.services.provider_registry import provider_registry
+
+    name = provider_name if provider_name and provider_registry.entry(service_type, provider_name) else OTHER
+    PROVIDER_ERRORS.labels(service_type, name, stage).inc()
+
+
+# Multiprocess bookkeeping
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a worker that exited (its counters and histograms stay)."""
+    if _MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid, _MULTIPROC_DIR)
+
+
+_PID_IN_FILENAME = re.compile(r"_(\d+)\.db$")
+
+
+def reset_multiproc_dir() -> None:
+    """Clear samples left by a previous run of the server; call at process start.
+
+    Files are only removed when none belongs to a live process, i.e. on a fresh start,
+    not when one worker of a running server is restarted. Live gauges of dead processes
+    are dropped either way.
+    """
+    if not _MULTIPROC_DIR:
+        return
+    with open(os.path.join(_MULTIPROC_DIR, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        files = glob.glob(os.path.join(_MULTIPROC_DIR, "*.db"))
+        pids = {int(m.group(1)) for m in map(_PID_IN_FILENAME.search, files) if m}
+        alive = {pid for pid in pids if pid == os.getpid() or _pid_alive(pid)}
+        if alive - {os.getpid()}:
+            for pid in pids - alive:
+                multiprocess.mark_process_dead(pid, _MULTIPROC_DIR)
+            return
+        for path in files:
+            if not path.endswith(f"_{os.getpid()}.db"):
+                os.remove(path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
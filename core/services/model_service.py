@@ -5,6 +5,7 @@ import time
 from fastapi import HTTPException, status
 
 from core.services.base import BaseService
+from core.services.agent_runtime_cache import agent_runtime_cache
 from core.models.models import Model
 from core.models.service_provider import ServiceProvider
 
@@ -50,10 +51,12 @@ class ModelService(BaseService):
             if "service_type" in data:
                 update_fields["service_type"] = data["service_type"]
             update_fields["updated_at"] = now
+            previous_provider_id = existing.service_provider_id
             for key, value in update_fields.items():
                 setattr(existing, key, value)
             self.db.commit()
             self.db.refresh(existing)
+            agent_runtime_cache.invalidate_service_providers((previous_provider_id, existing.service_provider_id))
             return existing
 
         service_provider_id = int(data["service_provider_id"])
@@ -72,6 +75,7 @@ class ModelService(BaseService):
         self.db.add(model)
         self.db.commit()
         self.db.refresh(model)
+        agent_runtime_cache.invalidate_service_providers((service_provider_id,))
         return model
 
 
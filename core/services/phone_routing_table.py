@@ -0,0 +1,212 @@
+"""In-memory routing table from E.164 phone numbers (DIDs) to the agent that answers them."""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import phonenumbers
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database.session import SessionLocal
+from core.models.agent import Agent
+from core.models.agent_phone_numbers import AgentPhoneNumbers
+
+
+def normalize_phone_number(phone_number: Optional[str], region: Optional[str] = None) -> str:
+    """Return the E.164 form of a phone number, or a digits-only fallback if it cannot be parsed."""
+    if not phone_number:
+        return ""
+    raw = phone_number.strip()
+    if not raw:
+        return ""
+    try:
+        parsed = phonenumbers.parse(raw, region or settings.DEFAULT_PHONE_REGION)
+        if phonenumbers.is_possible_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    except phonenumbers.NumberParseException:
+        pass
+    digits = re.sub(r"\D", "", raw)
+    return f"+{digits}" if raw.startswith("+") and digits else digits
+
+
+@dataclass(frozen=True)
+class RoutedAgent:
+    """The agent a phone number routes to; carries what call setup needs without an ORM session."""
+
+    id: int
+    name: str
+    phone_number: str
+    row_uuid: Optional[str] = None
+
+
+class PhoneRoutingTable:
+    """Thread-safe map of E.164 number -> RoutedAgent.
+
+    Loaded in full from agent_phone_numbers and updated by AgentPhoneNumbersService and
+    AgentService writes in the same process. Writes made by other processes (the API
+    server for the bot's table, other workers), or directly in the DB, are picked up by
+    a daemon thread (ensure_refreshing()): every refresh_seconds it compares a version
+    stamp of the table with the one seen at load time and reloads when they differ.
+    lookup() is only ever a dict read; it never waits on the database.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, refresh_seconds: float = 5.0):
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._routes: Dict[str, RoutedAgent] = {}
+        self._number_by_row: Dict[str, str] = {}
+        self._version: Optional[Tuple[Any, ...]] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def lookup(self, phone_number: str) -> Optional[RoutedAgent]:
+        return self._routes.get(normalize_phone_number(phone_number))
+
+    def load(self, db: Session) -> int:
+        # Read before the rows, so a write landing in between triggers another reload
+        version = self._read_version(db)
+        rows = (
+            db.query(AgentPhoneNumbers.uuid, AgentPhoneNumbers.phone_number, Agent.id, Agent.name)
+            .join(Agent, Agent.id == AgentPhoneNumbers.agent_id)
+            .order_by(AgentPhoneNumbers.id)
+            .all()
+        )
+        routes: Dict[str, RoutedAgent] = {}
+        number_by_row: Dict[str, str] = {}
+        for row_uuid, phone_number, agent_id, agent_name in rows:
+            normalized = normalize_phone_number(phone_number)
+            if not normalized:
+                continue
+            if normalized in routes:
+                logger.warning(
+                    f"Phone number {normalized} is configured more than once; keeping agent_id={routes[normalized].id}"
+                )
+                continue
+            route = RoutedAgent(id=agent_id, name=agent_name, phone_number=normalized, row_uuid=str(row_uuid))
+            routes[normalized] = route
+            number_by_row[route.row_uuid] = normalized
+        with self._lock:
+            self._routes = routes
+            self._number_by_row = number_by_row
+            self._version = version
+            self.loaded = True
+        logger.info(f"Loaded phone routing table with {len(routes)} numbers")
+        return len(routes)
+
+    def agent_ids(self) -> List[int]:
+        return sorted({route.id for route in self._routes.values()})
+
+    def refresh(self, db: Session) -> bool:
+        """Load the table, or reload it if agent_phone_numbers changed since the last load. Returns True if (re)loaded."""
+        if self.loaded and self._read_version(db) == self._version:
+            return False
+        if self.loaded:
+            logger.info("agent_phone_numbers changed; reloading the phone routing table")
+        self.load(db)
+        return True
+
+    def ensure_refreshing(self) -> None:
+        """Start the refresh thread if it is not running (first use, or in a forked worker)."""
+        if self.session_factory is None or self.refresh_seconds <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="phone-routing-refresh", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            if self.loaded:
+                time.sleep(self.refresh_seconds)
+            try:
+                with self.session_factory() as db:
+                    self.refresh(db)
+            except Exception as e:
+                logger.warning(f"Phone routing table refresh failed, keeping the current table: {e}")
+                if not self.loaded:
+                    time.sleep(self.refresh_seconds)
+
+    @staticmethod
+    def _read_version(db: Session) -> Tuple[Any, ...]:
+        # A delete lowers the count or, with inserts, raises the id sum (ids only grow);
+        # reassignments change the agent_id sum and updated_at; renames the agents' updated_at
+        return tuple(
+            db.query(
+                func.count(AgentPhoneNumbers.id),
+                func.sum(AgentPhoneNumbers.id),
+                func.sum(AgentPhoneNumbers.agent_id),
+                func.max(AgentPhoneNumbers.updated_at),
+                func.max(Agent.updated_at),
+            )
+            .join(Agent, Agent.id == AgentPhoneNumbers.agent_id)
+            .one()
+        )
+
+    def upsert(self, row_uuid: str, phone_number: str, agent_id: int, agent_name: str) -> None:
+        normalized = normalize_phone_number(phone_number)
+        row_uuid = str(row_uuid)
+        with self._lock:
+            previous = self._number_by_row.pop(row_uuid, None)
+            if previous is not None and previous != normalized:
+                self._routes.pop(previous, None)
+            if normalized:
+                self._routes[normalized] = RoutedAgent(
+                    id=agent_id, name=agent_name, phone_number=normalized, row_uuid=row_uuid
+                )
+                self._number_by_row[row_uuid] = normalized
+
+    def rename_agent(self, agent_id: int, agent_name: str) -> None:
+        with self._lock:
+            for number, route in list(self._routes.items()):
+                if route.id == agent_id and route.name != agent_name:
+                    self._routes[number] = RoutedAgent(
+                        id=agent_id, name=agent_name, phone_number=number, row_uuid=route.row_uuid
+                    )
+
+    def check_consistency(self, db: Session) -> Dict[str, Any]:
+        """Compare the in-memory table with agent_phone_numbers without modifying either."""
+        rows = (
+            db.query(AgentPhoneNumbers.phone_number, AgentPhoneNumbers.agent_id)
+            .order_by(AgentPhoneNumbers.id)
+            .all()
+        )
+        expected: Dict[str, int] = {}
+        duplicates: List[str] = []
+        for phone_number, agent_id in rows:
+            normalized = normalize_phone_number(phone_number)
+            if not normalized:
+                continue
+            if normalized in expected:
+                duplicates.append(normalized)
+                continue
+            expected[normalized] = agent_id
+        routes = dict(self._routes)
+        missing = sorted(n for n in expected if n not in routes)
+        extra = sorted(n for n in routes if n not in expected)
+        mismatched = sorted(
+            n for n, agent_id in expected.items() if n in routes and routes[n].id != agent_id
+        )
+        return {
+            "consistent": not (missing or extra or mismatched),
+            "loaded": self.loaded,
+            "table_size": len(routes),
+            "db_size": len(expected),
+            "missing": missing,
+            "extra": extra,
+            "mismatched": mismatched,
+            "duplicates": sorted(set(duplicates)),
+        }
+
+
+phone_routing_table = PhoneRoutingTable(SessionLocal, refresh_seconds=settings.PHONE_ROUTING_REFRESH_SECONDS)
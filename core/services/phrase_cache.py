@@ -0,0 +1,271 @@
+"""Shared cache of short recurring TTS phrases ("One moment please.", "Sure!") per voice.
+
+AgentFactoryService.get_tts_for_agent builds the agent's TTS class with PhraseCachedTTS
+mixed in. The service still aggregates LLM text into sentences as usual; each sentence
+is normalized and looked up before it reaches the provider:
+
+- hit: the cached PCM is emitted as TTS audio frames, no provider round-trip;
+- miss: the sentence goes to the provider. A phrase missed min_repeats times is
+  rendered once in the background (a separate short pipeline with the same voice)
+  so later calls, in any worker sharing the cache directory, hit.
+
+Only sentences that open a turn are served from the cache. Streaming (websocket)
+providers deliver audio asynchronously, so once a sentence of the turn has gone to the
+provider, cached audio for a later sentence could overtake it; those go to the provider.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from core.config import settings
+from core.services.agent_runtime_cache import ProviderSpec
+from core.services.audio_cache import AudioFormat, MmapAudioCache, audio_cache_key
+from core.services.provider_registry import provider_registry
+
+_SPACES = re.compile(r"\s+")
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+
+# Frames per cached phrase; the output transport re-chunks anyway
+_CHUNK_MS = 100
+
+
+def normalize_phrase(text: str, max_chars: int) -> Optional[str]:
+    """Lookup form of a sentence (NFKC, straight quotes, single spaces, casefolded), or None if too long."""
+    phrase = _SPACES.sub(" ", unicodedata.normalize("NFKC", text).translate(_QUOTES)).strip()
+    if not phrase or len(phrase) > max_chars:
+        return None
+    return phrase.casefold()
+
+
+class AgentPhraseStats:
+    __slots__ = ("lookups", "hits", "misses", "bypassed", "audio_seconds_served")
+
+    def __init__(self):
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.audio_seconds_served = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else None,
+            "audio_seconds_served": round(self.audio_seconds_served, 1),
+        }
+
+
+class PhraseCache:
+    """Phrase audio (16-bit PCM at the pipeline's output rate) keyed by phrase, voice and format.
+
+    Misses are counted per key in a bounded LRU; the min_repeats-th miss of a phrase
+    schedules its render on a single background thread. Hit rates are kept per agent.
+    """
+
+    def __init__(
+        self,
+        cache: MmapAudioCache,
+        max_chars: int = 80,
+        min_repeats: int = 2,
+        max_tracked_phrases: int = 20000,
+        render_timeout_seconds: float = 30.0,
+    ):
+        self.cache = cache
+        self.max_chars = max_chars
+        self.min_repeats = min_repeats
+        self.max_tracked_phrases = max_tracked_phrases
+        self.render_timeout_seconds = render_timeout_seconds
+        self._lock = threading.Lock()
+        self._miss_counts: "OrderedDict[str, int]" = OrderedDict()
+        self._pending: set = set()
+        self._agents: Dict[Optional[int], AgentPhraseStats] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="phrase-audio")
+        self.rendered = 0
+        self.render_failures = 0
+
+    def _agent(self, agent_id: Optional[int]) -> AgentPhraseStats:
+        stats = self._agents.get(agent_id)
+        if stats is None:
+            with self._lock:
+                stats = self._agents.setdefault(agent_id, AgentPhraseStats())
+        return stats
+
+    def key(self, phrase: str, provider_spec: ProviderSpec, voice: Dict[str, Any], sample_rate: int) -> str:
+        return audio_cache_key(phrase, provider_spec.provider_name, voice, AudioFormat("pcm_s16le", sample_rate))
+
+    def lookup(self, agent_id: Optional[int], key: str) -> Optional[Any]:
+        """Cached PCM (bytes or a read-only mmap) for key, counted against the agent."""
+        stats = self._agent(agent_id)
+        stats.lookups += 1
+        audio = self.cache.get(key)
+        if audio is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return audio
+
+    def record_bypass(self, agent_id: Optional[int]) -> None:
+        """A cacheable sentence went to the provider because it did not open the turn."""
+        self._agent(agent_id).bypassed += 1
+
+    def record_served(self, agent_id: Optional[int], seconds: float) -> None:
+        self._agent(agent_id).audio_seconds_served += seconds
+
+    def note_miss(self, key: str, text: str, provider_spec: ProviderSpec, sample_rate: int) -> None:
+        with self._lock:
+            count = self._miss_counts.pop(key, 0) + 1
+            self._miss_counts[key] = count
+            while len(self._miss_counts) > self.max_tracked_phrases:
+                self._miss_counts.popitem(last=False)
+            if count < self.min_repeats or key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._render_in_thread, key, text, provider_spec, sample_rate)
+
+    def _render_in_thread(self, key: str, text: str, provider_spec: ProviderSpec, sample_rate: int) -> None:
+        from core.services.message_audio import synthesize
+
+        try:
+            tts = provider_registry.build(provider_spec)
+            if tts is None:
+                return
+            fmt = AudioFormat("pcm_s16le", sample_rate)
+            audio = asyncio.run(synthesize(tts, text, fmt, self.render_timeout_seconds))
+            self.cache.put(key, audio)
+            self.rendered += 1
+            with self._lock:
+                self._miss_counts.pop(key, None)
+        except Exception as e:
+            self.render_failures += 1
+            logger.warning(f"Rendering phrase {text!r} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def agent_stats(self, agent_id: Optional[int]) -> Dict[str, Any]:
+        return self._agent(agent_id).as_dict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agents = {str(agent_id): s.as_dict() for agent_id, s in self._agents.items()}
+            pending = len(self._pending)
+        lookups = sum(a["lookups"] for a in agents.values())
+        hits = sum(a["hits"] for a in agents.values())
+        return {
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "rendered": self.rendered,
+            "render_failures": self.render_failures,
+            "pending_renders": pending,
+            "cache": self.cache.stats(),
+            "agents": agents,
+        }
+
+
+class PhraseCachedTTS:
+    """Mixin for a TTS service class; see the module docstring. Inactive until enable_phrase_cache()."""
+
+    _phrase_cache: Optional[PhraseCache] = None
+    _phrase_agent_id: Optional[int] = None
+    _phrase_provider: Optional[ProviderSpec] = None
+    _phrase_voice: Optional[Dict[str, Any]] = None
+    _phrase_turn_open = True
+
+    def enable_phrase_cache(self, cache: PhraseCache, agent_id: Optional[int], provider_spec: ProviderSpec) -> None:
+        self._phrase_cache = cache
+        self._phrase_agent_id = agent_id
+        self._phrase_provider = provider_spec
+        self._phrase_voice = provider_registry.voice_params(provider_spec)
+
+    async def process_frame(self, frame: Any, direction: Any):
+        if isinstance(frame, _turn_start_frames()):
+            self._phrase_turn_open = True
+        await super().process_frame(frame, direction)
+
+    async def run_tts(self, text: str, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        cache = self._phrase_cache
+        phrase = normalize_phrase(text, cache.max_chars) if cache and self._phrase_voice is not None else None
+        if phrase is None:
+            self._phrase_turn_open = False
+            async for frame in super().run_tts(text, *args, **kwargs):
+                yield frame
+            return
+
+        sample_rate = self.sample_rate
+        key = cache.key(phrase, self._phrase_provider, self._phrase_voice, sample_rate)
+        if not self._phrase_turn_open:
+            cache.record_bypass(self._phrase_agent_id)
+            audio = None
+        else:
+            audio = cache.lookup(self._phrase_agent_id, key)
+        if audio is None:
+            if self._phrase_turn_open:
+                cache.note_miss(key, text.strip(), self._phrase_provider, sample_rate)
+            self._phrase_turn_open = False
+            async for frame in super().run_tts(text, *args, **kwargs):
+                yield frame
+            return
+
+        context_id = args[0] if args else kwargs.get("context_id")
+        frames = _audio_frames(audio, sample_rate, context_id)
+        cache.record_served(self._phrase_agent_id, len(audio) / (2 * sample_rate))
+        await self.start_ttfb_metrics()
+        await self.stop_ttfb_metrics()
+        if not getattr(self, "_push_text_frames", True):
+            # Word-timestamp services derive text frames from provider responses; there is
+            # none here, so hand the sentence to the assistant context directly.
+            await self.push_frame(_tts_text_frame(text))
+        for frame in frames:
+            yield frame
+
+
+@lru_cache(maxsize=1)
+def _turn_start_frames() -> Tuple[type, ...]:
+    from pipecatfork.src.pipecat.frames import frames
+
+    names = ("LLMFullResponseStartFrame", "InterruptionFrame", "StartInterruptionFrame")
+    return tuple(getattr(frames, name) for name in names if hasattr(frames, name))
+
+
+def _tts_text_frame(text: str) -> Any:
+    from pipecatfork.src.pipecat.frames.frames import TTSTextFrame
+
+    return TTSTextFrame(text, aggregated_by="sentence")
+
+
+def _audio_frames(audio: Any, sample_rate: int, context_id: Optional[str]) -> List[Any]:
+    """TTS started / audio / stopped frames for cached PCM. Slices are copied eagerly, so the
+    frames stay valid after the mmap behind audio is dropped."""
+    from pipecatfork.src.pipecat.frames.frames import TTSAudioRawFrame, TTSStartedFrame, TTSStoppedFrame
+
+    chunk_bytes = sample_rate * 2 * _CHUNK_MS // 1000
+    frames: List[Any] = [TTSStartedFrame()]
+    for offset in range(0, len(audio), chunk_bytes):
+        frame = TTSAudioRawFrame(audio[offset:offset + chunk_bytes], sample_rate, 1)
+        if context_id is not None:
+            frame.context_id = context_id
+        frames.append(frame)
+    frames.append(TTSStoppedFrame())
+    return frames
+
+
+phrase_cache = PhraseCache(
+    MmapAudioCache(
+        os.path.join(settings.AUDIO_CACHE_DIR, "phrases"),
+        max_memory_bytes=settings.PHRASE_CACHE_MEMORY_MB * 1024 * 1024,
+        max_disk_bytes=settings.PHRASE_CACHE_DISK_MB * 1024 * 1024,
+    ),
+    max_chars=settings.PHRASE_CACHE_MAX_CHARS,
+    min_repeats=settings.PHRASE_CACHE_MIN_REPEATS,
+)
@@ -0,0 +1,305 @@
+"""Declarative registry of LLM, STT and TTS providers, imported lazily or preloaded at worker boot."""
+
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from core.models.models import Model
+from core.models.service_provider import ServiceProvider
+from core.services.agent_runtime_cache import ProviderSpec
+
+_SERVICES_PACKAGE = "pipecatfork.src.pipecat.services"
+
+DEFAULT_LLM_MODEL = "gpt-4o"
+DEFAULT_TTS_VOICE_ID = "71a7ad14-091c-4e8e-a314-022ece01c121"
+
+# Build kwargs that select credentials rather than behaviour
+_CREDENTIAL_KWARGS = frozenset({"api_key", "aws_access_key_id", "aws_secret_access_key", "credentials"})
+
+
+def _meta(spec: ProviderSpec, key: str) -> Any:
+    """Model meta_data wins over the agent config's per-service metadata."""
+    return spec.model_meta.get(key) or spec.metadata.get(key)
+
+
+def api_key_only(spec: ProviderSpec) -> Dict[str, Any]:
+    return {"api_key": spec.api_key}
+
+
+def with_model(spec: ProviderSpec) -> Dict[str, Any]:
+    return {"api_key": spec.api_key, "model": _meta(spec, "model") or DEFAULT_LLM_MODEL}
+
+
+def fixed_model(model: str) -> Callable[[ProviderSpec], Dict[str, Any]]:
+    def build(spec: ProviderSpec) -> Dict[str, Any]:
+        return {"api_key": spec.api_key, "model": model}
+
+    return build
+
+
+def with_config_model(spec: ProviderSpec) -> Dict[str, Any]:
+    """Agent config metadata wins over the model's meta_data (OpenRouter model slugs)."""
+    return {
+        "api_key": spec.api_key,
+        "model": spec.metadata.get("model") or spec.model_meta.get("model") or DEFAULT_LLM_MODEL,
+    }
+
+
+def with_voice(spec: ProviderSpec) -> Dict[str, Any]:
+    return {"api_key": spec.api_key, "voice_id": _meta(spec, "voice_id") or DEFAULT_TTS_VOICE_ID}
+
+
+def fake_latency(key: str, default_ms: float) -> Callable[[ProviderSpec], Dict[str, Any]]:
+    """Load-test fakes take no API key, only a latency (model meta_data, e.g. {"latency_ms": 300})."""
+
+    def build(spec: ProviderSpec) -> Dict[str, Any]:
+        return {key: float(_meta(spec, "latency_ms") or default_ms)}
+
+    return build
+
+
+def with_playht_voice(spec: ProviderSpec) -> Dict[str, Any]:
+    return {
+        "api_key": spec.api_key,
+        "user_id": _meta(spec, "user_id") or "",
+        "voice_url": _meta(spec, "voice_url") or "",
+    }
+
+
+@dataclass(frozen=True)
+class ProviderEntry:
+    """How to construct one provider: where its class lives and how to map a ProviderSpec to kwargs."""
+
+    service_type: str
+    name: str
+    module: str
+    class_name: str
+    build_kwargs: Callable[[ProviderSpec], Dict[str, Any]]
+    package: str = _SERVICES_PACKAGE
+
+    @property
+    def module_path(self) -> str:
+        return f"{self.package}.{self.module}"
+
+
+def _entries(service_type: str, table: Iterable[Tuple[str, str, str, Callable]]) -> List[ProviderEntry]:
+    return [ProviderEntry(service_type, name, module, cls, kwargs) for name, module, cls, kwargs in table]
+
+
+PROVIDERS: List[ProviderEntry] = [
+    *_entries("llm", [
+        ("openai", "openai.llm", "OpenAILLMService", fixed_model("gpt-4.1")),
+        ("anthropic", "anthropic.llm", "AnthropicLLMService", with_model),
+        ("groq", "groq.llm", "GroqLLMService", with_model),
+        ("openrouter", "openrouter.llm", "OpenRouterLLMService", with_config_model),
+        ("aws_bedrock", "aws.llm", "AWSBedrockLLMService", with_model),
+        ("aws_nova_sonic", "aws.llm", "AWSNovaSonicLLMService", with_model),
+        ("google", "google.llm", "GoogleLLMService", with_model),
+        ("gemini_live", "google.llm", "GeminiLiveLLMService", with_model),
+        ("grok_realtime", "grok.llm", "GrokRealtimeLLMService", with_model),
+        ("base_openai", "openai.llm", "BaseOpenAILLMService", with_model),
+        ("openai_realtime", "openai.llm", "OpenAIRealtimeLLMService", with_model),
+        ("openai_realtime_beta", "openai.llm", "OpenAIRealtimeBetaLLMService", with_model),
+        ("ultravox_realtime", "ultravox.llm", "UltravoxRealtimeLLMService", with_model),
+    ]),
+    *_entries("stt", [
+        ("deepgram", "deepgram.stt", "DeepgramSTTService", api_key_only),
+        ("openai", "openai.stt", "OpenAISTTService", api_key_only),
+        ("groq", "groq.stt", "GroqSTTService", api_key_only),
+        ("segmented", "segmented.stt", "SegmentedSTTService", api_key_only),
+        ("azure", "azure.stt", "AzureSTTService", api_key_only),
+        ("deepgram_sagemaker", "deepgram.stt", "DeepgramSageMakerSTTService", api_key_only),
+        ("google", "google.stt", "GoogleSTTService", api_key_only),
+        ("nvidia", "nvidia.stt", "NvidiaSTTService", api_key_only),
+        ("sarvam", "sarvam.stt", "SarvamSTTService", api_key_only),
+        ("speechmatics", "speechmatics.stt", "SpeechmaticsSTTService", api_key_only),
+    ]),
+    *_entries("tts", [
+        ("cartesia", "cartesia.tts", "CartesiaTTSService", with_voice),
+        ("openai", "openai.tts", "OpenAITTSService", api_key_only),
+        ("elevenlabs", "elevenlabs.tts", "ElevenLabsTTSService", with_voice),
+        ("playht", "playht.tts", "PlayHTTTSService", with_playht_voice),
+        ("word", "word.tts", "WordTTSService", with_voice),
+        ("asyncai_http", "asyncai.tts", "AsyncAIHttpTTSService", with_voice),
+        ("aws_polly", "aws.tts", "AWSPollyTTSService", with_voice),
+        ("camb", "camb.tts", "CambTTSService", with_voice),
+        ("cartesia_http", "cartesia.tts", "CartesiaHttpTTSService", with_voice),
+        ("deepgram_http", "deepgram.tts", "DeepgramHttpTTSService", with_voice),
+        ("google_http", "google.tts", "GoogleHttpTTSService", with_voice),
+        ("google_base", "google.tts", "GoogleBaseTTSService", with_voice),
+        ("groq", "groq.tts", "GroqTTSService", with_voice),
+        ("hathora", "hathora.tts", "HathoraTTSService", with_voice),
+        ("minimax_http", "minimax.tts", "MiniMaxHttpTTSService", with_voice),
+        ("neuphonic_http", "neuphonic.tts", "NeuphonicHttpTTSService", with_voice),
+        ("nvidia", "nvidia.tts", "NvidiaTTSService", with_voice),
+        ("piper", "piper.tts", "PiperTTSService", with_voice),
+        ("playht_http", "playht.tts", "PlayHTHttpTTSService", with_playht_voice),
+        ("rime_http", "rime.tts", "RimeHttpTTSService", with_voice),
+        ("sarvam_http", "sarvam.tts", "SarvamHttpTTSService", with_voice),
+        ("speechmatics", "speechmatics.tts", "SpeechmaticsTTSService", with_voice),
+        ("xtts", "xtts.tts", "XTTSService", with_voice),
+    ]),
+    # Deterministic local fakes for load tests (core.loadtest)
+    ProviderEntry("llm", "fake", "fake_services", "FakeLLMService", fake_latency("ttft_ms", 350), "core.loadtest"),
+    ProviderEntry("stt", "fake", "fake_services", "FakeSTTService", fake_latency("latency_ms", 150), "core.loadtest"),
+    ProviderEntry("tts", "fake", "fake_services", "FakeTTSService", fake_latency("ttfb_ms", 120), "core.loadtest"),
+]
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """Outcome of the first import of a provider class in this process."""
+
+    service_type: str
+    name: str
+    module: str
+    seconds: float
+    ok: bool
+    error: Optional[str] = None
+
+
+class ProviderRegistry:
+    """Resolves (service_type, provider_name) to a provider class and builds instances from a ProviderSpec.
+
+    Classes are imported on first use and cached for the life of the process; preload()
+    moves that cost to worker boot. Import times are recorded per provider. Modules shared
+    by several providers (e.g. openai.llm) are only timed for the first one that loads them.
+    """
+
+    def __init__(self, entries: Iterable[ProviderEntry]):
+        self._entries: Dict[Tuple[str, str], ProviderEntry] = {(e.service_type, e.name): e for e in entries}
+        self._lock = threading.Lock()
+        self._classes: Dict[Tuple[str, str], Optional[type]] = {}
+        self._imports: Dict[Tuple[str, str], ImportRecord] = {}
+        self._mixed: Dict[Tuple[type, type], type] = {}
+
+    def entry(self, service_type: str, provider_name: str) -> Optional[ProviderEntry]:
+        return self._entries.get((service_type, provider_name))
+
+    def names(self, service_type: str) -> List[str]:
+        return sorted(name for st, name in self._entries if st == service_type)
+
+    def resolve_class(self, service_type: str, provider_name: str) -> Optional[type]:
+        """Return the provider class, importing it once. None if unknown or not installed."""
+        key = (service_type, provider_name)
+        if key in self._classes:
+            return self._classes[key]
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        with self._lock:
+            if key not in self._classes:
+                self._classes[key] = self._import(entry)
+        return self._classes[key]
+
+    def _import(self, entry: ProviderEntry) -> Optional[type]:
+        start = time.perf_counter()
+        try:
+            cls = getattr(importlib.import_module(entry.module_path), entry.class_name)
+            error = None
+        except (ImportError, AttributeError) as e:
+            cls = None
+            error = str(e)
+        seconds = time.perf_counter() - start
+        self._imports[(entry.service_type, entry.name)] = ImportRecord(
+            service_type=entry.service_type,
+            name=entry.name,
+            module=entry.module_path,
+            seconds=seconds,
+            ok=cls is not None,
+            error=error,
+        )
+        if cls is None:
+            logger.warning(f"{entry.service_type.upper()} provider {entry.name} not available: {error}")
+        else:
+            logger.info(f"Imported {entry.service_type} provider {entry.name} in {seconds * 1000:.1f} ms")
+        return cls
+
+    def build(self, spec: ProviderSpec, mixin: Optional[type] = None) -> Optional[Any]:
+        """Instantiate the provider described by spec, or None if unsupported or not installed.
+
+        With mixin, the instance is of a subclass of (mixin, provider class), created once per pair.
+        """
+        entry = self._entries.get((spec.service_type, spec.provider_name))
+        if entry is None:
+            logger.warning(f"Unsupported {spec.service_type.upper()} provider: {spec.provider_name}")
+            return None
+        cls = self.resolve_class(spec.service_type, spec.provider_name)
+        if cls is None:
+            return None
+        if mixin is not None:
+            cls = self._with_mixin(cls, mixin)
+        return cls(**entry.build_kwargs(spec))
+
+    def _with_mixin(self, cls: type, mixin: type) -> type:
+        key = (cls, mixin)
+        mixed = self._mixed.get(key)
+        if mixed is None:
+            with self._lock:
+                mixed = self._mixed.get(key)
+                if mixed is None:
+                    # Keep the provider's name: processor names, logs and metrics stay the same
+                    mixed = type(cls.__name__, (mixin, cls), {"__module__": cls.__module__})
+                    self._mixed[key] = mixed
+        return mixed
+
+    def voice_params(self, spec: ProviderSpec) -> Optional[Dict[str, Any]]:
+        """The provider's constructor kwargs without credentials: what the output depends on."""
+        entry = self._entries.get((spec.service_type, spec.provider_name))
+        if entry is None:
+            return None
+        return {k: v for k, v in entry.build_kwargs(spec).items() if k not in _CREDENTIAL_KWARGS}
+
+    def preload(self, providers: Iterable[Tuple[str, str]]) -> List[ImportRecord]:
+        """Import the given (service_type, provider_name) pairs now; unknown names are skipped."""
+        for service_type, provider_name in providers:
+            self.resolve_class(service_type, provider_name)
+        return self.import_report()
+
+    def configured_providers(self, db: Session) -> List[Tuple[str, str]]:
+        """(service_type, provider_name) pairs that have at least one active model."""
+        rows = (
+            db.query(Model.service_type, ServiceProvider.name)
+            .join(ServiceProvider, ServiceProvider.id == Model.service_provider_id)
+            .filter(Model.status == "active", Model.service_type.isnot(None))
+            .distinct()
+            .all()
+        )
+        return sorted(
+            {((service_type or "").strip().lower(), (name or "").strip().lower()) for service_type, name in rows}
+        )
+
+    def preload_configured(self, db: Session) -> List[ImportRecord]:
+        """Import every provider that an active model in the DB points at; called at worker boot."""
+        report = self.preload(self.configured_providers(db))
+        total = sum(r.seconds for r in report)
+        logger.info(f"Preloaded {len(report)} providers in {total * 1000:.0f} ms")
+        for record in report:
+            status = "ok" if record.ok else f"failed: {record.error}"
+            logger.info(f"  {record.service_type}/{record.name}: {record.seconds * 1000:.1f} ms ({status})")
+        return report
+
+    def import_report(self) -> List[ImportRecord]:
+        """Per-provider import times recorded so far, slowest first."""
+        return sorted(self._imports.values(), key=lambda r: r.seconds, reverse=True)
+
+    def import_summary(self) -> List[Mapping[str, Any]]:
+        return [
+            {
+                "service_type": r.service_type,
+                "provider": r.name,
+                "module": r.module,
+                "import_ms": round(r.seconds * 1000, 1),
+                "ok": r.ok,
+                "error": r.error,
+            }
+            for r in self.import_report()
+        ]
+
+
+provider_registry = ProviderRegistry(PROVIDERS)
@@ -1,13 +1,15 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import uuid as uuid_lib
 import time
 
 from fastapi import HTTPException, status
 
 from core.services.base import BaseService
+from core.services.agent_runtime_cache import agent_runtime_cache
 from core.models.service_provider import ServiceProvider
 from core.models.models import Model
+from core.utils.pagination import ListParams, apply_filters, apply_keyset, paginate
 
 
 class ServiceProviderService(BaseService):
@@ -65,6 +67,7 @@ class ServiceProviderService(BaseService):
                 existing.status = provider_status
             self.db.commit()
             self.db.refresh(existing)
+            agent_runtime_cache.invalidate_service_providers((existing.id,))
             provider = existing
         else:
             if self._exists_same_name_and_provider_type(name, provider_type):
@@ -116,43 +119,30 @@ class ServiceProviderService(BaseService):
             "updated_at": provider.updated_at
         }
 
-    def get_all_service_providers(self, provider_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        query = (
-            self.db.query(ServiceProvider, Model)
-            .outerjoin(Model, Model.service_provider_id == ServiceProvider.id)
-            .filter(ServiceProvider.status == "active")
-        )
-
+    def get_all_service_providers(
+        self, provider_type: Optional[str] = None, params: Optional[ListParams] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        params = params or ListParams()
+        query = self.db.query(ServiceProvider)
+        if params.status is None:
+            query = query.filter(ServiceProvider.status == "active")
         if provider_type:
             query = query.filter(ServiceProvider.provider_type == provider_type)
-
-        rows = query.order_by(ServiceProvider.id, Model.id).all()
-
-        # Group by provider, collect models
-        by_id: Dict[int, Dict[str, Any]] = {}
-        for sp, m in rows:
-            if sp.id not in by_id:
-                by_id[sp.id] = {
-                    "id": sp.id,
-                    "uuid": str(sp.uuid),
-                    "name": sp.name,
-                    "display_name": sp.display_name,
-                    "description": sp.description,
-                    "provider_type": sp.provider_type,
-                    "logo_url": sp.logo_url,
-                    "website_url": sp.website_url,
-                    "documentation_url": sp.documentation_url,
-                    "base_url": sp.base_url,
-                    "auth_type": sp.auth_type,
-                    "supports_streaming": sp.supports_streaming,
-                    "config_schema": sp.config_schema,
-                    "is_system": sp.is_system,
-                    "status": sp.status,
-                    "created_at": sp.created_at,
-                    "models": [],
-                }
-            if m is not None:
-                by_id[sp.id]["models"].append({
+        query = apply_filters(query, params, {"status": ServiceProvider.status})
+
+        # Page over providers first, then load their models in one batch, so the
+        # page size counts providers rather than provider x model rows.
+        providers = apply_keyset(query, ServiceProvider.id, params).all()
+        models_by_provider: Dict[int, List[Dict[str, Any]]] = {sp.id: [] for sp in providers}
+        if providers and (params.fields is None or "models" in params.fields):
+            models = (
+                self.db.query(Model)
+                .filter(Model.service_provider_id.in_(list(models_by_provider)))
+                .order_by(Model.id)
+                .all()
+            )
+            for m in models:
+                models_by_provider[m.service_provider_id].append({
                     "id": m.id,
                     "service_provider_id": m.service_provider_id,
                     "name": m.name,
@@ -161,7 +151,28 @@ class ServiceProviderService(BaseService):
                     "updated_at": m.updated_at,
                 })
 
-        return list(by_id.values())
+        return paginate([
+            {
+                "id": sp.id,
+                "uuid": str(sp.uuid),
+                "name": sp.name,
+                "display_name": sp.display_name,
+                "description": sp.description,
+                "provider_type": sp.provider_type,
+                "logo_url": sp.logo_url,
+                "website_url": sp.website_url,
+                "documentation_url": sp.documentation_url,
+                "base_url": sp.base_url,
+                "auth_type": sp.auth_type,
+                "supports_streaming": sp.supports_streaming,
+                "config_schema": sp.config_schema,
+                "is_system": sp.is_system,
+                "status": sp.status,
+                "created_at": sp.created_at,
+                "models": models_by_provider[sp.id],
+            }
+            for sp in providers
+        ], params)
 
     def get_service_provider(self, provider_id: int) -> Dict[str, Any]:
         provider = self.db.query(ServiceProvider).filter(ServiceProvider.id == provider_id).first()
@@ -209,5 +220,6 @@ class ServiceProviderService(BaseService):
 
         self.db.delete(provider)
         self.db.commit()
+        agent_runtime_cache.invalidate_service_providers((provider_id,))
 
         return {"message": "Service provider deleted successfully"}
@@ -0,0 +1,149 @@
+"""Shared, connection-pooled client for telephony provider REST lookups (Twilio Calls API)."""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from core.config import settings
+
+
+class TelephonyClient:
+    """One pooled aiohttp session per process plus a short-TTL call metadata cache.
+
+    Concurrent lookups for the same call SID share a single in-flight request, so the
+    bot runner resolving the 'to' number and bot() logging the caller cost one round-trip.
+    Cached entries only need to outlive call setup, and 'status' goes stale as the call
+    progresses, so the TTL is kept short (TELEPHONY_CALL_INFO_TTL_SECONDS).
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        cache_ttl_seconds: float = 30.0,
+        total_timeout_seconds: float = 5.0,
+        connect_timeout_seconds: float = 2.0,
+        pool_size: int = 100,
+        max_cached_calls: int = 10000,
+    ):
+        self.base_url = (base_url or os.getenv("TWILIO_API_BASE_URL", "https://api.twilio.com")).rstrip("/")
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout_seconds, connect=connect_timeout_seconds)
+        self.pool_size = pool_size
+        self.max_cached_calls = max_cached_calls
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._call_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._session_loop = loop
+            # Lookups started on a previous loop can't be awaited from this one
+            self._inflight = {sid: task for sid, task in self._inflight.items() if task.get_loop() is loop}
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def _cached(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        entry = self._call_cache.get(call_sid)
+        if entry is None:
+            return None
+        expires_at, info = entry
+        if expires_at <= time.monotonic():
+            self._call_cache.pop(call_sid, None)
+            return None
+        return info
+
+    async def get_call_info(self, call_sid: str) -> Dict[str, Any]:
+        """Return {'from_number', 'to_number', 'status'} for a Twilio call SID, or {} on failure."""
+        if not call_sid:
+            return {}
+        info = self._cached(call_sid)
+        if info is not None:
+            return info
+        # Creates the session (and drops other loops' lookups) before this one is registered
+        self._get_session()
+        task = self._inflight.get(call_sid)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_call_info(call_sid))
+            self._inflight[call_sid] = task
+            task.add_done_callback(lambda done: self._forget(call_sid, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, call_sid: str, task: asyncio.Task) -> None:
+        if self._inflight.get(call_sid) is task:
+            del self._inflight[call_sid]
+
+    async def _fetch_call_info(self, call_sid: str) -> Dict[str, Any]:
+        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        if not account_sid or not auth_token:
+            logger.warning("Missing Twilio credentials, cannot fetch call info")
+            return {}
+
+        url = f"{self.base_url}/2010-04-01/Accounts/{account_sid}/Calls/{call_sid}.json"
+        try:
+            session = self._get_session()
+            async with session.get(url, auth=aiohttp.BasicAuth(account_sid, auth_token)) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Twilio API error ({response.status}): {error_text}")
+                    return {}
+                data = await response.json()
+        except Exception as e:
+            logger.error(f"Error fetching call info from Twilio: {e}")
+            return {}
+
+        info = {
+            "from_number": data.get("from"),
+            "to_number": data.get("to"),
+            "status": data.get("status"),
+        }
+        self._store(call_sid, info)
+        return info
+
+    async def update_call(self, call_sid: str, twiml: str) -> bool:
+        """Replace the TwiML of a live call (e.g. to play a busy message and hang up)."""
+        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        if not call_sid or not account_sid or not auth_token:
+            logger.warning("Missing call SID or Twilio credentials, cannot update call")
+            return False
+
+        url = f"{self.base_url}/2010-04-01/Accounts/{account_sid}/Calls/{call_sid}.json"
+        try:
+            session = self._get_session()
+            async with session.post(
+                url, data={"Twiml": twiml}, auth=aiohttp.BasicAuth(account_sid, auth_token)
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Twilio API error ({response.status}): {error_text}")
+                    return False
+        except Exception as e:
+            logger.error(f"Error updating Twilio call {call_sid}: {e}")
+            return False
+        return True
+
+    def _store(self, call_sid: str, info: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        if len(self._call_cache) >= self.max_cached_calls:
+            for sid in [sid for sid, (expires_at, _) in self._call_cache.items() if expires_at <= now]:
+                del self._call_cache[sid]
+            while len(self._call_cache) >= self.max_cached_calls:
+                del self._call_cache[next(iter(self._call_cache))]
+        self._call_cache[call_sid] = (now + self.cache_ttl_seconds, info)
+
+
+telephony_client = TelephonyClient(cache_ttl_seconds=settings.TELEPHONY_CALL_INFO_TTL_SECONDS)
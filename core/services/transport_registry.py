@@ -0,0 +1,177 @@
+"""Registry of bot transport plug-ins (core.transports), imported on first use or preloaded at worker boot."""
+
+import importlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+from loguru import logger
+
+_TRANSPORTS_PACKAGE = "core.transports"
+
+
+@dataclass
+class BotTransport:
+    """A transport built for one session, plus what bot() needs to admit and record a telephony call."""
+
+    transport: Any
+    transport_type: Optional[str] = None
+    call_data: Dict[str, Any] = field(default_factory=dict)
+    call_info: Dict[str, Any] = field(default_factory=dict)
+    agent: Any = None
+
+
+@dataclass(frozen=True)
+class TransportEntry:
+    """One transport plug-in: the runner-argument type it serves and the module that builds it.
+
+    The module exposes ``async def create_transport(runner_args) -> BotTransport``.
+    """
+
+    name: str
+    runner_args_type: str
+    module: str
+    package: str = _TRANSPORTS_PACKAGE
+
+    @property
+    def module_path(self) -> str:
+        return f"{self.package}.{self.module}"
+
+
+# Matched by class name, so runner arguments from pipecat.runner and the pipecatfork copy both resolve
+TRANSPORTS: List[TransportEntry] = [
+    TransportEntry("twilio", "WebSocketRunnerArguments", "twilio"),
+    TransportEntry("webrtc", "SmallWebRTCRunnerArguments", "small_webrtc"),
+    TransportEntry("daily", "DailyRunnerArguments", "daily"),
+]
+
+
+@dataclass(frozen=True)
+class TransportImportRecord:
+    """Cost of the first import of a transport plug-in in this process."""
+
+    name: str
+    module: str
+    seconds: float
+    rss_delta_mb: Optional[float]
+    ok: bool
+    error: Optional[str] = None
+
+
+def _rss_mb() -> Optional[float]:
+    """Resident set size of this process, from /proc (Linux); None elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class TransportRegistry:
+    """Resolves runner arguments to a transport plug-in, importing each plug-in once per process.
+
+    A worker that only takes Twilio calls never imports Daily or SmallWebRTC (nor needs
+    them installed). Import time and the RSS growth it caused are recorded per plug-in;
+    modules shared by several plug-ins are charged to the first one that loads them.
+    """
+
+    def __init__(self, entries: Iterable[TransportEntry]):
+        self._entries: Dict[str, TransportEntry] = {e.name: e for e in entries}
+        self._by_runner_args: Dict[str, TransportEntry] = {e.runner_args_type: e for e in self._entries.values()}
+        self._lock = threading.Lock()
+        self._factories: Dict[str, Optional[Callable[[Any], Awaitable[BotTransport]]]] = {}
+        self._imports: Dict[str, TransportImportRecord] = {}
+
+    def names(self) -> List[str]:
+        return sorted(self._entries)
+
+    def entry_for(self, runner_args: Any) -> Optional[TransportEntry]:
+        for cls in type(runner_args).__mro__:
+            entry = self._by_runner_args.get(cls.__name__)
+            if entry is not None:
+                return entry
+        return None
+
+    def resolve(self, name: str) -> Optional[Callable[[Any], Awaitable[BotTransport]]]:
+        """Return the plug-in's create_transport, importing it once. None if unknown or not installed."""
+        if name in self._factories:
+            return self._factories[name]
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        with self._lock:
+            if name not in self._factories:
+                self._factories[name] = self._import(entry)
+        return self._factories[name]
+
+    def _import(self, entry: TransportEntry) -> Optional[Callable[[Any], Awaitable[BotTransport]]]:
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            factory = getattr(importlib.import_module(entry.module_path), "create_transport")
+            error = None
+        except (ImportError, AttributeError) as e:
+            factory = None
+            error = str(e)
+        seconds = time.perf_counter() - start
+        rss_after = _rss_mb()
+        self._imports[entry.name] = TransportImportRecord(
+            name=entry.name,
+            module=entry.module_path,
+            seconds=seconds,
+            rss_delta_mb=rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            ok=factory is not None,
+            error=error,
+        )
+        if factory is None:
+            logger.warning(f"Transport {entry.name} not available: {error}")
+        else:
+            logger.info(f"Imported transport {entry.name} in {seconds * 1000:.1f} ms")
+        return factory
+
+    async def create(self, runner_args: Any) -> BotTransport:
+        entry = self.entry_for(runner_args)
+        if entry is None:
+            raise ValueError(f"Unsupported runner arguments type: {type(runner_args)}")
+        factory = self.resolve(entry.name)
+        if factory is None:
+            raise ValueError(f"Transport {entry.name} is not available in this worker")
+        return await factory(runner_args)
+
+    def preload(self, names: Iterable[str]) -> List[TransportImportRecord]:
+        """Import the named plug-ins now (worker boot); unknown names are logged and skipped."""
+        for name in names:
+            if name not in self._entries:
+                logger.warning(f"Unknown transport in preload list: {name}")
+                continue
+            self.resolve(name)
+        report = self.import_report()
+        for record in report:
+            status = "ok" if record.ok else f"failed: {record.error}"
+            rss = f", +{record.rss_delta_mb:.1f} MB RSS" if record.rss_delta_mb is not None else ""
+            logger.info(f"  transport {record.name}: {record.seconds * 1000:.1f} ms{rss} ({status})")
+        return report
+
+    def import_report(self) -> List[TransportImportRecord]:
+        """Per-transport import costs recorded so far, slowest first."""
+        return sorted(self._imports.values(), key=lambda r: r.seconds, reverse=True)
+
+    def import_summary(self) -> List[Mapping[str, Any]]:
+        return [
+            {
+                "transport": r.name,
+                "module": r.module,
+                "import_ms": round(r.seconds * 1000, 1),
+                "rss_delta_mb": round(r.rss_delta_mb, 1) if r.rss_delta_mb is not None else None,
+                "ok": r.ok,
+                "error": r.error,
+            }
+            for r in self.import_report()
+        ]
+
+
+transport_registry = TransportRegistry(TRANSPORTS)
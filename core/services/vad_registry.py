@@ -0,0 +1,75 @@
+"""Process-wide Silero VAD model shared by every call's VAD analyzer."""
+
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+from loguru import logger
+
+from pipecatfork.src.pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecatfork.src.pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+
+class _SharedSessionSileroModel(SileroOnnxModel):
+    """Per-call Silero state (RNN state, context window) over a shared ONNX InferenceSession."""
+
+    def __init__(self, session: Any):
+        self.session = session
+        self.sample_rates = [8000, 16000]
+        self.reset_states()
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """SileroVADAnalyzer that reuses the registry's ONNX session instead of loading the model."""
+
+    def __init__(self, *, session: Any, sample_rate: Optional[int] = None, params: Optional[VADParams] = None):
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = _SharedSessionSileroModel(session)
+        self._last_reset_time = 0
+
+
+class VADModelRegistry:
+    """Loads the Silero ONNX session once and hands out lightweight per-call analyzers.
+
+    ONNX Runtime sessions are safe to run concurrently, and all mutable VAD state lives
+    in the per-call model wrapper, so calls never share state, only weights.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session: Any = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
+
+    def load(self) -> Any:
+        """Load and warm up the model (idempotent). Call at worker startup."""
+        if self._session is not None:
+            return self._session
+        with self._lock:
+            if self._session is None:
+                start = time.perf_counter()
+                # Let pipecat resolve the bundled model file, then keep only its session.
+                session = SileroVADAnalyzer()._model.session
+                self._warm_up(session)
+                self._session = session
+                self.load_seconds = time.perf_counter() - start
+                logger.info(f"Loaded shared Silero VAD model in {self.load_seconds * 1000:.0f} ms")
+        return self._session
+
+    @staticmethod
+    def _warm_up(session: Any) -> None:
+        """Run one inference per supported sample rate so the first caller doesn't pay for it."""
+        for sample_rate, num_samples in ((16000, 512), (8000, 256)):
+            _SharedSessionSileroModel(session)(np.zeros(num_samples, dtype=np.float32), sample_rate)
+
+    def create_analyzer(
+        self, params: Optional[VADParams] = None, sample_rate: Optional[int] = None
+    ) -> SharedSileroVADAnalyzer:
+        return SharedSileroVADAnalyzer(session=self.load(), sample_rate=sample_rate, params=params)
+
+
+vad_registry = VADModelRegistry()
@@ -0,0 +1 @@
+"""Bot transport plug-ins, one module per runner-argument type; see core.services.transport_registry."""
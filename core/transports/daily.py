@@ -0,0 +1,21 @@
+"""Daily rooms (DailyRunnerArguments)."""
+
+from pipecatfork.src.pipecat.audio.vad.vad_analyzer import VADParams
+from pipecatfork.src.pipecat.transports.daily.transport import DailyParams, DailyTransport
+
+from core.services.transport_registry import BotTransport
+from core.services.vad_registry import vad_registry
+
+
+async def create_transport(runner_args) -> BotTransport:
+    transport = DailyTransport(
+        runner_args.room_url,
+        runner_args.token,
+        "Hotel Booking Bot",
+        DailyParams(
+            audio_in_enabled=True,
+            audio_out_enabled=True,
+            vad_analyzer=vad_registry.create_analyzer(params=VADParams(stop_secs=0.2)),
+        ),
+    )
+    return BotTransport(transport=transport)
@@ -0,0 +1,38 @@
+"""SmallWebRTC peer connections (SmallWebRTCRunnerArguments)."""
+
+import os
+
+from loguru import logger
+
+from pipecatfork.src.pipecat.transports.base_transport import TransportParams
+from pipecatfork.src.pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection
+from pipecatfork.src.pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
+
+from core.services.transport_registry import BotTransport
+from core.services.vad_registry import vad_registry
+
+
+async def create_transport(runner_args) -> BotTransport:
+    webrtc_connection: SmallWebRTCConnection = runner_args.webrtc_connection
+
+    try:
+        if os.environ.get("ENV") != "local":
+            from pipecat.audio.filters.krisp_filter import KrispFilter
+
+            krisp_filter = KrispFilter()
+        else:
+            krisp_filter = None
+    except Exception as e:
+        logger.error(f"Error creating Krisp filter: {e}")
+        krisp_filter = None
+
+    transport = SmallWebRTCTransport(
+        webrtc_connection=webrtc_connection,
+        params=TransportParams(
+            audio_in_enabled=True,
+            audio_in_filter=krisp_filter,
+            audio_out_enabled=True,
+            vad_analyzer=vad_registry.create_analyzer(),
+        ),
+    )
+    return BotTransport(transport=transport)
@@ -0,0 +1,65 @@
+"""Twilio Media Streams over the FastAPI websocket (WebSocketRunnerArguments)."""
+
+import os
+
+from loguru import logger
+
+from pipecat.runner.utils import parse_telephony_websocket
+from pipecatfork.src.pipecat.audio.vad.vad_analyzer import VADParams
+from pipecatfork.src.pipecat.serializers.twilio import TwilioFrameSerializer
+from pipecatfork.src.pipecat.transports.websocket.fastapi import (
+    FastAPIWebsocketParams,
+    FastAPIWebsocketTransport,
+)
+
+from core.services.audio_cache import TELEPHONY_FORMAT
+from core.services.telephony_client import telephony_client
+from core.services.transport_registry import BotTransport
+from core.services.vad_registry import vad_registry
+
+
+async def create_transport(runner_args) -> BotTransport:
+    body = getattr(runner_args, "body", None) or {}
+    call_data = body.get("call_data")
+    transport_type = body.get("transport_type")
+    agent = body.get("agent")
+
+    if call_data is None or transport_type is None:
+        _, call_data = await parse_telephony_websocket(runner_args.websocket)
+        transport_type = "twilio"
+        # run_bot reads both from the body (call metrics, pre-rendered greeting)
+        runner_args.body = {**body, "call_data": call_data, "transport_type": transport_type}
+
+    # Pooled and cached by call SID, shared with BotRunnerService's 'to' number lookup
+    call_info = await telephony_client.get_call_info(call_data.get("call_id", ""))
+    if call_info:
+        logger.info(f"Call from: {call_info.get('from_number')} to: {call_info.get('to_number')}")
+    if agent:
+        logger.info(f"Resolved agent for this call: id={agent.id} name={agent.name}")
+
+    serializer = TwilioFrameSerializer(
+        stream_sid=call_data["stream_id"],
+        call_sid=call_data["call_id"],
+        account_sid=os.getenv("TWILIO_ACCOUNT_SID"),
+        auth_token=os.getenv("TWILIO_AUTH_TOKEN"),
+    )
+
+    transport = FastAPIWebsocketTransport(
+        websocket=runner_args.websocket,
+        params=FastAPIWebsocketParams(
+            audio_in_enabled=True,
+            audio_out_enabled=True,
+            add_wav_header=False,
+            # Telephony rate, so pre-rendered 8 kHz greetings reach the serializer untouched
+            audio_out_sample_rate=TELEPHONY_FORMAT.sample_rate,
+            vad_analyzer=vad_registry.create_analyzer(params=VADParams(stop_secs=0.2)),
+            serializer=serializer,
+        ),
+    )
+    return BotTransport(
+        transport=transport,
+        transport_type=transport_type,
+        call_data=call_data,
+        call_info=call_info,
+        agent=agent,
+    )
@@ -0,0 +1,41 @@
+"""G.711 u-law codec and resampling for 16-bit mono PCM (numpy, no audioop)."""
+
+from functools import lru_cache
+
+import numpy as np
+
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 32635
+
+
+def ulaw_encode(pcm: np.ndarray) -> bytes:
+    """Encode 16-bit PCM samples to u-law bytes."""
+    samples = pcm.astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), _ULAW_CLIP) + _ULAW_BIAS
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+@lru_cache(maxsize=1)
+def _ulaw_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    magnitude = (((codes & 0x0F) << 3) + _ULAW_BIAS) << exponent
+    table = np.where(codes & 0x80, _ULAW_BIAS - magnitude, magnitude - _ULAW_BIAS).astype(np.int16)
+    table.flags.writeable = False
+    return table
+
+
+def ulaw_decode(data: bytes) -> np.ndarray:
+    """Decode u-law bytes to 16-bit PCM samples."""
+    return _ulaw_table()[np.frombuffer(data, dtype=np.uint8)]
+
+
+def resample(pcm: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Linear-interpolation resample; good enough for speech going to 8 kHz telephony."""
+    if from_rate == to_rate or len(pcm) == 0:
+        return pcm
+    positions = np.arange(0, len(pcm), from_rate / to_rate)
+    return np.interp(positions, np.arange(len(pcm)), pcm).astype(np.int16)
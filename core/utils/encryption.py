@@ -1,23 +1,47 @@
 import base64
-import os
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-from core.config import settings
+from core.config import secret_store, settings
+
+_SALT = b'tone_salt'
+_ITERATIONS = 100000
 
 
-def _get_fernet() -> Fernet:
-    key = settings.JWT_SECRET_KEY.encode()
-    salt = b'tone_salt'
+@lru_cache(maxsize=None)
+def _derive_key(secret: str) -> bytes:
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
-        salt=salt,
-        iterations=100000,
+        salt=_SALT,
+        iterations=_ITERATIONS,
     )
-    derived_key = base64.urlsafe_b64encode(kdf.derive(key))
-    return Fernet(derived_key)
+    return base64.urlsafe_b64encode(kdf.derive(secret.encode()))
+
+
+def _key_secrets() -> List[str]:
+    """Secrets in priority order: the current one encrypts, all of them decrypt."""
+    previous = [s.strip() for s in settings.ENCRYPTION_PREVIOUS_SECRETS.split(",") if s.strip()]
+    return [settings.JWT_SECRET_KEY] + [s for s in previous if s != settings.JWT_SECRET_KEY]
+
+
+@lru_cache(maxsize=1)
+def _get_fernet() -> MultiFernet:
+    return MultiFernet([Fernet(_derive_key(secret)) for secret in _key_secrets()])
+
+
+def reset_keys() -> None:
+    """Drop the derived keys, e.g. after the secrets in settings have been rotated."""
+    _get_fernet.cache_clear()
+    _derive_key.cache_clear()
+
+
+# Registered after Settings.reload, so the keys are re-derived from the refreshed values
+secret_store.on_change(reset_keys)
 
 
 def encrypt(data: str) -> str:
@@ -30,3 +54,23 @@ def decrypt(encrypted_data: str) -> str:
     fernet = _get_fernet()
     decrypted = fernet.decrypt(encrypted_data.encode())
     return decrypted.decode()
+
+
+def decrypt_many(encrypted_values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Decrypt several values with one key lookup; empty or undecryptable values map to None."""
+    fernet = _get_fernet()
+    result: List[Optional[str]] = []
+    for value in encrypted_values:
+        if not value:
+            result.append(None)
+            continue
+        try:
+            result.append(fernet.decrypt(value.encode()).decode())
+        except InvalidToken:
+            result.append(None)
+    return result
+
+
+def rotate(encrypted_data: str) -> str:
+    """Re-encrypt a value under the current key (it may have been written with a previous one)."""
+    return _get_fernet().rotate(encrypted_data.encode()).decode()
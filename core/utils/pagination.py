@@ -0,0 +1,135 @@
+"""Shared list contract: keyset pagination on id, server-side filters and field projection."""
+
+import base64
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+
+from fastapi import HTTPException, Query, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+FILTER_NAMES = ("status", "agent_type", "tags", "created_by")
+
+
+@dataclass(frozen=True)
+class ListParams:
+    """Pagination, filter and projection options of a list request.
+
+    Paging is opt-in: without limit or cursor, listings keep returning a plain
+    array so existing clients are unaffected.
+    """
+
+    limit: Optional[int] = None
+    cursor: Optional[int] = None
+    fields: Optional[FrozenSet[str]] = None
+    status: Optional[str] = None
+    agent_type: Optional[str] = None
+    tags: Tuple[str, ...] = ()
+    created_by: Optional[int] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+    @property
+    def page_size(self) -> int:
+        return self.limit or DEFAULT_PAGE_SIZE
+
+    def filter_values(self) -> Dict[str, Any]:
+        """Filters that were actually supplied."""
+        values = {name: getattr(self, name) for name in FILTER_NAMES}
+        return {name: value for name, value in values.items() if value not in (None, ())}
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def list_params(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables paged response"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    agent_type: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None, description="Only rows having all of these tags"),
+    created_by: Optional[int] = Query(None),
+) -> ListParams:
+    """FastAPI dependency parsing the shared list query parameters."""
+    projected = frozenset(f.strip() for f in fields.split(",") if f.strip()) if fields else None
+    return ListParams(
+        limit=limit,
+        cursor=decode_cursor(cursor) if cursor else None,
+        fields=projected or None,
+        status=status_filter,
+        agent_type=agent_type,
+        tags=tuple(tags or ()),
+        created_by=created_by,
+    )
+
+
+def apply_filters(query, params: ListParams, columns: Mapping[str, Any]):
+    """Apply supplied filters using the listing's filter -> column map.
+
+    tags uses JSONB containment (row must carry every requested tag). A filter the
+    listing does not support is rejected rather than silently ignored.
+    """
+    for name, value in params.filter_values().items():
+        column = columns.get(name)
+        if column is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Filter '{name}' is not supported for this listing",
+            )
+        if name == "tags":
+            query = query.filter(column.contains(list(value)))
+        else:
+            query = query.filter(column == value)
+    return query
+
+
+def apply_keyset(query, id_column, params: ListParams):
+    """Order by id and, when paging, start after the cursor and fetch one extra row to detect more."""
+    if params.cursor is not None:
+        query = query.filter(id_column > params.cursor)
+    query = query.order_by(id_column)
+    if params.paginated:
+        query = query.limit(params.page_size + 1)
+    return query
+
+
+def project(item: Dict[str, Any], fields: Optional[FrozenSet[str]], id_key: str = "id") -> Dict[str, Any]:
+    if not fields:
+        return item
+    return {k: v for k, v in item.items() if k in fields or k == id_key}
+
+
+def paginate(
+    items: List[Dict[str, Any]], params: ListParams, id_key: str = "id"
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Trim the look-ahead row, project fields and wrap as a page when paging was requested.
+
+    items must come from a query built with apply_keyset (ordered by id_key, limit page_size + 1).
+    """
+    next_cursor = None
+    if params.paginated and len(items) > params.page_size:
+        items = items[:params.page_size]
+        next_cursor = encode_cursor(items[-1][id_key])
+    items = [project(item, params.fields, id_key) for item in items]
+    if not params.paginated:
+        return items
+    return {"items": items, "next_cursor": next_cursor, "limit": params.page_size}
@@ -19,6 +19,8 @@ from ee.models.organization import Organization
 from ee.models.member import Member
 from ee.models.organization_invite import OrganizationInvite
 from ee.models.organization_access_request import OrganizationAccessRequest
+from ee.models.email_outbox import EmailOutbox
+from ee.models.token_revocation import TokenRevocation
 
 config = context.config
 
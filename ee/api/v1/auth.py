@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Header
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 from uuid import UUID
 
 from ee.database.session import get_ee_db
 from ee.services.auth_service import EEAuthService
-from ee.middleware.auth import get_ee_jwt_claims, EEJWTClaims
+from ee.middleware.auth import get_ee_jwt_claims, EEJWTClaims, ee_jwt_manager, security
 
 router = APIRouter()
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
-def signup(user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_ee_db)):
+async def signup(user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_ee_db)):
     email = user_data.get("email")
     password = user_data.get("password")
     username = user_data.get("username")
@@ -24,7 +25,7 @@ def signup(user_data: Dict[str, Any] = Body(...), db: Session = Depends(get_ee_d
             detail="Email and password are required"
         )
 
-    return EEAuthService(db).signup(email, password, username, profile, org_name)
+    return await EEAuthService(db).signup_async(email, password, username, profile, org_name)
 
 
 @router.get("/check_organization_exists")
@@ -74,7 +75,7 @@ def verify_user_email(
 
 
 @router.post("/login")
-def login(login_data: Dict[str, str] = Body(...), db: Session = Depends(get_ee_db)):
+async def login(login_data: Dict[str, str] = Body(...), db: Session = Depends(get_ee_db)):
     email = login_data.get("email")
     password = login_data.get("password")
 
@@ -84,7 +85,7 @@ def login(login_data: Dict[str, str] = Body(...), db: Session = Depends(get_ee_d
             detail="Email and password are required"
         )
 
-    return EEAuthService(db).login(email, password)
+    return await EEAuthService(db).login_async(email, password)
 
 
 @router.get("/forget-password")
@@ -93,13 +94,13 @@ def forget_password(email: str = Query(...), db: Session = Depends(get_ee_db)):
 
 
 @router.get("/acceptForgotPassword")
-def accept_forgot_password(
+async def accept_forgot_password(
     email: str = Query(...),
     password: str = Query(...),
     token: str = Query(...),
     db: Session = Depends(get_ee_db)
 ):
-    return EEAuthService(db).accept_forgot_password(email, password, token)
+    return await EEAuthService(db).accept_forgot_password_async(email, password, token)
 
 
 @router.post("/switch_organization")
@@ -117,3 +118,9 @@ def switch_organization(
         )
 
     return EEAuthService(db).switch_organization(claims.user_id, UUID(org_id))
+
+
+@router.post("/logout")
+def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    ee_jwt_manager.revoke_token(credentials.credentials)
+    return {"message": "Logged out successfully"}
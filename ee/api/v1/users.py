@@ -6,21 +6,24 @@ from uuid import UUID
 from ee.database.session import get_ee_db
 from ee.services.auth_service import EEAuthService
 from ee.middleware.auth import get_ee_current_user, require_ee_org_member, EEJWTClaims
+from core.utils.pagination import ListParams, list_params
 
 router = APIRouter()
 
 
 @router.get("/get_all_users_for_organization")
 def get_all_users_for_organization(
+    params: ListParams = Depends(list_params),
     claims: EEJWTClaims = Depends(require_ee_org_member),
     db: Session = Depends(get_ee_db)
 ):
-    return EEAuthService(db, org_id=UUID(claims.org_id)).get_all_users_for_organization(UUID(claims.org_id))
+    return EEAuthService(db, org_id=UUID(claims.org_id)).get_all_users_for_organization(UUID(claims.org_id), params=params)
 
 
 @router.get("/get_all_invited_users_for_organization")
 def get_all_invited_users_for_organization(
+    params: ListParams = Depends(list_params),
     claims: EEJWTClaims = Depends(require_ee_org_member),
     db: Session = Depends(get_ee_db)
 ):
-    return EEAuthService(db, org_id=UUID(claims.org_id)).get_all_invited_users_for_organization(UUID(claims.org_id))
+    return EEAuthService(db, org_id=UUID(claims.org_id)).get_all_invited_users_for_organization(UUID(claims.org_id), params=params)
@@ -12,6 +12,7 @@ class EESettings:
         self.JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
         self.JWT_ALGORITHM: str = "HS256"
         self.ACCESS_TOKEN_EXPIRE_HOURS: int = 24
+        self.JWT_REVOCATION_SYNC_SECONDS: float = float(os.getenv("JWT_REVOCATION_SYNC_SECONDS", "2"))
 
         self.ENVIRONMENT: str = os.getenv("ENV", "development")
         self.FIREBASE_PROJECT_ID: Optional[str] = os.getenv("FIREBASE_PROJECT_ID")
@@ -3,16 +3,22 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from typing import Optional, Dict, Any
 import time
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 
 from ee.config import ee_settings
+from core.middleware.token_cache import RevocationLog, verified_token_cache
+from ee.database.session import EESessionLocal
+from ee.models.token_revocation import TokenRevocation
 
 
 security = HTTPBearer()
 
 
 class EEJWTClaims(BaseModel):
+    # Instances are shared across requests through the verified token cache.
+    model_config = ConfigDict(frozen=True)
+
     user_id: int
     org_id: Optional[str] = None
     role: Optional[str] = None
@@ -36,6 +42,10 @@ class EEJWTManager:
         self.secret_key = ee_settings.JWT_SECRET_KEY
         self.algorithm = ee_settings.JWT_ALGORITHM
         self.access_token_expire_hours = ee_settings.ACCESS_TOKEN_EXPIRE_HOURS
+        self.cache_namespace = "ee"
+        self.revocations = RevocationLog(
+            self.cache_namespace, EESessionLocal, TokenRevocation, sync_seconds=ee_settings.JWT_REVOCATION_SYNC_SECONDS
+        )
 
     def create_access_token(
         self,
@@ -58,11 +68,26 @@ class EEJWTManager:
         return token
 
     def decode_token(self, token: str) -> EEJWTClaims:
+        self.revocations.sync()
+        claims = verified_token_cache.get(self.cache_namespace, token)
+        if claims is None:
+            claims = self._verify(token)
+            verified_token_cache.put(self.cache_namespace, token, claims)
+        if verified_token_cache.is_revoked(self.cache_namespace, token, claims):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        return claims
+
+    def _verify(self, token: str, verify_exp: bool = True) -> EEJWTClaims:
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(
+                token, self.secret_key, algorithms=[self.algorithm], options={"verify_exp": verify_exp}
+            )
 
             current_time = int(time.time())
-            if payload.get("exp", 0) < current_time:
+            if verify_exp and payload.get("exp", 0) < current_time:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token has expired"
@@ -85,6 +110,21 @@ class EEJWTManager:
         token = credentials.credentials
         return self.decode_token(token)
 
+    def revoke_token(self, token: str) -> None:
+        """Reject this token for the rest of its lifetime (logout).
+
+        Only the signature is checked: logging out again with a token that is already
+        revoked or expired is a no-op rather than a 401.
+        """
+        claims = self._verify(token, verify_exp=False)
+        if claims.exp < int(time.time()) or verified_token_cache.is_revoked(self.cache_namespace, token, claims):
+            return
+        self.revocations.revoke_token(token, claims.exp)
+
+    def revoke_user(self, user_id: int) -> None:
+        """Reject all tokens issued to the user so far (role change, removal from org)."""
+        self.revocations.revoke_user(user_id, self.access_token_expire_hours * 3600)
+
 
 ee_jwt_manager = EEJWTManager()
 
@@ -106,7 +146,7 @@ def get_ee_current_user(
     tenant_id: Optional[str] = Header(None, alias="tenant_id")
 ) -> EEJWTClaims:
     if tenant_id:
-        claims.org_id = tenant_id
+        claims = claims.model_copy(update={"org_id": tenant_id})
     return claims
 
 
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, BigInteger
+import time
+
+from ee.database.base import EEBase
+from core.models.email_outbox import EmailOutboxMixin
+
+
+class EmailOutbox(EmailOutboxMixin, EEBase):
+    __tablename__ = 'email_outbox'
+
+    id = Column(BigInteger, primary_key=True)
+    created_at = Column(BigInteger, nullable=False, default=lambda: int(time.time()))
+    updated_at = Column(BigInteger, nullable=False, default=lambda: int(time.time()))
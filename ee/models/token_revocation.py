@@ -0,0 +1,13 @@
+from sqlalchemy import Column, BigInteger
+import time
+
+from ee.database.base import EEBase
+from core.models.token_revocation import TokenRevocationMixin
+
+
+class TokenRevocation(TokenRevocationMixin, EEBase):
+    __tablename__ = 'token_revocations'
+
+    id = Column(BigInteger, primary_key=True)
+    created_at = Column(BigInteger, nullable=False, default=lambda: int(time.time()))
+    updated_at = Column(BigInteger, nullable=False, default=lambda: int(time.time()))
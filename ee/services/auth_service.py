@@ -1,13 +1,16 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from typing import List, Optional, Dict, Any
+from dataclasses import replace
+from typing import List, Optional, Dict, Any, Union
 from uuid import UUID
 import time
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from core.models.enums import UserStatus, Role, InviteStatus, AuthProvider, AccessRequestStatus, OrganizationStatus
-from core.utils.security import hash_password, verify_password, generate_verification_code, generate_token
+from core.utils.security import hash_password, verify_password, generate_verification_code, generate_token, password_hasher
 from core.services.email_service import MailService
+from core.utils.pagination import ListParams, apply_filters, apply_keyset, paginate
 
 from ee.models.user import User
 from ee.models.email_verification import EmailVerification
@@ -16,6 +19,7 @@ from ee.models.organization import Organization
 from ee.models.member import Member
 from ee.models.organization_invite import OrganizationInvite
 from ee.models.organization_access_request import OrganizationAccessRequest
+from ee.models.email_outbox import EmailOutbox
 from ee.config import ee_settings
 from ee.middleware.auth import ee_jwt_manager
 
@@ -31,10 +35,8 @@ class EEAuthService:
         slug = ''.join(c for c in slug if c.isalnum() or c == '-')
         return slug[:50]
 
-    def signup(self, email: str, password: str, username: Optional[str] = None,
-               profile: Optional[Dict] = None, org_name: Optional[str] = None) -> Dict[str, Any]:
-        current_time = int(time.time())
-
+    def validate_signup(self, email: str, username: Optional[str] = None) -> None:
+        """Raise 400 when the email or username is taken."""
         existing_user = self.db.query(User).filter(User.email == email).first()
         if existing_user:
             raise HTTPException(
@@ -50,7 +52,23 @@ class EEAuthService:
                     detail="Username already taken"
                 )
 
-        password_hash = hash_password(password)
+    async def signup_async(self, email: str, password: str, username: Optional[str] = None,
+                           profile: Optional[Dict] = None, org_name: Optional[str] = None) -> Dict[str, Any]:
+        """signup() for async routes: the duplicate checks run before bcrypt, so a taken email costs no hash."""
+        await run_in_threadpool(self.validate_signup, email, username)
+        password_hash = await password_hasher.hash_async(password)
+        return await run_in_threadpool(
+            self.signup, email, password, username, profile, org_name, password_hash=password_hash
+        )
+
+    def signup(self, email: str, password: str, username: Optional[str] = None,
+               profile: Optional[Dict] = None, org_name: Optional[str] = None,
+               password_hash: Optional[str] = None) -> Dict[str, Any]:
+        current_time = int(time.time())
+
+        self.validate_signup(email, username)
+
+        password_hash = password_hash or hash_password(password)
 
         user_profile = profile or {}
         if org_name:
@@ -74,8 +92,8 @@ class EEAuthService:
         verification = self.create_email_verification(user.id, email)
         verification_url = f"{ee_settings.APPLICATION_URL}/auth/verify_signup?email={email}&code={verification.code}&user_id={user.id}"
 
-        mail_service = MailService()
-        mail_service.send_signup_email(email, verification_url, username or email.split('@')[0])
+        MailService(self.db, outbox_model=EmailOutbox).send_signup_email(email, verification_url, username or email.split('@')[0])
+        self.db.commit()
 
         return {
             "user_id": user.id,
@@ -152,7 +170,7 @@ class EEAuthService:
         )
 
         self.db.add(verification)
-        self.db.commit()
+        self.db.flush()
 
         return verification
 
@@ -173,8 +191,8 @@ class EEAuthService:
         verification = self.create_email_verification(user.id, email)
         verification_url = f"{ee_settings.APPLICATION_URL}/auth/verify_signup?email={email}&code={verification.code}&user_id={user.id}"
 
-        mail_service = MailService()
-        mail_service.send_signup_email(email, verification_url, user.username or email.split('@')[0])
+        MailService(self.db, outbox_model=EmailOutbox).send_signup_email(email, verification_url, user.username or email.split('@')[0])
+        self.db.commit()
 
         return {"message": "Verification email sent successfully"}
 
@@ -221,19 +239,34 @@ class EEAuthService:
         return {"message": "Email verified successfully"}
 
     def login(self, email: str, password: str) -> Dict[str, Any]:
+        user = self._find_login_user(email)
+        if not verify_password(password, user.password_hash):
+            self._reject_login()
+        new_hash = hash_password(password) if password_hasher.needs_rehash(user.password_hash) else None
+        return self._complete_login(user, new_hash)
+
+    async def login_async(self, email: str, password: str) -> Dict[str, Any]:
+        """login() for async routes: bcrypt runs on the hasher pool, DB work on the threadpool."""
+        user = await run_in_threadpool(self._find_login_user, email)
+        if not await password_hasher.verify_async(password, user.password_hash):
+            self._reject_login()
+        new_hash = await password_hasher.hash_async(password) if password_hasher.needs_rehash(user.password_hash) else None
+        return await run_in_threadpool(self._complete_login, user, new_hash)
+
+    def _find_login_user(self, email: str) -> User:
         user = self.db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
-
-        if not user.password_hash or not verify_password(password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
+        if not user or not user.password_hash:
+            self._reject_login()
+        return user
+
+    @staticmethod
+    def _reject_login() -> None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
 
+    def _complete_login(self, user: User, new_password_hash: Optional[str] = None) -> Dict[str, Any]:
         if user.status != UserStatus.ACTIVE:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -241,6 +274,9 @@ class EEAuthService:
             )
 
         user.last_login_at = int(time.time())
+        if new_password_hash:
+            # Cost factor changed since this hash was made; upgrade it transparently.
+            user.password_hash = new_password_hash
         self.db.commit()
 
         organizations = self.get_associated_organizations(user.id)
@@ -278,16 +314,16 @@ class EEAuthService:
         )
 
         self.db.add(reset)
-        self.db.commit()
 
         verification_url = f"{ee_settings.APPLICATION_URL}/auth/reset-password?token={reset.token}&email={user.email}"
 
-        mail_service = MailService()
-        mail_service.send_forgot_password_email(email, verification_url)
+        MailService(self.db, outbox_model=EmailOutbox).send_forgot_password_email(email, verification_url)
+        self.db.commit()
 
         return {"message": "If the email exists, you will receive a password reset link"}
 
-    def accept_forgot_password(self, email: str, password: str, token: str) -> Dict[str, str]:
+    def validate_reset_token(self, email: str, token: str) -> PasswordReset:
+        """The unused, unexpired reset for email and token; 400 otherwise."""
         current_time = int(time.time())
 
         reset = self.db.query(PasswordReset).filter(
@@ -302,6 +338,21 @@ class EEAuthService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid or expired reset token"
             )
+        return reset
+
+    async def accept_forgot_password_async(self, email: str, password: str, token: str) -> Dict[str, str]:
+        """accept_forgot_password() for async routes: the token is checked before bcrypt runs."""
+        await run_in_threadpool(self.validate_reset_token, email, token)
+        password_hash = await password_hasher.hash_async(password)
+        return await run_in_threadpool(
+            self.accept_forgot_password, email, password, token, password_hash=password_hash
+        )
+
+    def accept_forgot_password(self, email: str, password: str, token: str,
+                               password_hash: Optional[str] = None) -> Dict[str, str]:
+        current_time = int(time.time())
+
+        reset = self.validate_reset_token(email, token)
 
         user = self.db.query(User).filter(User.id == reset.user_id).first()
         if not user:
@@ -310,7 +361,7 @@ class EEAuthService:
                 detail="User not found"
             )
 
-        user.password_hash = hash_password(password)
+        user.password_hash = password_hash or hash_password(password)
         user.updated_at = current_time
 
         reset.used = True
@@ -437,13 +488,22 @@ class EEAuthService:
             "role": member.role.value
         }
 
-    def get_all_users_for_organization(self, org_id: UUID) -> List[Dict[str, Any]]:
-        members = self.db.query(Member, User).join(
+    def get_all_users_for_organization(
+        self, org_id: UUID, params: Optional[ListParams] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        params = params or ListParams()
+        query = self.db.query(Member, User).join(
             User, Member.user_id == User.id
         ).filter(
-            Member.organization_id == org_id,
-            Member.status == 'active'
-        ).all()
+            Member.organization_id == org_id
+        )
+        if params.status is None:
+            query = query.filter(Member.status == 'active')
+        query = apply_filters(query, params, {
+            "status": Member.status,
+            "created_by": Member.created_by,
+        })
+        members = apply_keyset(query, Member.id, params).all()
 
         result = []
         for member, user in members:
@@ -460,13 +520,29 @@ class EEAuthService:
                 "last_activity_at": member.last_activity_at
             })
 
-        return result
-
-    def get_all_invited_users_for_organization(self, org_id: UUID) -> List[Dict[str, Any]]:
-        invites = self.db.query(OrganizationInvite).filter(
+        return paginate(result, params, id_key="member_id")
+
+    def get_all_invited_users_for_organization(
+        self, org_id: UUID, params: Optional[ListParams] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        params = params or ListParams()
+        invite_status = InviteStatus.PENDING
+        if params.status is not None:
+            try:
+                invite_status = InviteStatus(params.status.lower())
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid status"
+                )
+        query = self.db.query(OrganizationInvite).filter(
             OrganizationInvite.organization_id == org_id,
-            OrganizationInvite.status == InviteStatus.PENDING
-        ).all()
+            OrganizationInvite.status == invite_status
+        )
+        query = apply_filters(query, replace(params, status=None), {
+            "created_by": OrganizationInvite.invited_by,
+        })
+        invites = apply_keyset(query, OrganizationInvite.id, params).all()
 
         result = []
         for invite in invites:
@@ -478,7 +554,7 @@ class EEAuthService:
                 "status": invite.status.value,
             })
 
-        return result
+        return paginate(result, params, id_key="member_id")
 
     def invite_user_to_organization(self, org_id: UUID, name: str, email: str,
                                     role: str, invited_by: int) -> Dict[str, Any]:
@@ -534,13 +610,12 @@ class EEAuthService:
         )
 
         self.db.add(invitation)
-        self.db.commit()
-        self.db.refresh(invitation)
 
         invite_url = f"{ee_settings.APPLICATION_URL}/verify/user_to_workspace?email={email}&code={invitation.invitation_token}&user_tenant_id={org_id}"
 
-        mail_service = MailService()
-        mail_service.send_invite_email(email, invite_url)
+        MailService(self.db, outbox_model=EmailOutbox).send_invite_email(email, invite_url)
+        self.db.commit()
+        self.db.refresh(invitation)
 
         return {
             "id": invitation.id,
@@ -650,6 +725,7 @@ class EEAuthService:
 
         self.db.delete(member)
         self.db.commit()
+        ee_jwt_manager.revoke_user(member.user_id)
 
         return {"message": "Member removed successfully"}
 
@@ -713,6 +789,7 @@ class EEAuthService:
         member.role = role_enum
         member.updated_at = int(time.time())
         self.db.commit()
+        ee_jwt_manager.revoke_user(member.user_id)
 
         return {
             "member_id": member.id,
@@ -0,0 +1,17 @@
+"""Outbox worker for the EE database (emails queued by EEAuthService)."""
+
+from core.config import settings
+from core.services.email_outbox_worker import EmailOutboxWorker
+from core.services.email_service import get_email_transport
+from ee.database.session import EESessionLocal
+from ee.models.email_outbox import EmailOutbox
+
+ee_email_outbox_worker = EmailOutboxWorker(
+    EESessionLocal,
+    EmailOutbox,
+    get_email_transport,
+    concurrency=settings.EMAIL_WORKER_CONCURRENCY,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    name="ee-email-outbox",
+)
@@ -0,0 +1,18 @@
+"""Readiness of the EE API (ee_engine, EE email outbox)."""
+
+from core.middleware.token_cache import verified_token_cache
+from core.services.health import HealthMonitor, health_thresholds
+from core.utils.security import password_hasher
+from ee.database.base import ee_engine
+from ee.database.session import EESessionLocal
+from ee.services.email_outbox_worker import ee_email_outbox_worker
+
+ee_health_monitor = HealthMonitor(
+    "enterprise",
+    EESessionLocal,
+    {"ee_engine": ee_engine},
+    email_outbox=ee_email_outbox_worker,
+    caches={"verified_tokens": verified_token_cache.stats},
+    components={"password_hasher": password_hasher.stats},
+    **health_thresholds(),
+)
@@ -1,7 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from core.config import settings
+from loguru import logger
+
+from core.config import secret_store, settings
+from core.database.base import async_engine, engine
+from core.database.session import SessionLocal, get_db_context
+from core.middleware.token_cache import verified_token_cache
+from core.services.agent_runtime_cache import agent_runtime_cache
+from core.services.call_rollup import call_rollup_worker
+from core.services.email_outbox_worker import email_outbox_worker
+from core.services.health import HealthMonitor, health_router, health_thresholds
+from core.services.metrics import instrument_app, instrument_engine, reset_multiproc_dir
+from core.services.phone_routing_table import phone_routing_table
+from core.utils.security import password_hasher
 from core.api.v1 import auth, users, organizations, api_keys, services, service_providers, agents, agent_configs, agent_phone_numbers, models as models_router
 
 app = FastAPI(title="Tone API - Core", version="1.0.0")
@@ -28,6 +40,61 @@ api_v1.include_router(models_router.router, prefix="/model", tags=["model"])
 
 app.mount("/api/v1", api_v1)
 
+health_monitor = HealthMonitor(
+    "core",
+    SessionLocal,
+    {"engine": engine, "async_engine": async_engine.sync_engine},
+    count_calls=True,
+    email_outbox=email_outbox_worker,
+    caches={"verified_tokens": verified_token_cache.stats, "agent_runtime": agent_runtime_cache.stats},
+    components={
+        "password_hasher": password_hasher.stats,
+        "call_rollup": call_rollup_worker.stats,
+        "secrets": secret_store.stats,
+    },
+    **health_thresholds(),
+)
+app.include_router(health_router(health_monitor), tags=["health"])
+
+instrument_engine(engine, "core")
+instrument_engine(async_engine.sync_engine, "core_async")
+instrument_app(app, "core")
+
+
+@app.on_event("startup")
+def reset_metrics():
+    reset_multiproc_dir()
+
+
+@app.on_event("startup")
+def load_phone_routing_table():
+    try:
+        with get_db_context() as db:
+            phone_routing_table.load(db)
+    except Exception as e:
+        logger.warning(f"Phone routing table not loaded at startup, the refresh thread will retry: {e}")
+    phone_routing_table.ensure_refreshing()
+
+
+@app.on_event("startup")
+async def start_email_outbox_worker():
+    email_outbox_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_email_outbox_worker():
+    await email_outbox_worker.stop()
+
+
+@app.on_event("startup")
+async def start_call_rollup_worker():
+    call_rollup_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_call_rollup_worker():
+    await call_rollup_worker.stop()
+
 
 @app.get("/")
 def root():
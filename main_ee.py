@@ -3,6 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from ee.config import ee_settings
 from ee.api.v1 import auth, users, organizations
+from ee.services.email_outbox_worker import ee_email_outbox_worker
+from ee.services.health import ee_health_monitor
+from core.services.health import health_router
+from core.services.metrics import instrument_app, instrument_engine, reset_multiproc_dir
+from ee.database.base import ee_engine
 
 app = FastAPI(title="Tone API - Enterprise", version="1.0.0")
 
@@ -21,6 +26,25 @@ api_v1.include_router(organizations.router, prefix="/org", tags=["org"])
 api_v1.include_router(organizations.router, prefix="/organization", tags=["organization"])
 
 app.mount("/api/v1", api_v1)
+app.include_router(health_router(ee_health_monitor), tags=["health"])
+
+instrument_engine(ee_engine, "ee")
+instrument_app(app, "enterprise")
+
+
+@app.on_event("startup")
+def reset_metrics():
+    reset_multiproc_dir()
+
+
+@app.on_event("startup")
+async def start_email_outbox_worker():
+    ee_email_outbox_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_email_outbox_worker():
+    await ee_email_outbox_worker.stop()
 
 
 @app.get("/")